@@ -0,0 +1,216 @@
+import os
+import struct
+from array import array
+from collections import deque
+
+from word_trie import CHAR_BITS, ROOT, WordTrie
+
+# Formato do cache em disco (cabeçalho little-endian; arrays na ordem de bytes da máquina,
+# pois o cache é sempre lido na mesma máquina em que foi gravado):
+#   cabeçalho: MAGIC, mtime da lista de origem (ns), tamanho mínimo das palavras,
+#              número de nós, número de arestas
+#   dados: chaves das arestas (q), filhos (i), falhas (i), ligações de saída (i),
+#          profundidades (H) e a marca de fim de palavra (1 byte por nó)
+MAGIC = b"AHOCOR01"
+HEADER = struct.Struct("<8sqIII")
+
+# Sufixo do cache gravado ao lado da lista de palavras original.
+AUTOMATON_SUFFIX = ".aho"
+
+# Palavras mais curtas que isso não contam como palavras embutidas
+# (a lista tem "a", "i", "an", ..., que aparecem em quase qualquer senha).
+DEFAULT_MIN_WORD_LENGTH = 4
+
+# Ligação de saída que não aponta para nenhum nó.
+NO_LINK = -1
+
+
+def automaton_path(filename):
+    """Retorna o caminho do cache do autômato correspondente a uma lista de palavras."""
+    return filename + AUTOMATON_SUFFIX
+
+
+class AhoCorasick:
+    """
+    Um autômato de Aho–Corasick sobre uma WordTrie.
+
+    Encontra, em uma única passagem pelo texto, todas as palavras da lista
+    que aparecem como substrings.
+
+    Attributes:
+        edges (dict): As arestas da trie, como em WordTrie.
+        fail (array): Para cada nó, o nó do maior sufixo próprio que também é prefixo.
+        output (array): Para cada nó, o nó terminal mais próximo na cadeia de falhas
+            (incluindo o próprio nó), ou NO_LINK.
+        depth (array): O comprimento do prefixo representado por cada nó.
+        terminal (bytearray): 1 para os nós onde termina uma palavra.
+    """
+
+    def __init__(self, edges, fail, output, depth, terminal, min_word_length):
+        self.edges = edges
+        self.fail = fail
+        self.output = output
+        self.depth = depth
+        self.terminal = terminal
+        self.min_word_length = min_word_length
+
+    @classmethod
+    def from_words(cls, words, min_word_length=DEFAULT_MIN_WORD_LENGTH):
+        """Constrói o autômato a partir de palavras (já normalizadas pelo chamador)."""
+        trie = WordTrie.from_words(word for word in words if len(word) >= min_word_length)
+        node_count = len(trie)
+
+        children = [[] for _ in range(node_count)]
+        char_mask = (1 << CHAR_BITS) - 1
+        for key, child in trie.edges.items():
+            children[key >> CHAR_BITS].append((key & char_mask, child))
+
+        fail = array("i", [ROOT]) * node_count
+        output = array("i", [NO_LINK]) * node_count
+        depth = array("H", [0]) * node_count
+        edges = trie.edges
+
+        # Busca em largura: a falha de um nó é calculada a partir da do seu pai.
+        queue = deque([ROOT])
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node]:
+                depth[child] = depth[node] + 1
+                if node != ROOT:
+                    state = fail[node]
+                    while True:
+                        target = edges.get((state << CHAR_BITS) | code)
+                        if target is not None:
+                            fail[child] = target
+                            break
+                        if state == ROOT:
+                            break
+                        state = fail[state]
+                output[child] = child if trie.terminal[child] else output[fail[child]]
+                queue.append(child)
+
+        return cls(edges, fail, output, depth, trie.terminal, min_word_length)
+
+    def step(self, node, char):
+        """Avança o estado do autômato com um caractere."""
+        edges = self.edges
+        fail = self.fail
+        code = ord(char)
+        while True:
+            target = edges.get((node << CHAR_BITS) | code)
+            if target is not None:
+                return target
+            if node == ROOT:
+                return ROOT
+            node = fail[node]
+
+    def has_match(self, node):
+        """Retorna True se alguma palavra termina no estado node."""
+        return self.output[node] != NO_LINK
+
+    def contains_any(self, text):
+        """Retorna True se text contém alguma palavra da lista."""
+        output = self.output
+        node = ROOT
+        for char in text:
+            node = self.step(node, char)
+            if output[node] != NO_LINK:
+                return True
+        return False
+
+    def find_all(self, text):
+        """
+        Encontra todas as palavras da lista contidas em text.
+
+        Returns:
+            list: Tuplas (posição inicial, palavra), em ordem de posição final.
+        """
+        output = self.output
+        fail = self.fail
+        depth = self.depth
+        matches = []
+        node = ROOT
+        for end, char in enumerate(text, 1):
+            node = self.step(node, char)
+            match = output[node]
+            while match != NO_LINK:
+                start = end - depth[match]
+                matches.append((start, text[start:end]))
+                match = output[fail[match]]
+        return matches
+
+    def save(self, path, source_mtime):
+        """Grava o autômato em disco, de forma atômica."""
+        keys = array("q", self.edges.keys())
+        children = array("i", self.edges.values())
+        # Um nome temporário por processo, já que vários processos podem
+        # reconstruir o cache ao mesmo tempo.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, source_mtime, self.min_word_length,
+                                len(self.terminal), len(keys)))
+            for data in (keys, children, self.fail, self.output, self.depth):
+                data.tofile(f)
+            f.write(self.terminal)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Lê um autômato gravado com save().
+
+        Returns:
+            tuple: (AhoCorasick, mtime da lista de origem gravado no cabeçalho).
+
+        Raises:
+            ValueError: Se o arquivo não for um autômato válido.
+        """
+        with open(path, "rb") as f:
+            magic, source_mtime, min_word_length, node_count, edge_count = HEADER.unpack(
+                f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Arquivo de autômato inválido: {path}")
+            try:
+                arrays = []
+                for typecode, count in (("q", edge_count), ("i", edge_count), ("i", node_count),
+                                        ("i", node_count), ("H", node_count)):
+                    data = array(typecode)
+                    data.fromfile(f, count)
+                    arrays.append(data)
+                terminal = bytearray(f.read(node_count))
+            except EOFError:
+                raise ValueError(f"Arquivo de autômato incompleto: {path}")
+        if len(terminal) != node_count:
+            raise ValueError(f"Arquivo de autômato incompleto: {path}")
+        keys, children, fail, output, depth = arrays
+        edges = dict(zip(keys, children))
+        return cls(edges, fail, output, depth, terminal, min_word_length), source_mtime
+
+
+def load_or_build(filename, min_word_length=DEFAULT_MIN_WORD_LENGTH):
+    """
+    Retorna o autômato das palavras (em minúsculas) de uma lista.
+
+    Usa o cache em disco se ele foi gerado a partir da versão atual da lista
+    com o mesmo tamanho mínimo; caso contrário, reconstrói e grava o cache.
+
+    Raises:
+        FileNotFoundError: Se a lista de palavras não existir.
+    """
+    source_mtime = os.stat(filename).st_mtime_ns
+    path = automaton_path(filename)
+    try:
+        automaton, cached_mtime = AhoCorasick.load(path)
+        if cached_mtime == source_mtime and automaton.min_word_length == min_word_length:
+            return automaton
+    except (FileNotFoundError, ValueError):
+        pass
+
+    with open(filename, "r", encoding="utf-8") as f:
+        automaton = AhoCorasick.from_words((line.strip().lower() for line in f), min_word_length)
+    try:
+        automaton.save(path, source_mtime)
+    except OSError:
+        # Sem permissão para gravar o cache: o autômato continua utilizável.
+        pass
+    return automaton
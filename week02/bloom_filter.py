@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import random
+import string
+import struct
+import time
+
+# Formato do arquivo (inteiros little-endian, sem sinal):
+#   cabeçalho: MAGIC (8 bytes) + número de bits (8) + número de hashes (4) + itens (8)
+#   dados: o vetor de bits
+MAGIC = b"BLOOM001"
+HEADER = struct.Struct("<8sQIQ")
+
+# Sufixo do filtro gravado ao lado da lista de palavras original.
+BLOOM_SUFFIX = ".bloom"
+
+# Taxa de falsos positivos padrão usada pelo construtor.
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+
+def bloom_path(filename):
+    """Retorna o caminho do filtro de Bloom correspondente a uma lista de palavras."""
+    return filename + BLOOM_SUFFIX
+
+
+def optimal_parameters(capacity, false_positive_rate):
+    """
+    Calcula o tamanho do vetor de bits e o número de funções de hash.
+
+    Args:
+        capacity (int): O número esperado de itens.
+        false_positive_rate (float): A taxa de falsos positivos desejada (0 < p < 1).
+
+    Returns:
+        tuple: (número de bits, número de hashes).
+    """
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("A taxa de falsos positivos deve estar entre 0 e 1.")
+    capacity = max(1, capacity)
+    bit_count = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+    hash_count = max(1, round(bit_count / capacity * math.log(2)))
+    return bit_count, hash_count
+
+
+def _hash_pair(word):
+    """Retorna dois hashes de 64 bits independentes para uma palavra."""
+    digest = hashlib.blake2b(word.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Um filtro de Bloom: responde "talvez esteja" ou "certamente não está".
+
+    As palavras são sempre armazenadas e consultadas em minúsculas, de modo que
+    o mesmo filtro serve como pré-verificação para buscas que diferenciam ou não
+    maiúsculas de minúsculas.
+    """
+
+    def __init__(self, bit_count, hash_count, bits=None, item_count=0):
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.item_count = item_count
+        self._bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+        self._mm = None
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """Cria um filtro vazio dimensionado para capacity itens."""
+        bit_count, hash_count = optimal_parameters(capacity, false_positive_rate)
+        return cls(bit_count, hash_count)
+
+    def _positions(self, word):
+        h1, h2 = _hash_pair(word.lower())
+        bit_count = self.bit_count
+        return [(h1 + i * h2) % bit_count for i in range(self.hash_count)]
+
+    def add(self, word):
+        """Adiciona uma palavra ao filtro."""
+        bits = self._bits
+        for position in self._positions(word):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.item_count += 1
+
+    def __contains__(self, word):
+        # Calcula as posições uma a uma para parar no primeiro bit zerado.
+        h1, h2 = _hash_pair(word.lower())
+        bits = self._bits
+        bit_count = self.bit_count
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % bit_count
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def save(self, path):
+        """Grava o filtro em disco, de forma atômica."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.bit_count, self.hash_count, self.item_count))
+            f.write(self._bits)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Abre um filtro gravado em disco, mapeando o vetor de bits em memória.
+
+        Raises:
+            ValueError: Se o arquivo não for um filtro de Bloom válido.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, bit_count, hash_count, item_count = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or len(mm) < HEADER.size + (bit_count + 7) // 8:
+            mm.close()
+            raise ValueError(f"Arquivo de filtro de Bloom inválido: {path}")
+        bloom = cls(bit_count, hash_count, memoryview(mm)[HEADER.size:], item_count)
+        bloom._mm = mm
+        return bloom
+
+    def close(self):
+        """Libera o mapeamento de memória, se houver."""
+        if self._mm is not None:
+            self._bits.release()
+            self._mm.close()
+            self._mm = None
+
+
+def build_bloom_filter(source, destination, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+    """
+    Constrói um filtro de Bloom a partir de uma lista de palavras em texto.
+
+    O arquivo é lido duas vezes (uma para contar, outra para inserir), então
+    a lista nunca é carregada inteira na memória.
+
+    Returns:
+        BloomFilter: O filtro construído.
+    """
+    with open(source, "r", encoding="utf-8", errors="replace") as f:
+        capacity = sum(1 for _ in f)
+
+    bloom = BloomFilter.for_capacity(capacity, false_positive_rate)
+    with open(source, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            bloom.add(line.strip())
+    bloom.save(destination)
+    return bloom
+
+
+def _scan_file(word, filename):
+    """A busca linear original de word_in_file, usada como referência no benchmark."""
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            if word.lower() == line.strip().lower():
+                return True
+    return False
+
+
+def run_benchmark(filename, queries=200, seed=0):
+    """
+    Compara o filtro de Bloom com a busca linear e com a busca exata em cache.
+
+    As consultas são senhas aleatórias, ou seja, o caso comum (a senha não
+    está na lista).
+    """
+    import password
+
+    path = bloom_path(filename)
+    if not os.path.exists(path):
+        build_bloom_filter(filename, path)
+    bloom = BloomFilter.load(path)
+
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    words = ["".join(rng.choice(alphabet) for _ in range(12)) for _ in range(queries)]
+
+    def measure(check):
+        start = time.perf_counter()
+        hits = sum(1 for word in words if check(word))
+        elapsed = time.perf_counter() - start
+        return elapsed / len(words) * 1e6, hits
+
+    lookup = password.get_word_lookup(filename, case_sensitive=False)
+    results = [
+        ("busca linear", measure(lambda word: _scan_file(word, filename))),
+        ("busca exata em cache", measure(lambda word: word.lower() in lookup)),
+        ("filtro de Bloom", measure(lambda word: word in bloom)),
+    ]
+
+    print(f"{len(words)} consultas em {filename}")
+    print(f"Filtro: {bloom.bit_count} bits, {bloom.hash_count} hashes, {bloom.item_count} itens")
+    for name, (micros, hits) in results:
+        print(f"  {name:<22} {micros:12.2f} µs/consulta  ({hits} positivos)")
+    bloom.close()
+
+
+def main(argv=None):
+    """
+    Constrói um filtro de Bloom ou executa o benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Filtro de Bloom para listas de senhas vazadas.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help=f"constrói o filtro de uma lista em <source>{BLOOM_SUFFIX}")
+    build_parser.add_argument("source")
+    build_parser.add_argument("-p", "--fp-rate", type=float, default=DEFAULT_FALSE_POSITIVE_RATE)
+
+    bench_parser = subparsers.add_parser("bench", help="compara o filtro com a busca atual")
+    bench_parser.add_argument("source")
+    bench_parser.add_argument("-n", "--queries", type=int, default=200)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        # password.py só procura o filtro em <source>.bloom.
+        destination = bloom_path(args.source)
+        start = time.perf_counter()
+        bloom = build_bloom_filter(args.source, destination, args.fp_rate)
+        elapsed = time.perf_counter() - start
+        print(f"{destination}: {bloom.item_count} itens, {bloom.bit_count} bits, "
+              f"{bloom.hash_count} hashes ({elapsed:.2f} s)")
+    else:
+        run_benchmark(args.source, args.queries)
+
+
+if __name__ == "__main__":
+    main()
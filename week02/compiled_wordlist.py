@@ -0,0 +1,132 @@
+import mmap
+import os
+import struct
+import sys
+
+# Formato do arquivo compilado (todos os inteiros são little-endian, sem sinal):
+#   cabeçalho: MAGIC (8 bytes) + quantidade de palavras (4 bytes)
+#   tabela de deslocamentos: quantidade + 1 inteiros de 4 bytes
+#   dados: as palavras em UTF-8, ordenadas por bytes e sem repetições
+MAGIC = b"WLIDX001"
+HEADER = struct.Struct("<8sI")
+OFFSET = struct.Struct("<I")
+
+# Sufixos dos arquivos compilados ao lado da lista de palavras original.
+EXACT_SUFFIX = ".exact.wlidx"
+LOWER_SUFFIX = ".lower.wlidx"
+
+
+def compiled_path(filename, case_sensitive):
+    """
+    Retorna o caminho do arquivo compilado correspondente a uma lista de palavras.
+
+    Args:
+        filename (str): O caminho da lista de palavras em texto.
+        case_sensitive (bool): Se o índice diferencia maiúsculas de minúsculas.
+
+    Returns:
+        str: O caminho do arquivo compilado.
+    """
+    return filename + (EXACT_SUFFIX if case_sensitive else LOWER_SUFFIX)
+
+
+def compile_wordlist(source, destination, lowercase=False):
+    """
+    Converte uma lista de palavras em texto para o formato binário ordenado.
+
+    Args:
+        source (str): O caminho da lista de palavras em texto.
+        destination (str): O caminho do arquivo binário a ser criado.
+        lowercase (bool): Se as palavras devem ser convertidas para minúsculas.
+
+    Returns:
+        int: O número de palavras distintas gravadas.
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        words = {line.strip() for line in f}
+    if lowercase:
+        words = {word.lower() for word in words}
+    encoded = sorted(word.encode("utf-8") for word in words)
+
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    # Grava em um arquivo temporário e o renomeia, para que leitores nunca
+    # vejam um índice pela metade.
+    temp_path = destination + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(encoded)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.writelines(encoded)
+    os.replace(temp_path, destination)
+    return len(encoded)
+
+
+class CompiledWordList:
+    """
+    Uma lista de palavras compilada, mapeada em memória e consultada por busca binária.
+
+    As palavras nunca são carregadas como objetos Python, então vários processos
+    podem compartilhar as mesmas páginas do arquivo através do cache do sistema.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Arquivo de lista de palavras inválido: {path}")
+        self._offsets_start = HEADER.size
+        self._data_start = self._offsets_start + (self._count + 1) * OFFSET.size
+
+    def __len__(self):
+        return self._count
+
+    def _word_at(self, index):
+        """Retorna os bytes da palavra na posição index."""
+        position = self._offsets_start + index * OFFSET.size
+        start = OFFSET.unpack_from(self._mm, position)[0]
+        end = OFFSET.unpack_from(self._mm, position + OFFSET.size)[0]
+        return self._mm[self._data_start + start:self._data_start + end]
+
+    def __contains__(self, word):
+        target = word.encode("utf-8", errors="surrogatepass")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._count and self._word_at(low) == target
+
+    def close(self):
+        """Libera o mapeamento de memória."""
+        self._mm.close()
+
+
+def main(argv=None):
+    """
+    Compila as listas de palavras passadas na linha de comando.
+
+    Sem argumentos, compila as listas usadas por password.py.
+    """
+    filenames = sys.argv[1:] if argv is None else argv
+    if not filenames:
+        import password
+        filenames = [password.DICTIONARY_FILE, password.COMMON_PASSWORDS_FILE]
+
+    for filename in filenames:
+        if not os.path.exists(filename):
+            print(f"Aviso: Arquivo de recurso não encontrado: {filename}")
+            continue
+        for case_sensitive in (True, False):
+            destination = compiled_path(filename, case_sensitive)
+            count = compile_wordlist(filename, destination, lowercase=not case_sensitive)
+            print(f"{destination}: {count} palavras")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import password
+from password import Reason, StrengthResult
+from word_trie import DEAD, ROOT
+
+
+class _EmptyTrie:
+    """Substitui a trie de uma lista de palavras ausente: nenhum prefixo existe."""
+
+    def step(self, node, char):
+        return DEAD
+
+    def is_word(self, node):
+        return False
+
+
+class _EmptyAutomaton:
+    """Substitui o autômato de palavras embutidas quando o dicionário está ausente."""
+
+    def step(self, node, char):
+        return ROOT
+
+    def has_match(self, node):
+        return False
+
+
+def _optional_trie(filename, case_sensitive):
+    try:
+        return password.load_word_trie(filename, case_sensitive)
+    except FileNotFoundError:
+        return _EmptyTrie()
+
+
+def _optional_automaton(filename):
+    try:
+        return password.load_embedded_word_automaton(filename)
+    except FileNotFoundError:
+        return _EmptyAutomaton()
+
+
+class IncrementalStrength:
+    """
+    Avalia a força de uma senha enquanto ela é digitada.
+
+    Cada caractere acrescentado ou apagado atualiza o estado em O(1): as
+    contagens de cada classe de caractere, o número de trincas que formam
+    sequências ou repetições, os cursores nas tries do dicionário e das
+    senhas comuns e o estado do autômato de palavras embutidas (este último
+    em O(1) amortizado). result() produz o mesmo StrengthResult que
+    password.evaluate_password produziria para o texto atual.
+    """
+
+    def __init__(self, min_length=10, strong_length=16):
+        self.min_length = min_length
+        self.strong_length = strong_length
+        self._dictionary = _optional_trie(password.DICTIONARY_FILE, False)
+        self._common = _optional_trie(password.COMMON_PASSWORDS_FILE, True)
+        self._embedded = _optional_automaton(password.DICTIONARY_FILE)
+        self.clear()
+
+    def clear(self):
+        """Volta ao estado de senha vazia."""
+        self._chars = []
+        # Uma entrada por caractere: (passo em relação ao anterior, formou padrão?).
+        self._steps = []
+        self._pattern_count = 0
+        self._class_counts = {mask: 0 for mask in (password.LOWER_MASK, password.UPPER_MASK,
+                                                   password.DIGITS_MASK, password.SPECIAL_MASK)}
+        self._class_counts[0] = 0
+        self._dictionary_cursors = [ROOT]
+        self._common_cursors = [ROOT]
+        # Uma entrada por caractere: (estado do autômato, palavras embutidas até aqui).
+        self._embedded_states = [(ROOT, 0)]
+
+    @property
+    def text(self):
+        """O texto avaliado no momento."""
+        return "".join(self._chars)
+
+    def __len__(self):
+        return len(self._chars)
+
+    def append(self, char):
+        """Acrescenta um caractere ao fim da senha."""
+        if self._chars:
+            step = ord(char) - ord(self._chars[-1])
+            previous_step = self._steps[-1][0]
+            is_pattern = step == previous_step and -1 <= step <= 1
+        else:
+            step = None
+            is_pattern = False
+        self._chars.append(char)
+        self._steps.append((step, is_pattern))
+        self._pattern_count += is_pattern
+        self._class_counts[password.CHARACTER_CLASSES.get(char, 0)] += 1
+
+        cursor = self._dictionary_cursors[-1]
+        state, embedded_count = self._embedded_states[-1]
+        for lower_char in char.lower():
+            cursor = self._dictionary.step(cursor, lower_char)
+            state = self._embedded.step(state, lower_char)
+            embedded_count += self._embedded.has_match(state)
+        self._dictionary_cursors.append(cursor)
+        self._embedded_states.append((state, embedded_count))
+        self._common_cursors.append(self._common.step(self._common_cursors[-1], char))
+
+    def delete(self):
+        """Apaga o último caractere da senha, se houver."""
+        if not self._chars:
+            return
+        char = self._chars.pop()
+        _, is_pattern = self._steps.pop()
+        self._pattern_count -= is_pattern
+        self._class_counts[password.CHARACTER_CLASSES.get(char, 0)] -= 1
+        self._dictionary_cursors.pop()
+        self._common_cursors.pop()
+        self._embedded_states.pop()
+
+    def set_text(self, text):
+        """
+        Atualiza o estado para um novo texto, reaproveitando o prefixo em comum.
+
+        Útil quando a interface informa o conteúdo inteiro do campo a cada tecla:
+        o custo é proporcional apenas aos caracteres que mudaram no fim.
+        """
+        chars = self._chars
+        common = 0
+        limit = min(len(chars), len(text))
+        while common < limit and chars[common] == text[common]:
+            common += 1
+        for _ in range(len(chars) - common):
+            self.delete()
+        for char in text[common:]:
+            self.append(char)
+
+    def complexity(self):
+        """Retorna o número de classes de caracteres presentes (0 a 4)."""
+        return sum(1 for mask, count in self._class_counts.items() if mask and count)
+
+    def result(self):
+        """
+        Retorna a avaliação do texto atual.
+
+        Returns:
+            StrengthResult: O mesmo resultado de password.evaluate_password.
+        """
+        if self._dictionary.is_word(self._dictionary_cursors[-1]):
+            return StrengthResult(0, Reason.DICTIONARY_WORD)
+
+        if self._common.is_word(self._common_cursors[-1]):
+            return StrengthResult(0, Reason.COMMON_PASSWORD)
+
+        length = len(self._chars)
+        if length < self.min_length:
+            return StrengthResult(1, Reason.TOO_SHORT)
+
+        if length >= self.strong_length:
+            return StrengthResult(5, Reason.LONG_PASSWORD)
+
+        complexity = self.complexity()
+        strength = 1 + complexity
+        reasons = Reason.NONE
+        if self._pattern_count:
+            strength = max(1, strength - 1)
+            reasons |= Reason.SEQUENCE_OR_REPETITION
+        if self._embedded_states[-1][1]:
+            strength = max(1, strength - 1)
+            reasons |= Reason.EMBEDDED_WORD
+
+        return StrengthResult(strength, reasons, complexity)
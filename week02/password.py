@@ -1,4 +1,11 @@
 import os
+from array import array
+from enum import IntFlag
+
+import aho_corasick
+from bloom_filter import BloomFilter, bloom_path
+from compiled_wordlist import CompiledWordList, compiled_path
+from word_trie import WordTrie
 
 # Definição das constantes de lista de caracteres
 LOWER=list("abcdefghijklmnopqrstuvwxyz")
@@ -6,6 +13,19 @@ UPPER=list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 DIGITS=list("0123456789")
 SPECIAL=list("!@#$%^&*()-_=+[]{}|;:'\",.<>/?`~")
 
+# Máscaras de bits de cada classe de caractere e a tabela caractere -> máscara,
+# usadas para classificar uma senha em uma única passagem.
+LOWER_MASK = 1
+UPPER_MASK = 2
+DIGITS_MASK = 4
+SPECIAL_MASK = 8
+CHARACTER_CLASSES = {}
+for _chars, _mask in ((LOWER, LOWER_MASK), (UPPER, UPPER_MASK), (DIGITS, DIGITS_MASK), (SPECIAL, SPECIAL_MASK)):
+    for _char in _chars:
+        CHARACTER_CLASSES[_char] = _mask
+# Número de classes presentes em cada máscara possível (0 a 15).
+_CLASS_COUNT = [bin(_mask).count("1") for _mask in range(16)]
+
 # --- Construção de Caminho Robusta ---
 # Descobre o diretório onde o script está sendo executado
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,6 +36,247 @@ DICTIONARY_FILE = os.path.join(script_dir, "wordlist.txt")
 COMMON_PASSWORDS_FILE = os.path.join(script_dir, "toppasswords.txt")
 
 
+# Cache das listas de palavras: filename -> (mtime, conjunto exato, conjunto em minúsculas).
+# É construído no primeiro uso e reconstruído quando o arquivo é modificado.
+_WORD_SET_CACHE = {}
+
+
+def load_word_sets(filename):
+    """
+    Carrega um arquivo de palavras em dois conjuntos para consulta em O(1).
+
+    Args:
+        filename (str): O caminho para o arquivo.
+
+    Returns:
+        tuple: (conjunto exato, conjunto em minúsculas).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    mtime = os.stat(filename).st_mtime_ns
+    cached = _WORD_SET_CACHE.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    with open(filename, "r", encoding="utf-8") as f:
+        exact_words = {line.strip() for line in f}
+    lower_words = {word.lower() for word in exact_words}
+
+    _WORD_SET_CACHE[filename] = (mtime, exact_words, lower_words)
+    return exact_words, lower_words
+
+
+# Cache dos índices compilados abertos: caminho -> (mtime, CompiledWordList).
+_COMPILED_CACHE = {}
+
+
+def load_compiled_wordlist(filename, case_sensitive):
+    """
+    Abre o índice compilado de uma lista de palavras, se ele existir e estiver atualizado.
+
+    Args:
+        filename (str): O caminho da lista de palavras em texto.
+        case_sensitive (bool): Qual das duas variantes do índice abrir.
+
+    Returns:
+        CompiledWordList: O índice, ou None se ele não existir ou for mais
+        antigo que a lista de palavras.
+    """
+    path = compiled_path(filename, case_sensitive)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        if os.stat(filename).st_mtime_ns > mtime:
+            return None
+    except FileNotFoundError:
+        pass
+
+    cached = _COMPILED_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    # Um índice antigo não é fechado aqui: quem ainda o usa continua com ele,
+    # e o mapeamento é liberado quando a última referência desaparecer.
+
+    wordlist = CompiledWordList(path)
+    _COMPILED_CACHE[path] = (mtime, wordlist)
+    return wordlist
+
+
+# Cache dos filtros de Bloom abertos: caminho -> (mtime, BloomFilter).
+_BLOOM_CACHE = {}
+
+
+def load_bloom_filter(filename):
+    """
+    Abre o filtro de Bloom de uma lista de palavras, se ele existir e estiver atualizado.
+
+    Args:
+        filename (str): O caminho da lista de palavras em texto.
+
+    Returns:
+        BloomFilter: O filtro, ou None se ele não existir ou for mais antigo
+        que a lista de palavras.
+    """
+    path = bloom_path(filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        if os.stat(filename).st_mtime_ns > mtime:
+            return None
+    except FileNotFoundError:
+        pass
+
+    cached = _BLOOM_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    # Como em load_compiled_wordlist, o filtro antigo não é fechado aqui.
+
+    bloom = BloomFilter.load(path)
+    _BLOOM_CACHE[path] = (mtime, bloom)
+    return bloom
+
+
+# Cache das tries de palavras: (filename, case_sensitive) -> (mtime, WordTrie).
+_TRIE_CACHE = {}
+
+
+def load_word_trie(filename, case_sensitive=False):
+    """
+    Carrega uma lista de palavras em uma trie, para consultas caractere a caractere.
+
+    Args:
+        filename (str): O caminho para o arquivo.
+        case_sensitive (bool): Se False, as palavras são guardadas em minúsculas.
+
+    Returns:
+        WordTrie: A trie com as palavras do arquivo.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    mtime = os.stat(filename).st_mtime_ns
+    key = (filename, case_sensitive)
+    cached = _TRIE_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(filename, "r", encoding="utf-8") as f:
+        if case_sensitive:
+            trie = WordTrie.from_words(line.strip() for line in f)
+        else:
+            trie = WordTrie.from_words(line.strip().lower() for line in f)
+
+    _TRIE_CACHE[key] = (mtime, trie)
+    return trie
+
+
+# Cache dos autômatos de palavras embutidas: filename -> (mtime, AhoCorasick).
+_AUTOMATON_CACHE = {}
+
+
+def load_embedded_word_automaton(filename=DICTIONARY_FILE):
+    """
+    Carrega o autômato de Aho–Corasick das palavras de uma lista.
+
+    O autômato é guardado em disco ao lado da lista e em memória, e ambos
+    são reconstruídos quando a lista é modificada.
+
+    Args:
+        filename (str): O caminho da lista de palavras.
+
+    Returns:
+        AhoCorasick: O autômato das palavras em minúsculas com pelo menos
+        aho_corasick.DEFAULT_MIN_WORD_LENGTH caracteres.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    mtime = os.stat(filename).st_mtime_ns
+    cached = _AUTOMATON_CACHE.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    automaton = aho_corasick.load_or_build(filename)
+    _AUTOMATON_CACHE[filename] = (mtime, automaton)
+    return automaton
+
+
+def find_embedded_words(password, filename=DICTIONARY_FILE):
+    """
+    Encontra as palavras do dicionário contidas em uma senha (ex: "sunflower2024!").
+
+    Args:
+        password (str): A senha a ser analisada.
+        filename (str): O caminho da lista de palavras.
+
+    Returns:
+        list: Tuplas (posição inicial, palavra em minúsculas); vazia se a
+        lista não existir.
+    """
+    try:
+        automaton = load_embedded_word_automaton(filename)
+    except FileNotFoundError:
+        return []
+    return automaton.find_all(password.lower())
+
+
+def get_word_lookup(filename, case_sensitive=False):
+    """
+    Retorna uma estrutura que responde ao operador "in" para uma lista de palavras.
+
+    Usa o índice compilado mapeado em memória quando disponível e, caso
+    contrário, os conjuntos carregados em memória.
+
+    Args:
+        filename (str): O caminho para o arquivo.
+        case_sensitive (bool): Se a correspondência deve diferenciar maiúsculas de minúsculas.
+
+    Returns:
+        Um objeto que suporta "palavra in objeto". Para consultas que não
+        diferenciam maiúsculas, a palavra deve estar em minúsculas.
+
+    Raises:
+        FileNotFoundError: Se nem a lista nem o índice compilado existirem.
+    """
+    compiled = load_compiled_wordlist(filename, case_sensitive)
+    if compiled is not None:
+        return compiled
+
+    exact_words, lower_words = load_word_sets(filename)
+    return exact_words if case_sensitive else lower_words
+
+
+def word_in_list(word, filename, case_sensitive=False):
+    """
+    Verifica se uma palavra existe em uma lista de palavras, sem imprimir nada.
+
+    Args:
+        word (str): A palavra a ser procurada.
+        filename (str): O caminho para o arquivo.
+        case_sensitive (bool): Se a correspondência deve diferenciar maiúsculas de minúsculas.
+
+    Returns:
+        bool: True se a palavra for encontrada, False caso contrário.
+
+    Raises:
+        FileNotFoundError: Se a lista de palavras não existir.
+    """
+    # O filtro de Bloom descarta rapidamente o caso comum (a palavra não está
+    # na lista) sem tocar na lista completa.
+    bloom = load_bloom_filter(filename)
+    if bloom is not None and word not in bloom:
+        return False
+
+    lookup = get_word_lookup(filename, case_sensitive)
+    if case_sensitive:
+        return word in lookup
+    return word.lower() in lookup
+
 def word_in_file(word, filename, case_sensitive=False):
     """
     Verifica se uma palavra existe em um arquivo de texto.
@@ -29,18 +290,10 @@ def word_in_file(word, filename, case_sensitive=False):
         bool: True se a palavra for encontrada, False caso contrário.
     """
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            for line in f:
-                line_word = line.strip()
-                if case_sensitive:
-                    if word == line_word:
-                        return True
-                else:
-                    if word.lower() == line_word.lower():
-                        return True
+        return word_in_list(word, filename, case_sensitive)
     except FileNotFoundError:
         print(f"Aviso: Arquivo de recurso não encontrado: {filename}")
-    return False
+        return False
 
 def word_has_character(word, character_list):
     """
@@ -53,10 +306,54 @@ def word_has_character(word, character_list):
     Returns:
         bool: True se um caractere for encontrado, False caso contrário.
     """
-    for char in word:
-        if char in character_list:
-            return True
-    return False
+    return not set(character_list).isdisjoint(word)
+
+def scan_password(password):
+    """
+    Classifica uma senha em uma única passagem.
+
+    Calcula ao mesmo tempo as classes de caracteres presentes e se há
+    repetições (ex: 'aaa') ou sequências (ex: 'abc', '321') de 3 caracteres.
+    Três caracteres formam um padrão quando as duas diferenças consecutivas
+    entre seus códigos são iguais a 0, 1 ou -1.
+
+    Args:
+        password (str): A senha a ser analisada.
+
+    Returns:
+        tuple: (complexidade de 0 a 4, True se houver sequência ou repetição).
+    """
+    classes = CHARACTER_CLASSES
+    mask = 0
+    has_pattern = False
+    previous_code = None
+    previous_step = None
+    for char in password:
+        mask |= classes.get(char, 0)
+        code = ord(char)
+        if previous_code is not None:
+            step = code - previous_code
+            if step == previous_step and -1 <= step <= 1:
+                has_pattern = True
+            previous_step = step
+        previous_code = code
+    return _CLASS_COUNT[mask], has_pattern
+
+def scan_passwords(passwords):
+    """
+    Versão em lote de scan_password.
+
+    Args:
+        passwords (iterable): As senhas a serem analisadas.
+
+    Returns:
+        tuple: (array de complexidades, array de indicadores 0/1 de padrão),
+        ambos do tipo array('B') e na mesma ordem das senhas.
+    """
+    results = list(map(scan_password, passwords))
+    complexities = array("B", [complexity for complexity, _ in results])
+    patterns = array("B", [has_pattern for _, has_pattern in results])
+    return complexities, patterns
 
 def word_complexity(word):
     """
@@ -68,16 +365,11 @@ def word_complexity(word):
     Returns:
         int: Uma pontuação de complexidade de 0 a 4.
     """
-    complexity = 0
-    if word_has_character(word, LOWER):
-        complexity += 1
-    if word_has_character(word, UPPER):
-        complexity += 1
-    if word_has_character(word, DIGITS):
-        complexity += 1
-    if word_has_character(word, SPECIAL):
-        complexity += 1
-    return complexity
+    mask = 0
+    classes = CHARACTER_CLASSES
+    for char in set(word):
+        mask |= classes.get(char, 0)
+    return _CLASS_COUNT[mask]
 
 # --- Início do Componente Criativo ---
 def has_sequence_or_repetition(password):
@@ -91,30 +383,62 @@ def has_sequence_or_repetition(password):
     Returns:
         bool: True se um padrão for encontrado, False caso contrário.
     """
-    # Verifica por repetições de 3 caracteres (ex: 'aaa')
-    for i in range(len(password) - 2):
-        if password[i] == password[i+1] == password[i+2]:
-            return True
-    
-    # Verifica por sequências de 3 caracteres (ex: 'abc' ou '321')
-    for i in range(len(password) - 2):
-        try:
-            # Verifica sequência numérica ou alfabética crescente (ex: '123', 'abc')
-            if ord(password[i]) + 1 == ord(password[i+1]) and ord(password[i+1]) + 1 == ord(password[i+2]):
-                return True
-            # Verifica sequência numérica ou alfabética decrescente (ex: '321', 'cba')
-            if ord(password[i]) - 1 == ord(password[i+1]) and ord(password[i+1]) - 1 == ord(password[i+2]):
-                return True
-        except TypeError:
-            # Ignora erros se os caracteres não forem ordenáveis (improvável, mas seguro)
-            continue
-            
-    return False
+    return scan_password(password)[1]
 # --- Fim do Componente Criativo ---
 
-def password_strength(password, min_length=10, strong_length=16):
+class Reason(IntFlag):
+    """Os motivos que determinaram a pontuação de uma senha, combináveis com |."""
+    NONE = 0
+    DICTIONARY_WORD = 1
+    COMMON_PASSWORD = 2
+    TOO_SHORT = 4
+    LONG_PASSWORD = 8
+    SEQUENCE_OR_REPETITION = 16
+    EMBEDDED_WORD = 32
+
+class StrengthResult:
     """
-    Calcula a força de uma senha com base em vários critérios e imprime o feedback.
+    O resultado da avaliação de uma senha.
+
+    Attributes:
+        score (int): A pontuação de força de 0 a 5.
+        reasons (Reason): Os motivos que determinaram a pontuação.
+        complexity (int): A pontuação de complexidade de 0 a 4, ou None se a
+            senha foi pontuada antes da análise de complexidade.
+    """
+    __slots__ = ("score", "reasons", "complexity")
+
+    def __init__(self, score, reasons=Reason.NONE, complexity=None):
+        self.score = score
+        self.reasons = reasons
+        self.complexity = complexity
+
+    def __repr__(self):
+        return f"StrengthResult(score={self.score}, reasons={self.reasons!r}, complexity={self.complexity})"
+
+    def __eq__(self, other):
+        if not isinstance(other, StrengthResult):
+            return NotImplemented
+        return (self.score, self.reasons, self.complexity) == (other.score, other.reasons, other.complexity)
+
+def _in_optional_list(word, filename, case_sensitive):
+    """Como word_in_list, mas uma lista ausente é tratada como vazia."""
+    try:
+        return word_in_list(word, filename, case_sensitive)
+    except FileNotFoundError:
+        return False
+
+def _has_embedded_word(password):
+    """Retorna True se a senha contém alguma palavra do dicionário."""
+    try:
+        automaton = load_embedded_word_automaton(DICTIONARY_FILE)
+    except FileNotFoundError:
+        return False
+    return automaton.contains_any(password.lower())
+
+def evaluate_password(password, min_length=10, strong_length=16):
+    """
+    Calcula a força de uma senha sem imprimir nada.
 
     Args:
         password (str): A senha a ser avaliada.
@@ -122,35 +446,78 @@ def password_strength(password, min_length=10, strong_length=16):
         strong_length (int): O comprimento no qual a senha é considerada forte.
 
     Returns:
-        int: Uma pontuação de força de 0 a 5.
+        StrengthResult: A pontuação, os motivos e a complexidade da senha.
     """
-    if word_in_file(password, DICTIONARY_FILE, case_sensitive=False):
-        print("A senha é uma palavra do dicionário e não é segura.")
-        return 0
+    if _in_optional_list(password, DICTIONARY_FILE, case_sensitive=False):
+        return StrengthResult(0, Reason.DICTIONARY_WORD)
 
-    if word_in_file(password, COMMON_PASSWORDS_FILE, case_sensitive=True):
-        print("A senha é uma senha comumente usada e não é segura.")
-        return 0
+    if _in_optional_list(password, COMMON_PASSWORDS_FILE, case_sensitive=True):
+        return StrengthResult(0, Reason.COMMON_PASSWORD)
 
     if len(password) < min_length:
-        print("A senha é muito curta e não é segura.")
-        return 1
-        
+        return StrengthResult(1, Reason.TOO_SHORT)
+
     if len(password) >= strong_length:
-        print("A senha é longa, o comprimento supera a complexidade. Esta é uma boa senha.")
-        return 5
+        return StrengthResult(5, Reason.LONG_PASSWORD)
 
-    complexity = word_complexity(password)
+    complexity, has_pattern = scan_password(password)
     strength = 1 + complexity
-    
+    reasons = Reason.NONE
+
     # --- Aplicação da Penalidade do Componente Criativo ---
     # Se uma sequência ou repetição for encontrada, uma penalidade é aplicada à pontuação.
-    if has_sequence_or_repetition(password):
-        print("Aviso: A senha contém caracteres sequenciais ou repetidos, o que a enfraquece.")
+    if has_pattern:
         strength = max(1, strength - 1) # Reduz a força em 1, mas não abaixo de 1
-    
-    print(f"A senha tem uma pontuação de complexidade de {complexity} e uma força de {strength}.")
-    return strength
+        reasons |= Reason.SEQUENCE_OR_REPETITION
+
+    # Uma palavra do dicionário embutida na senha também a enfraquece.
+    if _has_embedded_word(password):
+        strength = max(1, strength - 1)
+        reasons |= Reason.EMBEDDED_WORD
+
+    return StrengthResult(strength, reasons, complexity)
+
+# Mensagens exibidas ao usuário para cada motivo.
+REASON_MESSAGES = {
+    Reason.DICTIONARY_WORD: "A senha é uma palavra do dicionário e não é segura.",
+    Reason.COMMON_PASSWORD: "A senha é uma senha comumente usada e não é segura.",
+    Reason.TOO_SHORT: "A senha é muito curta e não é segura.",
+    Reason.LONG_PASSWORD: "A senha é longa, o comprimento supera a complexidade. Esta é uma boa senha.",
+    Reason.SEQUENCE_OR_REPETITION: "Aviso: A senha contém caracteres sequenciais ou repetidos, o que a enfraquece.",
+    Reason.EMBEDDED_WORD: "Aviso: A senha contém uma palavra do dicionário, o que a enfraquece.",
+}
+
+def describe_result(result):
+    """
+    Converte um resultado nas mensagens de feedback para o usuário.
+
+    Args:
+        result (StrengthResult): O resultado de evaluate_password.
+
+    Returns:
+        list: As mensagens, na ordem em que devem ser exibidas.
+    """
+    messages = [message for reason, message in REASON_MESSAGES.items() if reason in result.reasons]
+    if result.complexity is not None:
+        messages.append(f"A senha tem uma pontuação de complexidade de {result.complexity} e uma força de {result.score}.")
+    return messages
+
+def password_strength(password, min_length=10, strong_length=16):
+    """
+    Calcula a força de uma senha com base em vários critérios e imprime o feedback.
+
+    Args:
+        password (str): A senha a ser avaliada.
+        min_length (int): O comprimento mínimo aceitável da senha.
+        strong_length (int): O comprimento no qual a senha é considerada forte.
+
+    Returns:
+        int: Uma pontuação de força de 0 a 5.
+    """
+    result = evaluate_password(password, min_length, strong_length)
+    for message in describe_result(result):
+        print(message)
+    return result.score
 
 def main():
     """
@@ -158,6 +525,9 @@ def main():
     """
     print("--- Verificador de Força de Senha ---")
     print("Digite 'q' ou 'Q' para sair.")
+    for filename in (DICTIONARY_FILE, COMMON_PASSWORDS_FILE):
+        if not os.path.exists(filename):
+            print(f"Aviso: Arquivo de recurso não encontrado: {filename}")
     
     while True:
         password = input("\nDigite uma senha para testar: ")
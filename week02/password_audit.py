@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import password
+
+# Quantidade padrão de senhas enviadas de uma vez para cada processo.
+DEFAULT_CHUNK_SIZE = 5000
+
+# Formatos de relatório suportados.
+REPORT_FORMATS = ("csv", "jsonl")
+
+
+def read_passwords(stream):
+    """
+    Lê as senhas de um arquivo, uma por linha, sem carregar o arquivo inteiro.
+
+    Args:
+        stream: Um objeto de arquivo de texto aberto para leitura.
+
+    Yields:
+        str: Cada senha, sem a quebra de linha final.
+    """
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def make_chunks(passwords, chunk_size):
+    """
+    Agrupa as senhas em listas de no máximo chunk_size elementos.
+
+    Args:
+        passwords: Um iterável de senhas.
+        chunk_size (int): O tamanho máximo de cada bloco.
+
+    Yields:
+        list: Um bloco de senhas.
+    """
+    iterator = iter(passwords)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def init_worker():
+    """Pré-carrega as listas de palavras uma vez em cada processo."""
+    lookups = ((password.DICTIONARY_FILE, False), (password.COMMON_PASSWORDS_FILE, True))
+    for filename, case_sensitive in lookups:
+        try:
+            password.get_word_lookup(filename, case_sensitive)
+        except FileNotFoundError:
+            pass
+    try:
+        password.load_embedded_word_automaton()
+    except FileNotFoundError:
+        pass
+
+
+def score_chunk(chunk):
+    """
+    Calcula a força de cada senha de um bloco.
+
+    Args:
+        chunk (list): As senhas a serem avaliadas.
+
+    Returns:
+        list: Uma lista de tuplas (senha, força).
+    """
+    evaluate = password.evaluate_password
+    return [(word, evaluate(word).score) for word in chunk]
+
+
+def score_chunks(chunks, workers):
+    """
+    Distribui os blocos entre um pool de processos, mantendo a ordem de entrada.
+
+    Apenas alguns blocos ficam em andamento ao mesmo tempo, de modo que a
+    memória usada não depende do tamanho da entrada.
+
+    Args:
+        chunks: Um iterável de blocos de senhas.
+        workers (int): O número de processos.
+
+    Yields:
+        list: Os resultados de cada bloco, na ordem original.
+    """
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(score_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_report(results, output, report_format):
+    """
+    Escreve os resultados no relatório à medida que são produzidos.
+
+    Args:
+        results: Um iterável de blocos de tuplas (senha, força).
+        output: Um objeto de arquivo de texto aberto para escrita.
+        report_format (str): "csv" ou "jsonl".
+
+    Returns:
+        int: O número de senhas escritas.
+    """
+    count = 0
+    if report_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(["password", "strength"])
+        for chunk in results:
+            writer.writerows(chunk)
+            count += len(chunk)
+    else:
+        for chunk in results:
+            for word, strength in chunk:
+                output.write(json.dumps({"password": word, "strength": strength}))
+                output.write("\n")
+            count += len(chunk)
+    return count
+
+
+def audit(stream, output, report_format="csv", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Avalia todas as senhas de stream e escreve o relatório em output.
+
+    Args:
+        stream: O arquivo de entrada, com uma senha por linha.
+        output: O arquivo onde o relatório será escrito.
+        report_format (str): "csv" ou "jsonl".
+        workers (int): O número de processos (padrão: número de CPUs).
+        chunk_size (int): Quantas senhas cada processo recebe de uma vez.
+
+    Returns:
+        tuple: (número de senhas avaliadas, tempo decorrido em segundos).
+
+    Raises:
+        ValueError: Se workers ou chunk_size não forem positivos.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"O número de processos deve ser positivo: {workers}")
+    if chunk_size < 1:
+        raise ValueError(f"O tamanho do bloco deve ser positivo: {chunk_size}")
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    chunks = make_chunks(read_passwords(stream), chunk_size)
+    count = write_report(score_chunks(chunks, workers), output, report_format)
+    elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def main(argv=None):
+    """
+    Executa a auditoria em lote a partir da linha de comando.
+    """
+    parser = argparse.ArgumentParser(description="Auditoria em lote da força de senhas.")
+    parser.add_argument("input", help="arquivo com uma senha por linha ('-' para stdin)")
+    parser.add_argument("-o", "--output", default="-", help="arquivo do relatório ('-' para stdout)")
+    parser.add_argument("-f", "--format", choices=REPORT_FORMATS, default="csv")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-c", "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error(f"--workers deve ser positivo: {args.workers}")
+    if args.chunk_size < 1:
+        parser.error(f"--chunk-size deve ser positivo: {args.chunk_size}")
+
+    with contextlib.ExitStack() as stack:
+        if args.input == "-":
+            stream = sys.stdin
+        else:
+            stream = stack.enter_context(open(args.input, "r", encoding="utf-8", errors="replace"))
+        if args.output == "-":
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+
+        count, elapsed = audit(stream, output, args.format, args.workers, args.chunk_size)
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{count} senhas avaliadas em {elapsed:.2f} s ({rate:,.0f} senhas/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import random
+import string
+import sys
+import timeit
+from collections import Counter
+
+import password
+
+# Alfabeto usado para gerar senhas sintéticas nos benchmarks.
+ALPHABET = string.ascii_letters + string.digits + "".join(password.SPECIAL)
+
+
+def make_passwords(count, seed=0, min_length=6, max_length=20):
+    """Gera senhas aleatórias reprodutíveis para os benchmarks."""
+    rng = random.Random(seed)
+    return ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(min_length, max_length)))
+            for _ in range(count)]
+
+
+# --- Implementações de referência (as versões originais com várias passagens) ---
+
+def reference_word_complexity(word):
+    """word_complexity original: uma passagem por classe, com busca em listas."""
+    complexity = 0
+    for character_list in (password.LOWER, password.UPPER, password.DIGITS, password.SPECIAL):
+        for char in word:
+            if char in character_list:
+                complexity += 1
+                break
+    return complexity
+
+
+def reference_has_sequence_or_repetition(word):
+    """has_sequence_or_repetition original: duas passagens com chamadas repetidas a ord()."""
+    for i in range(len(word) - 2):
+        if word[i] == word[i+1] == word[i+2]:
+            return True
+    for i in range(len(word) - 2):
+        if ord(word[i]) + 1 == ord(word[i+1]) and ord(word[i+1]) + 1 == ord(word[i+2]):
+            return True
+        if ord(word[i]) - 1 == ord(word[i+1]) and ord(word[i+1]) - 1 == ord(word[i+2]):
+            return True
+    return False
+
+
+def bench_scanner(count=20000, repeat=5):
+    """
+    Compara o classificador de passagem única com as funções originais.
+
+    Returns:
+        dict: O melhor tempo, em segundos, de cada variante.
+    """
+    words = make_passwords(count)
+
+    variants = {
+        "referência (várias passagens)": lambda: [
+            (reference_word_complexity(w), reference_has_sequence_or_repetition(w)) for w in words],
+        "scan_password": lambda: [password.scan_password(w) for w in words],
+        "scan_passwords (lote)": lambda: password.scan_passwords(words),
+    }
+    return {name: min(timeit.repeat(function, number=1, repeat=repeat))
+            for name, function in variants.items()}
+
+
+def make_mixed_passwords(count, seed=0):
+    """
+    Gera uma mistura de senhas aleatórias, palavras do dicionário e palavras
+    com números e símbolos, para comparar as distribuições de pontuação.
+    """
+    rng = random.Random(seed)
+    with open(password.DICTIONARY_FILE, "r", encoding="utf-8") as f:
+        words = [line.strip() for line in f if line.strip()]
+    randoms = make_passwords(count, seed)
+    mixed = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            mixed.append(randoms[i])
+        elif kind == 1:
+            mixed.append(rng.choice(words))
+        else:
+            word = rng.choice(words)
+            mixed.append(word.capitalize() + str(rng.randint(0, 9999)) + rng.choice(password.SPECIAL))
+    return mixed
+
+
+def bench_entropy(count=20000, repeat=3):
+    """
+    Compara o estimador de entropia com as regras atuais.
+
+    Returns:
+        tuple: (tempos de cada variante, distribuição das pontuações de cada variante).
+    """
+    import password_entropy
+
+    words = make_mixed_passwords(count)
+    model = password_entropy.get_model()
+    evaluate = password.evaluate_password
+    entropy_score = password_entropy.entropy_score
+    estimate = password_entropy.estimate_entropy
+
+    variants = {
+        "regras (evaluate_password)": lambda: [evaluate(w).score for w in words],
+        "entropia de n-gramas": lambda: [entropy_score(model.entropy(w)) for w in words],
+        "entropia + dicionário": lambda: [entropy_score(estimate(w)) for w in words],
+    }
+    timings = {name: min(timeit.repeat(function, number=1, repeat=repeat))
+               for name, function in variants.items()}
+    distributions = {name: Counter(function()) for name, function in variants.items()}
+    return timings, distributions
+
+
+def print_distributions(distributions):
+    """Imprime quantas senhas receberam cada pontuação em cada variante."""
+    print("  Distribuição das pontuações:")
+    print("  " + " " * 32 + "".join(f"{score:>8}" for score in range(6)))
+    for name, counter in distributions.items():
+        print(f"  {name:<32}" + "".join(f"{counter.get(score, 0):>8}" for score in range(6)))
+
+
+def print_results(title, count, results):
+    """Imprime os tempos de um benchmark relativos à primeira variante."""
+    print(f"{title} ({count} senhas)")
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        print(f"  {name:<32} {seconds * 1e6 / count:8.2f} µs/senha  {baseline / seconds:5.2f}x")
+
+
+def main():
+    """
+    Executa os microbenchmarks.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print_results("Classificador de caracteres", count, bench_scanner(count))
+    print()
+    timings, distributions = bench_entropy(count)
+    print_results("Entropia de n-gramas vs. regras", count, timings)
+    print_distributions(distributions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import math
+import os
+import struct
+import sys
+from array import array
+
+import password
+
+# Símbolos do modelo: 0 é o marcador de início, 1 a 95 são os caracteres
+# ASCII imprimíveis (espaço a '~') e 96 representa qualquer outro caractere.
+START = 0
+FIRST_PRINTABLE = 32
+LAST_PRINTABLE = 126
+OTHER = LAST_PRINTABLE - FIRST_PRINTABLE + 2
+SYMBOL_COUNT = OTHER + 1
+
+# Ordem do modelo: cada caractere é previsto pelos ORDER - 1 anteriores.
+ORDER = 3
+
+# Suavização aditiva das contagens (trigramas nunca vistos não têm probabilidade zero).
+SMOOTHING = 0.5
+
+# O modelo é treinado em minúsculas; cada letra maiúscula acrescenta este custo.
+UPPERCASE_BITS = 1.0
+
+# Limites de entropia (em bits) para as pontuações 1 a 5.
+ENTROPY_THRESHOLDS = (20, 30, 40, 50, 60)
+
+# Formato do arquivo (cabeçalho little-endian; tabela na ordem de bytes da máquina):
+#   cabeçalho: MAGIC, mtime da lista de origem (ns), ordem, número de símbolos
+#   dados: SYMBOL_COUNT ** ORDER floats de 32 bits com o custo em bits de cada n-grama
+MAGIC = b"NGRAM001"
+HEADER = struct.Struct("<8sqII")
+TABLE_SUFFIX = ".ngram"
+
+
+def symbol_index(char):
+    """Converte um caractere (já em minúsculas) no índice do seu símbolo."""
+    code = ord(char)
+    if FIRST_PRINTABLE <= code <= LAST_PRINTABLE:
+        return code - FIRST_PRINTABLE + 1
+    return OTHER
+
+
+class NgramModel:
+    """
+    Um modelo de n-gramas de caracteres guardado como uma tabela plana de custos.
+
+    cost[((a * SYMBOL_COUNT) + b) * SYMBOL_COUNT + c] é -log2 P(c | a, b), de
+    modo que estimar a entropia de uma senha é uma soma de consultas à tabela.
+    """
+
+    def __init__(self, costs):
+        if len(costs) != SYMBOL_COUNT ** ORDER:
+            raise ValueError("Tabela de n-gramas com tamanho inválido.")
+        self.costs = costs
+
+    @classmethod
+    def from_words(cls, words):
+        """Treina o modelo contando os trigramas das palavras."""
+        size = SYMBOL_COUNT ** ORDER
+        counts = array("I", [0]) * size
+        for word in words:
+            a = b = START
+            for char in word:
+                c = symbol_index(char)
+                counts[(a * SYMBOL_COUNT + b) * SYMBOL_COUNT + c] += 1
+                a, b = b, c
+
+        # Cada contexto (a, b) ocupa SYMBOL_COUNT posições consecutivas.
+        costs = array("f", bytes(4 * size))
+        denominator_extra = SMOOTHING * (SYMBOL_COUNT - 1)
+        for context_start in range(0, size, SYMBOL_COUNT):
+            row = counts[context_start:context_start + SYMBOL_COUNT]
+            total = sum(row) + denominator_extra
+            for c in range(1, SYMBOL_COUNT):
+                costs[context_start + c] = -math.log2((row[c] + SMOOTHING) / total)
+        return cls(costs)
+
+    def char_costs(self, word):
+        """
+        Retorna o custo em bits de cada caractere da senha, como em entropy().
+
+        Returns:
+            list: Um custo por caractere, já incluindo o das maiúsculas.
+        """
+        costs = self.costs
+        result = []
+        a = b = START
+        for char in word:
+            lower = char.lower()
+            c = symbol_index(lower[0])
+            result.append(costs[(a * SYMBOL_COUNT + b) * SYMBOL_COUNT + c]
+                          + (UPPERCASE_BITS if lower != char else 0.0))
+            a, b = b, c
+        return result
+
+    def entropy(self, word):
+        """
+        Estima a entropia de uma senha, em bits, em tempo linear.
+
+        Args:
+            word (str): A senha.
+
+        Returns:
+            float: A soma dos custos dos trigramas mais o custo das maiúsculas.
+        """
+        costs = self.costs
+        bits = 0.0
+        a = b = START
+        for char in word:
+            lower = char.lower()
+            if lower != char:
+                bits += UPPERCASE_BITS
+            c = symbol_index(lower[0])
+            bits += costs[(a * SYMBOL_COUNT + b) * SYMBOL_COUNT + c]
+            a, b = b, c
+        return bits
+
+    def save(self, path, source_mtime):
+        """Grava a tabela em disco, de forma atômica."""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, source_mtime, ORDER, SYMBOL_COUNT))
+            self.costs.tofile(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Lê uma tabela gravada com save().
+
+        Returns:
+            tuple: (NgramModel, mtime da lista de origem).
+
+        Raises:
+            ValueError: Se o arquivo não for uma tabela compatível.
+        """
+        with open(path, "rb") as f:
+            magic, source_mtime, order, symbol_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or order != ORDER or symbol_count != SYMBOL_COUNT:
+                raise ValueError(f"Tabela de n-gramas inválida: {path}")
+            costs = array("f")
+            try:
+                costs.fromfile(f, SYMBOL_COUNT ** ORDER)
+            except EOFError:
+                raise ValueError(f"Tabela de n-gramas incompleta: {path}")
+        return cls(costs), source_mtime
+
+
+def load_or_build(filename=password.DICTIONARY_FILE):
+    """
+    Retorna o modelo treinado com uma lista de palavras.
+
+    Usa a tabela gravada ao lado da lista se ela corresponder à versão atual
+    da lista; caso contrário, treina o modelo e grava a tabela.
+
+    Raises:
+        FileNotFoundError: Se a lista de palavras não existir.
+    """
+    source_mtime = os.stat(filename).st_mtime_ns
+    path = filename + TABLE_SUFFIX
+    try:
+        model, cached_mtime = NgramModel.load(path)
+        if cached_mtime == source_mtime:
+            return model
+    except (FileNotFoundError, ValueError):
+        pass
+
+    with open(filename, "r", encoding="utf-8") as f:
+        model = NgramModel.from_words(line.strip().lower() for line in f)
+    try:
+        model.save(path, source_mtime)
+    except OSError:
+        pass
+    return model
+
+
+# Cache do modelo em memória: filename -> (mtime, NgramModel).
+_MODEL_CACHE = {}
+
+
+def get_model(filename=password.DICTIONARY_FILE):
+    """Retorna o modelo de uma lista de palavras, carregado uma vez por processo."""
+    mtime = os.stat(filename).st_mtime_ns
+    cached = _MODEL_CACHE.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    model = load_or_build(filename)
+    _MODEL_CACHE[filename] = (mtime, model)
+    return model
+
+
+def _list_bits(filename, case_sensitive):
+    """Retorna o custo em bits de escolher uma palavra de uma lista, e a própria lista."""
+    try:
+        lookup = password.get_word_lookup(filename, case_sensitive)
+    except FileNotFoundError:
+        return None, None
+    return math.log2(max(2, len(lookup))), lookup
+
+
+def estimate_entropy(word, filename=password.DICTIONARY_FILE):
+    """
+    Estima a entropia de uma senha, em bits, com o modelo de n-gramas e o dicionário.
+
+    O modelo sozinho dá a uma palavra comum a soma dos custos dos seus
+    caracteres; um atacante, porém, a escolhe da lista de uma vez. Por isso
+    uma senha da lista de senhas comuns ou do dicionário custa apenas
+    log2(tamanho da lista) bits, e cada palavra do dicionário embutida na
+    senha (ex: "sunflower" em "Sunflower2024!") é cobrada como uma escolha
+    na lista, mais o custo das suas maiúsculas, quando isso for mais barato
+    que os seus caracteres.
+
+    Args:
+        word (str): A senha.
+        filename (str): A lista de palavras usada para treinar o modelo.
+
+    Returns:
+        float: A entropia estimada em bits.
+    """
+    costs = get_model(filename).char_costs(word)
+
+    common_bits, common = _list_bits(password.COMMON_PASSWORDS_FILE, True)
+    if common is not None and word in common:
+        return common_bits
+    word_bits, dictionary = _list_bits(filename, False)
+    if dictionary is None:
+        return sum(costs)
+    uppercase = [UPPERCASE_BITS if char.lower() != char else 0.0 for char in word]
+    if word.lower() in dictionary:
+        return word_bits + sum(uppercase)
+
+    # best[i] é o menor custo dos i primeiros caracteres; as palavras
+    # embutidas chegam em ordem de posição final.
+    best = [0.0] * (len(word) + 1)
+    matches = iter(password.find_embedded_words(word, filename))
+    match = next(matches, None)
+    for end in range(1, len(word) + 1):
+        best[end] = best[end - 1] + costs[end - 1]
+        while match is not None and match[0] + len(match[1]) == end:
+            start = match[0]
+            best[end] = min(best[end], best[start] + word_bits + sum(uppercase[start:end]))
+            match = next(matches, None)
+    return best[-1]
+
+
+def entropy_score(bits):
+    """
+    Converte uma entropia em bits em uma pontuação de 0 a 5.
+
+    A pontuação não é intercambiável com a de password.evaluate_password:
+    as regras zeram qualquer palavra do dicionário e limitam as senhas pelo
+    comprimento e pelas classes de caracteres, enquanto esta escala só mede
+    quantos palpites a senha custa. As duas concordam nos extremos, mas uma
+    senha curta e aleatória pode ter mais bits que uma longa e previsível.
+
+    Args:
+        bits (float): A entropia estimada.
+
+    Returns:
+        int: O número de limites de ENTROPY_THRESHOLDS atingidos.
+    """
+    return sum(1 for threshold in ENTROPY_THRESHOLDS if bits >= threshold)
+
+
+def main():
+    """
+    Mostra a entropia estimada das senhas digitadas ou passadas como argumentos.
+    """
+    words = sys.argv[1:] or [input("Digite uma senha: ")]
+    for word in words:
+        bits = estimate_entropy(word)
+        print(f"{word}: {bits:.1f} bits, pontuação {entropy_score(bits)}/5")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import tkinter as tk
+from tkinter import Frame, Label, Entry, Button
+
+from incremental_strength import IncrementalStrength
+from password import describe_result
+
+
+def main():
+    # Cria o objeto raiz do Tk e a janela principal.
+    root = tk.Tk()
+    frm_main = Frame(root)
+    frm_main.master.title("Medidor de Força de Senha")
+    frm_main.pack(padx=4, pady=3, fill=tk.BOTH, expand=1)
+
+    populate_main_window(frm_main)
+
+    root.mainloop()
+
+
+def populate_main_window(frm_main):
+    """Coloca os rótulos, a caixa de texto e o botão na janela principal.
+
+    Parâmetro
+        frm_main: a janela principal
+    Retorna: nada
+    """
+    lbl_password = Label(frm_main, text="Senha:")
+    ent_password = Entry(frm_main, width=30, show="*")
+    lbl_strength = Label(frm_main, text="Força:")
+    lbl_score = Label(frm_main, width=4)
+    lbl_feedback = Label(frm_main, width=60, anchor="w", justify="left")
+    btn_clear = Button(frm_main, text="Limpar")
+
+    lbl_password.grid(row=0, column=0, padx=3, pady=3)
+    ent_password.grid(row=0, column=1, padx=3, pady=3, sticky="w")
+    lbl_strength.grid(row=1, column=0, padx=3, pady=3)
+    lbl_score.grid(   row=1, column=1, padx=3, pady=3, sticky="w")
+    lbl_feedback.grid(row=2, column=0, padx=3, pady=3, columnspan=2, sticky="w")
+    btn_clear.grid(   row=3, column=0, padx=3, pady=3, columnspan=2, sticky="w")
+
+    # O avaliador guarda o estado entre as teclas, então cada tecla custa
+    # apenas os caracteres que mudaram, e não uma nova avaliação completa.
+    evaluator = IncrementalStrength()
+
+    # Esta função é chamada cada vez que o usuário solta uma tecla.
+    def calculate(event):
+        """Atualiza a força exibida para o texto atual."""
+        evaluator.set_text(ent_password.get())
+        if not len(evaluator):
+            lbl_score.config(text="")
+            lbl_feedback.config(text="")
+            return
+        result = evaluator.result()
+        lbl_score.config(text=f"{result.score}/5")
+        lbl_feedback.config(text="\n".join(describe_result(result)))
+
+    # Esta função é chamada quando o usuário clica no botão "Limpar".
+    def clear():
+        """Limpa a entrada e os resultados."""
+        ent_password.delete(0, tk.END)
+        evaluator.clear()
+        lbl_score.config(text="")
+        lbl_feedback.config(text="")
+        ent_password.focus()
+
+    ent_password.bind("<KeyRelease>", calculate)
+    btn_clear.config(command=clear)
+    ent_password.focus()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import password
+from password_audit import init_worker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8111
+
+# Quantidade de resultados recentes mantidos no cache LRU.
+DEFAULT_CACHE_SIZE = 10000
+
+# Quantidade de latências recentes usadas no cálculo dos percentis.
+LATENCY_WINDOW = 10000
+
+# Tamanho máximo do corpo de um pedido, em bytes.
+MAX_BODY_SIZE = 1 << 16
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def score_password(word):
+    """Calcula a força de uma senha; executada nos processos do pool."""
+    return password.evaluate_password(word).score
+
+
+def password_key(word):
+    """Retorna a chave do cache para uma senha, sem guardar a senha em texto puro."""
+    return hashlib.sha256(word.encode("utf-8", errors="surrogatepass")).digest()
+
+
+class ResultCache:
+    """Um cache LRU simples de resultados, com contadores de acertos e falhas."""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """Retorna o valor guardado para key, ou None."""
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Guarda um valor, removendo o menos usado recentemente se necessário."""
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def stats(self):
+        """Retorna as métricas do cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def parse_content_length(headers, max_size=MAX_BODY_SIZE):
+    """Retorna o tamanho do corpo indicado pelo cabeçalho Content-Length.
+    Lança ValueError se o valor não for um inteiro entre 0 e max_size.
+    """
+    value = headers.get("content-length", "").strip()
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"Content-Length inválido: {value!r}")
+    length = int(value)
+    if length > max_size:
+        raise ValueError(f"corpo maior que {max_size} bytes")
+    return length
+
+
+def percentile(sorted_values, fraction):
+    """Retorna o percentil (pelo método do posto mais próximo) de valores já ordenados."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class PasswordService:
+    """
+    Serviço HTTP/JSON local que avalia senhas.
+
+    Rotas:
+        POST /strength  corpo {"password": "..."}  -> {"strength": n, "cached": bool}
+        GET  /metrics   -> latências (ms) e métricas do cache
+    """
+
+    def __init__(self, workers=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.cache = ResultCache(cache_size)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self._workers = workers
+        self._executor = None
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Inicia o pool de processos (com as listas pré-carregadas) e o servidor."""
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, initializer=init_worker)
+        # Força a criação dos processos, e o carregamento das listas, antes do primeiro pedido.
+        await asyncio.get_running_loop().run_in_executor(self._executor, score_password, "")
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Encerra o servidor e o pool de processos."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def strength(self, word):
+        """Retorna (força, veio_do_cache) para uma senha."""
+        key = password_key(word)
+        strength = self.cache.get(key)
+        if strength is not None:
+            return strength, True
+        loop = asyncio.get_running_loop()
+        strength = await loop.run_in_executor(self._executor, score_password, word)
+        self.cache.put(key, strength)
+        return strength, False
+
+    def metrics(self):
+        """Retorna os percentis de latência e as métricas do cache."""
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "cache": self.cache.stats(),
+        }
+
+    async def _route(self, method, path, body):
+        """Despacha um pedido e retorna (status, objeto JSON)."""
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.metrics()
+        if path == "/strength":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                word = json.loads(body)["password"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": 'o corpo deve ser {"password": "..."}'}
+            if not isinstance(word, str):
+                return 400, {"error": "password deve ser uma string"}
+            start = time.perf_counter()
+            strength, cached = await self.strength(word)
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            self.requests += 1
+            return 200, {"strength": strength, "cached": cached}
+        return 404, {"error": f"rota desconhecida: {path}"}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        """Envia uma resposta JSON e espera o cliente recebê-la."""
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        """Atende os pedidos HTTP/1.1 de uma conexão até que ela seja fechada."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = parse_content_length(headers)
+                except ValueError as e:
+                    # Sem um tamanho válido não dá para saber onde o corpo termina.
+                    await self._respond(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def request_json(host, port, method, path, payload=None):
+    """
+    Cliente mínimo: envia um pedido ao serviço local e retorna (status, JSON).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    writer.close()
+    await writer.wait_closed()
+    return status, json.loads(data)
+
+
+async def run_server(host, port, workers, cache_size):
+    service = PasswordService(workers, cache_size)
+    address = await service.start(host, port)
+    print(f"Serviço de senhas em http://{address[0]}:{address[1]}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    """
+    Inicia o serviço HTTP de avaliação de senhas.
+    """
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de força de senhas.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_server(args.host, args.port, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+from array import array
+
+from password import evaluate_password, load_word_sets, get_word_lookup, word_in_list, \
+    load_compiled_wordlist, load_bloom_filter, scan_password, scan_passwords, word_complexity, \
+    has_sequence_or_repetition
+from password_audit import audit, main as audit_main, REPORT_FORMATS
+from compiled_wordlist import CompiledWordList, compile_wordlist, compiled_path
+from bloom_filter import BloomFilter, build_bloom_filter, bloom_path
+from aho_corasick import AhoCorasick
+from incremental_strength import IncrementalStrength
+from password_service import PasswordService, request_json, percentile
+from password_bench import make_passwords, reference_word_complexity, \
+    reference_has_sequence_or_repetition
+from password_entropy import estimate_entropy, entropy_score, get_model
+import pytest
+
+PASSWORDS = ["sunflower", "Sunflower2024!", "abc", "aaaaaaaaaaaa", "Tr0ub4dor&3x",
+             "correct horse battery staple", "qwertyuiop", "xK9#mP2$vL", "", "pássaro-Azul-7"]
+
+WORDS = ["alpha", "Beta", "gamma", "delta", "épsilon", "zeta", "eta", "theta9", "iota", "kappa"]
+
+
+def write_wordlist(filename, words):
+    """Write a word list with one word per line."""
+    with open(filename, "wt", encoding="utf-8") as f:
+        f.write("\n".join(words) + "\n")
+
+
+def test_word_sets_reload_when_file_changes(tmp_path):
+    """Verify that the cached word sets are rebuilt when the word list's mtime changes."""
+    source = str(tmp_path / "words.txt")
+    write_wordlist(source, WORDS)
+    exact_words, lower_words = load_word_sets(source)
+    assert load_word_sets(source)[0] is exact_words
+    assert not word_in_list("Omega", source, case_sensitive=True)
+    assert not word_in_list("OMEGA", source, case_sensitive=False)
+
+    write_wordlist(source, WORDS + ["Omega"])
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert word_in_list("Omega", source, case_sensitive=True)
+    assert not word_in_list("omega", source, case_sensitive=True)
+    assert word_in_list("OMEGA", source, case_sensitive=False)
+    assert "Omega" in get_word_lookup(source, case_sensitive=True)
+    assert "omega" in get_word_lookup(source, case_sensitive=False)
+    assert load_word_sets(source)[0] is not exact_words
+
+
+def test_audit_reports():
+    """Verify that the CSV and JSONL audit reports match evaluate_password, in input order."""
+    expected = [(word, evaluate_password(word).score) for word in PASSWORDS]
+    source = "\n".join(PASSWORDS) + "\n"
+
+    reports = {}
+    for report_format in REPORT_FORMATS:
+        for workers in (1, 2):
+            output = io.StringIO()
+            count, _ = audit(io.StringIO(source), output, report_format, workers=workers, chunk_size=3)
+            assert count == len(PASSWORDS)
+            reports[report_format, workers] = output.getvalue()
+        # The pool writes the same report as a single worker.
+        assert reports[report_format, 1] == reports[report_format, 2]
+
+    rows = list(csv.reader(io.StringIO(reports["csv", 2])))
+    assert rows[0] == ["password", "strength"]
+    assert [(word, int(strength)) for word, strength in rows[1:]] == expected
+    records = [json.loads(line) for line in reports["jsonl", 2].splitlines()]
+    assert [(record["password"], record["strength"]) for record in records] == expected
+
+    # An empty stream gives an empty report.
+    output = io.StringIO()
+    assert audit(io.StringIO(""), output, "csv", workers=1)[0] == 0
+    assert output.getvalue().splitlines() == ["password,strength"]
+
+
+def test_audit_rejects_bad_settings():
+    """Verify that a non-positive chunk size or worker count is an error, not an empty report."""
+    for settings in ({"chunk_size": 0}, {"chunk_size": -1}, {"workers": 0}):
+        with pytest.raises(ValueError):
+            audit(io.StringIO("abc\n"), io.StringIO(), "csv", **settings)
+    for argv in (["-", "--chunk-size", "0"], ["-", "--workers", "-2"]):
+        with pytest.raises(SystemExit):
+            audit_main(argv)
+
+
+def test_compiled_wordlist(tmp_path):
+    """Verify compiled word list lookups against the plain word list."""
+    source = str(tmp_path / "words.txt")
+    write_wordlist(source, WORDS)
+    queries = WORDS + [word.lower() for word in WORDS] + [word.upper() for word in WORDS] + \
+        ["", "alph", "alphas", "omega", "beta ", "Épsilon"]
+
+    for case_sensitive in (True, False):
+        destination = compiled_path(source, case_sensitive)
+        assert compile_wordlist(source, destination, lowercase=not case_sensitive) == len(WORDS)
+        words = set(WORDS) if case_sensitive else {word.lower() for word in WORDS}
+        wordlist = CompiledWordList(destination)
+        assert len(wordlist) == len(words)
+        for query in queries:
+            assert (query in wordlist) == (query in words), query
+
+
+def test_reloaded_wordlist_stays_usable(tmp_path):
+    """Verify that a compiled word list handed out before a reload keeps working afterwards."""
+    source = str(tmp_path / "words.txt")
+    write_wordlist(source, WORDS)
+    destination = compiled_path(source, True)
+    compile_wordlist(source, destination)
+    wordlist = load_compiled_wordlist(source, True)
+
+    stat = os.stat(destination)
+    os.utime(destination, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert load_compiled_wordlist(source, True) is not wordlist
+    assert "alpha" in wordlist
+
+
+def test_bloom_filter(tmp_path):
+    """Verify that the Bloom filter has no false negatives and few false positives."""
+    source = str(tmp_path / "words.txt")
+    write_wordlist(source, WORDS)
+    bloom = build_bloom_filter(source, bloom_path(source))
+    assert all(word in bloom for word in WORDS)
+    rng = random.Random(0)
+    misses = [f"x{rng.getrandbits(48):x}" for _ in range(2000)]
+    assert sum(word in bloom for word in misses) <= 20
+
+    copy = BloomFilter.load(bloom_path(source))
+    assert all(word in copy for word in WORDS)
+    copy.close()
+
+
+def test_reloaded_bloom_filter_stays_usable(tmp_path):
+    """Verify that a Bloom filter handed out before a reload keeps working afterwards."""
+    source = str(tmp_path / "words.txt")
+    write_wordlist(source, WORDS)
+    build_bloom_filter(source, bloom_path(source))
+    bloom = load_bloom_filter(source)
+
+    stat = os.stat(bloom_path(source))
+    os.utime(bloom_path(source), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert load_bloom_filter(source) is not bloom
+    assert "alpha" in bloom
+
+
+def test_scan_password():
+    """Verify the single-pass scanner against the original multi-pass functions."""
+    words = PASSWORDS + ["aaa", "xaaay", "abc", "cba", "123", "321", "zyx", "aab", "abd", "ab", "a",
+                         "ééé", "àáâ", "âáà", "ÀÁÂ", "日本語", "😀😀😀", "Ab1!", "ab c"]
+    words += make_passwords(2000)
+    expected = [(reference_word_complexity(word), reference_has_sequence_or_repetition(word))
+                for word in words]
+    assert [scan_password(word) for word in words] == expected
+    assert [(word_complexity(word), has_sequence_or_repetition(word)) for word in words] == expected
+    assert scan_password("") == (0, False)
+
+    complexities, patterns = scan_passwords(words)
+    assert isinstance(complexities, array) and complexities.typecode == "B"
+    assert isinstance(patterns, array) and patterns.typecode == "B"
+    assert list(complexities) == [complexity for complexity, _ in expected]
+    assert list(patterns) == [int(has_pattern) for _, has_pattern in expected]
+    assert scan_passwords([]) == (array("B"), array("B"))
+
+
+def test_incremental_strength():
+    """Verify that incremental_strength agrees with evaluate_password while typing."""
+    meter = IncrementalStrength()
+    for word in PASSWORDS:
+        meter.clear()
+        for char in word:
+            meter.append(char)
+            assert meter.result() == evaluate_password(meter.text), meter.text
+        # Erasing character by character goes back through the same states.
+        while len(meter):
+            meter.delete()
+            assert meter.result() == evaluate_password(meter.text), meter.text
+
+    # Replacing the whole field reuses the common prefix.
+    for first, second in zip(PASSWORDS, PASSWORDS[1:]):
+        meter.set_text(first)
+        meter.set_text(second)
+        assert meter.text == second
+        assert meter.result() == evaluate_password(second)
+
+
+def brute_force_matches(words, text, min_word_length):
+    """Find every (start, word) occurrence by checking each position."""
+    return {(start, word) for word in set(words) if len(word) >= min_word_length
+            for start in range(len(text) - len(word) + 1) if text.startswith(word, start)}
+
+
+def test_aho_corasick():
+    """Verify Aho–Corasick matches against a brute-force substring scan."""
+    words = ["he", "she", "his", "hers", "a", "aa", "aab", "abab", "b", "ba"]
+    automaton = AhoCorasick.from_words(words, min_word_length=1)
+    assert set(automaton.find_all("ushers")) == {(1, "she"), (2, "he"), (2, "hers")}
+
+    rng = random.Random(0)
+    for min_word_length in (1, 2, 3):
+        automaton = AhoCorasick.from_words(words, min_word_length=min_word_length)
+        for _ in range(200):
+            text = "".join(rng.choice("abhesir") for _ in range(rng.randint(0, 30)))
+            expected = brute_force_matches(words, text, min_word_length)
+            matches = automaton.find_all(text)
+            assert len(matches) == len(expected)
+            assert set(matches) == expected
+            assert automaton.contains_any(text) == bool(expected)
+
+
+def test_estimate_entropy():
+    """Verify that dictionary words are charged as one choice from the list."""
+    model = get_model()
+    assert entropy_score(estimate_entropy("sunflower")) == 0
+    assert estimate_entropy("Sunflower") == estimate_entropy("sunflower") + 1
+    assert estimate_entropy("Sunflower2024!") < model.entropy("Sunflower2024!")
+    assert entropy_score(estimate_entropy("Sunflower2024!")) <= evaluate_password("Sunflower2024!").score
+    # Without dictionary words the estimate is the plain model.
+    assert estimate_entropy("xK9#mP2$vL") == pytest.approx(model.entropy("xK9#mP2$vL"))
+
+
+def test_percentile():
+    """Verify the nearest-rank percentile used in the service metrics."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.50) == 50
+    assert percentile([1, 2], 0.50) == 1
+    assert percentile([], 0.99) == 0.0
+
+
+def test_password_service():
+    """Verify a round trip through the local service, including bad requests."""
+
+    async def scenario():
+        service = PasswordService(workers=1)
+        host, port = await service.start("127.0.0.1", 0)
+        try:
+            status, payload = await request_json(host, port, "POST", "/strength",
+                                                 {"password": "Sunflower2024!"})
+            assert status == 200
+            assert payload == {"strength": evaluate_password("Sunflower2024!").score,
+                               "cached": False}
+            status, payload = await request_json(host, port, "POST", "/strength",
+                                                 {"password": "Sunflower2024!"})
+            assert payload["cached"] is True
+
+            assert (await request_json(host, port, "POST", "/strength", {"senha": "x"}))[0] == 400
+            assert (await request_json(host, port, "POST", "/strength", {"password": 1}))[0] == 400
+            assert (await request_json(host, port, "GET", "/strength"))[0] == 405
+            assert (await request_json(host, port, "GET", "/missing"))[0] == 404
+
+            # A malformed or negative Content-Length gets a 400 and the connection is closed.
+            for length in (b"abc", b"-5"):
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(b"POST /strength HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                assert response.startswith(b"HTTP/1.1 400 ")
+
+            status, metrics = await request_json(host, port, "GET", "/metrics")
+            assert status == 200
+            assert metrics["requests"] == 2
+            assert metrics["cache"]["hits"] == 1
+        finally:
+            await service.stop()
+
+    asyncio.run(scenario())
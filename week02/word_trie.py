@@ -0,0 +1,68 @@
+# Cada nó é um inteiro. As arestas ficam em um único dicionário indexado por
+# (nó << CHAR_BITS) | código do caractere, o que evita um dicionário por nó.
+CHAR_BITS = 21
+ROOT = 0
+# Cursor que não corresponde a nenhum prefixo da lista.
+DEAD = -1
+
+
+class WordTrie:
+    """
+    Uma trie compacta de palavras, percorrida por cursores (números de nó).
+
+    Um cursor começa em ROOT e avança um caractere por vez com step(); quando
+    nenhuma palavra tem o prefixo percorrido, o cursor vira DEAD.
+    """
+
+    def __init__(self, edges=None, terminal=None):
+        self.edges = edges if edges is not None else {}
+        self.terminal = terminal if terminal is not None else bytearray(1)
+
+    @classmethod
+    def from_words(cls, words):
+        """Constrói a trie a partir de um iterável de palavras."""
+        trie = cls()
+        for word in words:
+            trie.add(word)
+        return trie
+
+    def __len__(self):
+        """Retorna o número de nós."""
+        return len(self.terminal)
+
+    def add(self, word):
+        """Insere uma palavra e retorna o nó onde ela termina."""
+        edges = self.edges
+        node = ROOT
+        for char in word:
+            key = (node << CHAR_BITS) | ord(char)
+            child = edges.get(key)
+            if child is None:
+                child = len(self.terminal)
+                edges[key] = child
+                self.terminal.append(0)
+            node = child
+        self.terminal[node] = 1
+        return node
+
+    def step(self, node, char):
+        """Avança o cursor node com um caractere; retorna DEAD se não houver aresta."""
+        if node == DEAD:
+            return DEAD
+        return self.edges.get((node << CHAR_BITS) | ord(char), DEAD)
+
+    def walk(self, text, node=ROOT):
+        """Avança o cursor com todos os caracteres de text."""
+        edges = self.edges
+        for char in text:
+            if node == DEAD:
+                return DEAD
+            node = edges.get((node << CHAR_BITS) | ord(char), DEAD)
+        return node
+
+    def is_word(self, node):
+        """Retorna True se o cursor estiver no fim de uma palavra."""
+        return node != DEAD and self.terminal[node] == 1
+
+    def __contains__(self, word):
+        return self.is_word(self.walk(word))
@@ -0,0 +1,192 @@
+import random
+import sys
+import timeit
+from array import array
+from operator import mul
+
+from chemistry import get_periodic_table, parse_formula, parse_formula_cached, \
+    compute_molar_mass, PeriodicTable, ATOMIC_MASS_INDEX
+
+
+def make_atomic_mass_array(periodic_table_dict):
+    """Monta o vetor de massas atômicas de uma tabela periódica.
+
+    Parâmetro
+        periodic_table_dict: uma PeriodicTable ou um dicionário de make_periodic_table
+    Retorna: uma tupla (symbol_index, masses), onde symbol_index mapeia
+        cada símbolo à sua posição em masses, um array('d') de massas.
+    """
+    if isinstance(periodic_table_dict, PeriodicTable):
+        # A tabela já guarda as massas em um vetor alinhado com index_of.
+        return periodic_table_dict.index_of, array("d", periodic_table_dict.masses)
+
+    symbols = sorted(periodic_table_dict)
+    symbol_index = {symbol: index for index, symbol in enumerate(symbols)}
+    masses = array("d", (periodic_table_dict[symbol][ATOMIC_MASS_INDEX] for symbol in symbols))
+    return symbol_index, masses
+
+
+class CompoundMatrix:
+    """Uma matriz esparsa (formato CSR) de contagens de elementos.
+
+    Cada linha é um composto e cada coluna um elemento. Os elementos da
+    linha i estão em indices[indptr[i]:indptr[i + 1]], com as quantidades
+    correspondentes em counts.
+    """
+
+    def __init__(self, indptr, indices, counts):
+        self.indptr = indptr
+        self.indices = indices
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+def encode_formulas(formulas, periodic_table_dict, symbol_index):
+    """Codifica uma lista de fórmulas como uma CompoundMatrix.
+
+    Cada fórmula distinta é analisada uma única vez (via parse_formula_cached).
+
+    Parâmetros
+        formulas: as fórmulas químicas
+        periodic_table_dict: a tabela periódica com os símbolos válidos
+        symbol_index: o mapeamento símbolo -> coluna de make_atomic_mass_array
+    Retorna: a CompoundMatrix, com uma linha por fórmula, na mesma ordem
+    """
+    indptr = array("l", [0])
+    indices = array("l")
+    counts = array("l")
+    for formula in formulas:
+        for symbol, quantity in parse_formula_cached(formula, periodic_table_dict):
+            indices.append(symbol_index[symbol])
+            counts.append(quantity)
+        indptr.append(len(indices))
+    return CompoundMatrix(indptr, indices, counts)
+
+
+def compute_molar_masses(matrix, masses):
+    """Multiplica a matriz de contagens pelo vetor de massas atômicas.
+
+    O produto matriz x vetor é feito em uma única passagem sobre indices e
+    counts: cada entrada é multiplicada pela massa da sua coluna e somada ao
+    total da linha corrente, que é gravado quando a passagem cruza um limite
+    de indptr. Sem NumPy não há um produto vetorizado de verdade; a passagem
+    ainda é um laço em Python, e o ganho do lote vem sobretudo de analisar
+    cada fórmula distinta uma única vez (veja main). As somas seguem a ordem
+    de compute_molar_mass, então os resultados são idênticos.
+
+    Parâmetros
+        matrix: uma CompoundMatrix
+        masses: o vetor de massas de make_atomic_mass_array
+    Retorna: um array('d') com a massa molar de cada linha
+    """
+    indptr = matrix.indptr
+    row_count = len(matrix)
+    result = array("d", bytes(8 * row_count))
+    row = 0
+    end = indptr[1] if row_count else 0
+    total = 0.0
+    products = map(mul, map(masses.__getitem__, matrix.indices), matrix.counts)
+    for position, product in enumerate(products):
+        while position == end:
+            result[row] = total
+            total = 0.0
+            row += 1
+            end = indptr[row + 1]
+        total += product
+    # Grava a última linha com entradas e zera as linhas vazias do final.
+    while row < row_count:
+        result[row] = total
+        total = 0.0
+        row += 1
+    return result
+
+
+def batch_molar_masses(formulas, periodic_table_dict):
+    """Calcula as massas molares de muitas fórmulas de uma vez.
+
+    Apenas as fórmulas distintas viram linhas da matriz; o resultado de cada
+    linha é depois copiado para todas as posições onde a fórmula aparece.
+
+    Parâmetros
+        formulas: as fórmulas químicas
+        periodic_table_dict: a tabela periódica
+    Retorna: um array('d') com as massas molares, na ordem das fórmulas
+    """
+    symbol_index, masses = make_atomic_mass_array(periodic_table_dict)
+    distinct = list(dict.fromkeys(formulas))
+    matrix = encode_formulas(distinct, periodic_table_dict, symbol_index)
+    mass_by_formula = dict(zip(distinct, compute_molar_masses(matrix, masses)))
+    return array("d", map(mass_by_formula.__getitem__, formulas))
+
+
+def make_formulas(count, distinct=2000, seed=0):
+    """Gera um inventário sintético de fórmulas, com repetições."""
+    rng = random.Random(seed)
+    symbols = sorted(get_periodic_table())
+    pool = []
+    for _ in range(distinct):
+        parts = [f"{rng.choice(symbols)}{rng.randint(1, 12)}" for _ in range(rng.randint(1, 5))]
+        if rng.random() < 0.3:
+            parts.insert(rng.randrange(len(parts)), f"({rng.choice(symbols)}{rng.choice(symbols)}){rng.randint(2, 4)}")
+        pool.append("".join(parts))
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main():
+    """Compara o cálculo em lote com o laço de uma fórmula por vez.
+
+    Mede separadamente o ganho da deduplicação (analisar cada fórmula
+    distinta uma vez) e o ganho do produto CSR sobre as mesmas linhas.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    periodic_table_dict = get_periodic_table()
+    formulas = make_formulas(count)
+    symbol_index, masses = make_atomic_mass_array(periodic_table_dict)
+    distinct = list(dict.fromkeys(formulas))
+    parsed = [parse_formula_cached(formula, periodic_table_dict) for formula in distinct]
+    matrix = encode_formulas(distinct, periodic_table_dict, symbol_index)
+
+    def per_formula():
+        return [compute_molar_mass(parse_formula(formula, periodic_table_dict), periodic_table_dict)
+                for formula in formulas]
+
+    def deduplicated():
+        mass_by_formula = {formula: compute_molar_mass(parse_formula(formula, periodic_table_dict),
+                                                       periodic_table_dict)
+                           for formula in dict.fromkeys(formulas)}
+        return list(map(mass_by_formula.__getitem__, formulas))
+
+    def batch():
+        return batch_molar_masses(formulas, periodic_table_dict)
+
+    def per_row():
+        return [compute_molar_mass(symbol_quantity_list, periodic_table_dict)
+                for symbol_quantity_list in parsed]
+
+    def csr_product():
+        return compute_molar_masses(matrix, masses)
+
+    expected = per_formula()
+    assert deduplicated() == expected, "o cálculo deduplicado diverge do laço original"
+    assert list(batch()) == expected, "o cálculo em lote diverge do laço original"
+    assert list(csr_product()) == per_row(), "o produto CSR diverge de compute_molar_mass"
+
+    def report(title, variants):
+        print(title)
+        baseline = None
+        for name, function in variants:
+            seconds = min(timeit.repeat(function, number=1, repeat=3))
+            baseline = baseline or seconds
+            print(f"  {name:<28} {seconds * 1e3:9.1f} ms  {baseline / seconds:5.2f}x")
+
+    report(f"Massas molares de {count} fórmulas ({len(distinct)} distintas)",
+           (("uma fórmula por vez", per_formula), ("só deduplicação", deduplicated),
+            ("deduplicação + CSR", batch)))
+    report(f"Só o produto, sobre as {len(distinct)} fórmulas já analisadas",
+           (("compute_molar_mass por linha", per_row), ("produto CSR", csr_product)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from chemistry import get_periodic_table, parse_formula_cached, compute_molar_mass, FormulaError, \
+    FormulaCache, DEFAULT_FORMULA_CACHE_SIZE
+
+# Quantidade padrão de linhas enviadas de uma vez para cada processo.
+DEFAULT_CHUNK_SIZE = 5000
+
+# Formatos de entrada e saída suportados.
+FORMATS = ("csv", "jsonl")
+
+# Colunas do arquivo de resultados.
+OUTPUT_FIELDS = ["line", "formula", "sample_mass", "molar_mass", "moles", "error"]
+
+
+def detect_format(filename, default="csv"):
+    """Deduz o formato de um arquivo pela extensão ('-' usa o padrão)."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    return default
+
+
+def read_rows(stream, input_format):
+    """Lê as linhas de entrada sem carregar o arquivo inteiro.
+
+    Parâmetros
+        stream: o arquivo de entrada
+        input_format: "csv" (com as colunas formula e sample_mass) ou "jsonl"
+    Retorna: um gerador de tuplas (número da linha, fórmula, massa da amostra).
+        Linhas malformadas geram a fórmula None e a mensagem de erro no lugar da massa.
+    """
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        for line_number, row in enumerate(reader, 2):
+            yield _checked_row(line_number, row)
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"linha JSON inválida: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "linha JSON inválida: esperado um objeto"
+                continue
+            yield _checked_row(line_number, row)
+
+
+def _checked_row(line_number, row):
+    """Converte uma linha lida em (número, fórmula, massa), marcando a falta da fórmula."""
+    formula = row.get("formula")
+    if formula is None:
+        return line_number, None, "coluna formula ausente"
+    if not isinstance(formula, str):
+        return line_number, None, f"fórmula inválida: {formula!r}"
+    return line_number, formula, row.get("sample_mass")
+
+
+class MolarMassMemo:
+    """Lembra a massa molar (ou a mensagem de erro) das fórmulas mais usadas nesta execução.
+
+    Os resultados ficam em um FormulaCache (LRU) de no máximo max_size
+    fórmulas, então a memória não cresce com o número de fórmulas distintas.
+    """
+
+    def __init__(self, periodic_table, max_size=DEFAULT_FORMULA_CACHE_SIZE):
+        self.periodic_table = periodic_table
+        self._results = FormulaCache(max_size)
+
+    def molar_mass(self, formula):
+        """Retorna a massa molar da fórmula ou lança FormulaError."""
+        result = self._results.get(formula)
+        if result is None:
+            try:
+                symbol_quantity_list = parse_formula_cached(formula, self.periodic_table)
+                result = compute_molar_mass(symbol_quantity_list, self.periodic_table)
+            except FormulaError as e:
+                # Guarda só a mensagem: relançar a mesma exceção acumularia
+                # quadros em seu __traceback__ a cada linha repetida.
+                result = str(e)
+            self._results.put(formula, result)
+        if isinstance(result, str):
+            raise FormulaError(result)
+        return result
+
+
+def process_row(memo, line_number, formula, sample_mass):
+    """Calcula a massa molar e o número de moles de uma linha.
+
+    Retorna: um dicionário com as colunas de OUTPUT_FIELDS; erros são
+        registrados na coluna error em vez de interromper o processamento.
+    """
+    result = {"line": line_number, "formula": formula, "sample_mass": sample_mass,
+              "molar_mass": None, "moles": None, "error": None}
+    if formula is None:
+        result["sample_mass"] = None
+        result["error"] = sample_mass
+        return result
+    try:
+        mass = float(sample_mass)
+    except (TypeError, ValueError):
+        mass = None
+    if mass is None or not math.isfinite(mass):
+        # NaN e infinito também são recusados: não são valores JSON válidos.
+        result["sample_mass"] = None
+        result["error"] = f"massa da amostra inválida: {sample_mass!r}"
+        return result
+    result["sample_mass"] = mass
+    try:
+        molar_mass = memo.molar_mass(formula)
+    except FormulaError as e:
+        result["error"] = f"FormulaError: {e}"
+        return result
+    result["molar_mass"] = molar_mass
+    if molar_mass == 0:
+        result["error"] = "massa molar igual a zero"
+    else:
+        result["moles"] = mass / molar_mass
+    return result
+
+
+# Memória de massas molares de cada processo do pool.
+_worker_memo = None
+
+
+def init_worker():
+    """Carrega a tabela periódica uma vez em cada processo."""
+    global _worker_memo
+    _worker_memo = MolarMassMemo(get_periodic_table())
+
+
+def process_chunk(chunk):
+    """Processa um bloco de linhas em um processo do pool."""
+    return [process_row(_worker_memo, *row) for row in chunk]
+
+
+def process_rows(rows, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Processa as linhas, em ordem, no processo atual ou em um pool de processos.
+
+    Parâmetros
+        rows: um iterável de tuplas (linha, fórmula, massa da amostra)
+        workers: o número de processos; 1 processa no processo atual
+        chunk_size: quantas linhas cada processo recebe de uma vez
+    Retorna: um gerador de dicionários de resultado, na ordem de entrada
+    """
+    if workers <= 1:
+        memo = MolarMassMemo(get_periodic_table())
+        for row in rows:
+            yield process_row(memo, *row)
+        return
+
+    iterator = iter(rows)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(process_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_results(results, output, output_format):
+    """Escreve os resultados à medida que são produzidos.
+
+    Retorna: uma tupla (linhas escritas, linhas com erro)
+    """
+    count = errors = 0
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(result):
+            output.write(json.dumps(result, allow_nan=False))
+            output.write("\n")
+    for result in results:
+        write(result)
+        count += 1
+        errors += result["error"] is not None
+    return count, errors
+
+
+def main(argv=None):
+    """Calcula massas molares e moles para um arquivo inteiro de amostras."""
+    parser = argparse.ArgumentParser(
+        description="Estequiometria em lote: linhas (formula, sample_mass) em CSV ou JSONL.")
+    parser.add_argument("input", help="arquivo de entrada ('-' para stdin)")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de saída ('-' para stdout)")
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="número de processos (0 = número de CPUs)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output, input_format)
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if args.input == "-":
+            stream = sys.stdin
+        else:
+            stream = stack.enter_context(open(args.input, "rt", newline="", encoding="utf-8"))
+        if args.output == "-":
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(args.output, "wt", newline="", encoding="utf-8"))
+
+        results = process_rows(read_rows(stream, input_format), workers, args.chunk_size)
+        count, errors = write_results(results, output, output_format)
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{count} linhas processadas ({errors} com erro) em {elapsed:.2f} s "
+          f"({rate:,.0f} linhas/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
+import csv
+import os
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 
 # Constantes de índice para tornar o código mais legível, conforme a sugestão.
 # Para a lista de valores no dicionário da tabela periódica (ex: ["Actinium", 227])
@@ -9,100 +15,392 @@ class FormulaError(ValueError):
     """Exceção personalizada para fórmulas químicas inválidas."""
     pass
 
-def parse_formula(formula, periodic_table_dict):
-    if not isinstance(formula, str) or not formula:
-        raise FormulaError("Fórmula inválida: a entrada deve ser uma string não vazia.")
+# Tamanho padrão do cache de fórmulas analisadas.
+DEFAULT_FORMULA_CACHE_SIZE = 4096
 
-    # Um conjunto de símbolos de elementos válidos para consulta rápida.
-    known_symbols = set(periodic_table_dict.keys())
 
-    # Esta regex tokeniza a fórmula em uma lista de tuplas.
-    # Cada tupla contém um símbolo/parêntese e sua quantidade subsequente.
-    # Exemplo: "Mg(OH)2" -> [('Mg', ''), ('(', ''), ('O', ''), ('H', ''), (')', '2')]
-    tokens = re.findall(r"([A-Z][a-z]*|\(|\))(\d*)", formula)
-    
-    if not tokens:
-        raise FormulaError("Formato de fórmula química inválido.")
-
-    # Uma pilha para gerenciar grupos aninhados dentro de parênteses. Cada item na
-    # pilha é um dicionário que representa os elementos nesse escopo.
-    stack = [{}]
-
-    for symbol, count_str in tokens:
-        # A quantidade padrão é 1 se nenhum número seguir o símbolo.
-        quantity = int(count_str) if count_str else 1
-
-        if symbol == "(":
-            # Inicia um novo dicionário na pilha para o novo grupo.
-            stack.append({})
-        elif symbol in known_symbols:
-            # Adiciona o elemento e sua quantidade ao dicionário do grupo atual.
-            current_group = stack[-1]
-            current_group[symbol] = current_group.get(symbol, 0) + quantity
-        elif symbol == ")":
-            if len(stack) < 2:
-                raise FormulaError("Parênteses não correspondentes na fórmula.")
-            
-            # Remove o grupo concluído da pilha.
-            top_group = stack.pop()
-            
-            # Obtém o dicionário do grupo pai.
-            parent_group = stack[-1]
-
-            # Multiplica as quantidades no grupo removido pela quantidade
-            # que segue o parêntese e, em seguida, mescla-as no grupo pai.
-            for element, count in top_group.items():
-                parent_group[element] = parent_group.get(element, 0) + count * quantity
+class FormulaCache:
+    """
+    Cache LRU das fórmulas analisadas, com estatísticas de uso.
+
+    As chaves são (fórmula, conjunto de símbolos conhecidos) e os valores são
+    tuplas imutáveis de (símbolo, quantidade), então podem ser compartilhados
+    entre chamadores sem cópias defensivas.
+    """
+
+    def __init__(self, max_size=DEFAULT_FORMULA_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Retorna o resultado guardado para key, ou None."""
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Guarda um resultado, descartando o menos usado recentemente se necessário."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Esvazia o cache e zera as estatísticas."""
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas do cache.
+
+        Retorna: um dicionário com size, max_size, hits, misses, evictions e hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Cache compartilhado por parse_formula e parse_formula_cached.
+FORMULA_CACHE = FormulaCache()
+
+# Conjuntos de símbolos das tabelas que não são PeriodicTable: id(tabela) -> (tabela, símbolos).
+_KNOWN_SYMBOLS_CACHE = {}
+
+
+def known_symbols_for(periodic_table_dict):
+    """
+    Retorna o conjunto imutável de símbolos de uma tabela periódica.
+
+    Uma PeriodicTable guarda o próprio conjunto, já que não pode mudar. Para
+    um dicionário comum, que pode ser alterado a qualquer momento, o conjunto
+    guardado só é reaproveitado se ainda for igual às chaves do dicionário;
+    assim a mesma instância do conjunto (a chave do cache de fórmulas) é
+    devolvida enquanto a tabela não mudar.
+    """
+    if isinstance(periodic_table_dict, PeriodicTable):
+        return periodic_table_dict.known_symbols
+
+    cached = _KNOWN_SYMBOLS_CACHE.get(id(periodic_table_dict))
+    if cached is not None and cached[0] is periodic_table_dict \
+            and cached[1] == periodic_table_dict.keys():
+        return cached[1]
+
+    symbols = frozenset(periodic_table_dict)
+    # Mantém apenas algumas tabelas; na prática o programa usa uma só.
+    if len(_KNOWN_SYMBOLS_CACHE) >= 8:
+        _KNOWN_SYMBOLS_CACHE.clear()
+    _KNOWN_SYMBOLS_CACHE[id(periodic_table_dict)] = (periodic_table_dict, symbols)
+    return symbols
+
+
+# Índices dos símbolos por conjunto de símbolos: símbolos -> (tupla ordenada, símbolo -> índice).
+_SYMBOL_INDEX_CACHE = {}
+
+
+def symbol_index_for(known_symbols):
+    """
+    Retorna os símbolos em ordem alfabética e o índice de cada um.
+
+    O índice é a posição do elemento no vetor de contagens de scan_formula.
+    """
+    cached = _SYMBOL_INDEX_CACHE.get(known_symbols)
+    if cached is None:
+        symbols = tuple(sorted(known_symbols))
+        cached = (symbols, {symbol: index for index, symbol in enumerate(symbols)})
+        if len(_SYMBOL_INDEX_CACHE) >= 8:
+            _SYMBOL_INDEX_CACHE.clear()
+        _SYMBOL_INDEX_CACHE[known_symbols] = cached
+    return cached
+
+
+# Separadores da notação de hidratos, ex: "CuSO4·5H2O" ou "CuSO4.5H2O".
+HYDRATE_SEPARATORS = "·.*"
+
+# Pares de parênteses e colchetes aceitos nas fórmulas.
+CLOSING_TO_OPENING = {")": "(", "]": "["}
+
+UNMATCHED_PARENTHESES = "Parênteses não correspondentes na fórmula."
+INVALID_FORMAT = "Formato de fórmula química inválido."
+
+
+def _split_hydrate(formula):
+    """Divide a fórmula nas partes separadas por ·, . ou *."""
+    parts = [formula]
+    for separator in HYDRATE_SEPARATORS:
+        parts = [piece for part in parts for piece in part.split(separator)]
+    return parts
+
+
+# Tokenizador de uma parte da fórmula. Cada token é um elemento e sua
+# quantidade, um parêntese/colchete de abertura, um de fechamento e sua
+# quantidade ou, no último grupo, qualquer caractere inválido.
+FORMULA_TOKEN_PATTERN = re.compile(r"([A-Z][a-z]*)(\d*)|([(\[])|([)\]])(\d*)|(.)", re.DOTALL)
+
+
+def _scan_part(part, multiplier, index_of, counts, seen, present):
+    """
+    Acumula as contagens de uma parte da fórmula, percorrendo os tokens da
+    direita para a esquerda.
+
+    Lendo de trás para frente, a quantidade de um grupo aparece antes do seu
+    conteúdo, então basta uma pilha de multiplicadores: ao encontrar ")" ou
+    "]" o multiplicador atual é empilhado já multiplicado pela quantidade do
+    grupo, e cada elemento soma quantidade x multiplicador do topo
+    diretamente no vetor de contagens, sem dicionários por grupo.
+    """
+    # Cada item da pilha é (multiplicador, caractere de fechamento do grupo).
+    stack = [(multiplier, None)]
+    current = multiplier
+    for symbol, quantity, opening, closing, group_quantity, invalid in \
+            reversed(FORMULA_TOKEN_PATTERN.findall(part)):
+        if symbol:
+            index = index_of.get(symbol)
+            if index is None:
+                raise FormulaError(f"Símbolo inválido: {symbol}")
+            counts[index] += (int(quantity) if quantity else 1) * current
+            if not seen[index]:
+                seen[index] = 1
+                present.append(index)
+        elif closing:
+            current *= int(group_quantity) if group_quantity else 1
+            stack.append((current, closing))
+        elif opening:
+            if len(stack) < 2 or CLOSING_TO_OPENING[stack[-1][1]] != opening:
+                raise FormulaError(UNMATCHED_PARENTHESES)
+            stack.pop()
+            current = stack[-1][0]
         else:
-            raise FormulaError(f"Símbolo inválido: {symbol}")
+            raise FormulaError(f"Caractere inválido na fórmula: {invalid!r}")
 
     if len(stack) > 1:
-        raise FormulaError("Parênteses não correspondentes na fórmula.")
+        raise FormulaError(UNMATCHED_PARENTHESES)
+
+
+def scan_formula(formula, known_symbols):
+    """
+    Analisa uma fórmula em tempo linear, somando as quantidades em um
+    vetor de contagens de tamanho fixo.
+
+    Aceita parênteses e colchetes aninhados, ex: "K4[Fe(CN)6]", e hidratos
+    com coeficiente, ex: "CuSO4·5H2O" (também com "." ou "*" no lugar de "·").
+    Espaços em branco são ignorados, como no analisador original, mas
+    qualquer outro caractere fora da notação lança FormulaError.
 
-    # As contagens finais estão no último dicionário restante na pilha.
-    final_counts = stack[0]
+    Parâmetros:
+        formula: a fórmula química.
+        known_symbols: o conjunto imutável de símbolos válidos (known_symbols_for).
+    Retorna: uma tupla (counts, indices), onde counts é uma lista com a
+        quantidade de cada elemento, na ordem de symbol_index_for, e indices
+        são os índices dos elementos que aparecem na fórmula, em ordem.
+    """
+    symbols, index_of = symbol_index_for(known_symbols)
+    if not formula.isalnum():
+        formula = "".join(formula.split())
+    counts = [0] * len(symbols)
+    seen = bytearray(len(symbols))
+    present = []
+
+    for part in _split_hydrate(formula):
+        # Um número no início da parte é o coeficiente de toda a parte.
+        start = 0
+        while start < len(part) and "0" <= part[start] <= "9":
+            start += 1
+        multiplier = int(part[:start]) if start else 1
+        body = part[start:]
+        if not body:
+            raise FormulaError(INVALID_FORMAT)
+        _scan_part(body, multiplier, index_of, counts, seen, present)
+
+    present.sort()
+    return counts, present
+
+
+def parse_formula_cached(formula, periodic_table_dict):
+    """
+    Analisa uma fórmula química usando o cache LRU de fórmulas.
+
+    Parâmetros:
+        formula: a fórmula química, ex: "Mg(OH)2".
+        periodic_table_dict: a tabela periódica com os símbolos válidos.
+    Retorna: uma tupla ordenada de tuplas (símbolo, quantidade). O resultado
+        é compartilhado com outros chamadores e não deve ser modificado.
+    """
+    if not isinstance(formula, str) or not formula:
+        raise FormulaError("Fórmula inválida: a entrada deve ser uma string não vazia.")
+
+    known_symbols = known_symbols_for(periodic_table_dict)
+    key = (formula, known_symbols)
+    result = FORMULA_CACHE.get(key)
+    if result is None:
+        counts, indices = scan_formula(formula, known_symbols)
+        symbols = symbol_index_for(known_symbols)[0]
+        result = tuple((symbols[index], counts[index]) for index in indices)
+        FORMULA_CACHE.put(key, result)
+    return result
+
+
+def _counts_vector(parsed, known_symbols):
+    """Converte o resultado analisado no vetor de contagens de scan_formula."""
+    index_of = symbol_index_for(known_symbols)[1]
+    counts = [0] * len(index_of)
+    for symbol, quantity in parsed:
+        counts[index_of[symbol]] = quantity
+    return counts
+
+
+# Formatos de saída de parse_formula_as. Cada função recebe o resultado do
+# cache e o conjunto de símbolos e monta uma cópia nova, sem reanalisar a fórmula.
+FORMULA_VIEWS = {
+    "tuples": lambda parsed, known_symbols: list(parsed),
+    "lists": lambda parsed, known_symbols: [[symbol, quantity] for symbol, quantity in parsed],
+    "dict": lambda parsed, known_symbols: dict(parsed),
+    "vector": _counts_vector,
+}
+
+
+def parse_formula_as(formula, periodic_table_dict, view="lists"):
+    """
+    Analisa uma fórmula química e retorna o resultado no formato pedido.
+
+    Todos os formatos vêm do mesmo resultado de parse_formula_cached, então
+    uma fórmula é analisada uma única vez, qualquer que seja o formato.
+
+    Parâmetros:
+        formula: a fórmula química, ex: "Mg(OH)2".
+        periodic_table_dict: a tabela periódica com os símbolos válidos.
+        view: um dos formatos de FORMULA_VIEWS:
+            "tuples": lista ordenada de tuplas (símbolo, quantidade);
+            "lists": lista ordenada de listas [símbolo, quantidade];
+            "dict": dicionário {símbolo: quantidade};
+            "vector": lista com a quantidade de cada elemento, na ordem
+                alfabética dos símbolos (veja symbol_index_for).
+    Retorna: o resultado no formato pedido, que o chamador pode alterar.
+    """
+    convert = FORMULA_VIEWS.get(view)
+    if convert is None:
+        raise ValueError(f"Formato de saída desconhecido: {view!r}")
+    parsed = parse_formula_cached(formula, periodic_table_dict)
+    return convert(parsed, known_symbols_for(periodic_table_dict))
+
+
+def parse_formula(formula, periodic_table_dict):
+    # Converte o resultado do cache para o formato de lista de listas necessário.
+    return parse_formula_as(formula, periodic_table_dict, "lists")
 
-    # Converte o dicionário para o formato de lista de listas necessário e o ordena.
-    symbol_quantity_list = list(map(list, sorted(final_counts.items())))
 
-    return symbol_quantity_list
+def formula_cache_stats():
+    """Retorna as estatísticas do cache de fórmulas (veja FormulaCache.stats)."""
+    return FORMULA_CACHE.stats()
+
+# Arquivo com os dados dos elementos, ao lado deste módulo.
+ELEMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "elements.csv")
+
+
+class PeriodicTable(Mapping):
+    """
+    Tabela periódica imutável, guardada em vetores paralelos.
+
+    symbols, names e masses são tuplas alinhadas pelo índice do elemento, e
+    index_of mapeia cada símbolo ao seu índice. A tabela também se comporta
+    como o dicionário de make_periodic_table: table[symbol] retorna
+    (nome, massa atômica), indexável com NAME_INDEX e ATOMIC_MASS_INDEX.
+    Como nada nela pode ser alterado, a mesma instância pode ser
+    compartilhada entre threads e enviada para outros processos.
+    """
+    __slots__ = ("symbols", "names", "masses", "index_of", "known_symbols", "_entries")
+
+    def __init__(self, symbols, names, masses):
+        if not len(symbols) == len(names) == len(masses):
+            raise ValueError("Os vetores da tabela periódica devem ter o mesmo tamanho.")
+        object.__setattr__(self, "symbols", tuple(symbols))
+        object.__setattr__(self, "names", tuple(names))
+        object.__setattr__(self, "masses", tuple(float(mass) for mass in masses))
+        object.__setattr__(self, "index_of", MappingProxyType(
+            {symbol: index for index, symbol in enumerate(self.symbols)}))
+        object.__setattr__(self, "known_symbols", frozenset(self.symbols))
+        object.__setattr__(self, "_entries", MappingProxyType(
+            {symbol: (name, mass) for symbol, name, mass in zip(self.symbols, self.names, self.masses)}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PeriodicTable é imutável.")
+
+    def __reduce__(self):
+        return (PeriodicTable, (self.symbols, self.names, self.masses))
+
+    def __getitem__(self, symbol):
+        return self._entries[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._entries
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __repr__(self):
+        return f"PeriodicTable({len(self)} elementos)"
+
+    @classmethod
+    def from_csv(cls, filename=ELEMENTS_FILE):
+        """Lê a tabela de um CSV com as colunas Symbol, Name e Atomic Mass."""
+        symbols, names, masses = [], [], []
+        with open(filename, "rt", newline="", encoding="utf-8") as csv_file:
+            reader = csv.reader(csv_file)
+            next(reader)  # Pula a linha do cabeçalho
+            for row in reader:
+                if len(row) != 0:
+                    symbols.append(row[0])
+                    names.append(row[1])
+                    masses.append(float(row[2]))
+        return cls(symbols, names, masses)
+
+    def to_dict(self):
+        """Retorna uma cópia no formato de make_periodic_table: {símbolo: [nome, massa]}."""
+        return {symbol: [name, mass] for symbol, name, mass in zip(self.symbols, self.names, self.masses)}
+
+
+_PERIODIC_TABLE = None
+_PERIODIC_TABLE_LOCK = threading.Lock()
+
+
+def get_periodic_table():
+    """
+    Retorna a tabela periódica compartilhada, lida de elements.csv no primeiro uso.
+    """
+    global _PERIODIC_TABLE
+    if _PERIODIC_TABLE is None:
+        with _PERIODIC_TABLE_LOCK:
+            if _PERIODIC_TABLE is None:
+                _PERIODIC_TABLE = PeriodicTable.from_csv()
+    return _PERIODIC_TABLE
+
 
 def make_periodic_table():
-    periodic_table_dict = {
-        "Ac": ["Actinium", 227], "Ag": ["Silver", 107.8682], "Al": ["Aluminum", 26.9815386],
-        "Ar": ["Argon", 39.948], "As": ["Arsenic", 74.9216], "At": ["Astatine", 210],
-        "Au": ["Gold", 196.966569], "B":  ["Boron", 10.811], "Ba": ["Barium", 137.327],
-        "Be": ["Beryllium", 9.012182], "Bi": ["Bismuth", 208.9804], "Br": ["Bromine", 79.904],
-        "C":  ["Carbon", 12.0107], "Ca": ["Calcium", 40.078], "Cd": ["Cadmium", 112.411],
-        "Ce": ["Cerium", 140.116], "Cl": ["Chlorine", 35.453], "Co": ["Cobalt", 58.933195],
-        "Cr": ["Chromium", 51.9961], "Cs": ["Cesium", 132.9054519], "Cu": ["Copper", 63.546],
-        "Dy": ["Dysprosium", 162.5], "Er": ["Erbium", 167.259], "Eu": ["Europium", 151.964],
-        "F":  ["Fluorine", 18.9984032], "Fe": ["Iron", 55.845], "Fr": ["Francium", 223],
-        "Ga": ["Gallium", 69.723], "Gd": ["Gadolinium", 157.25], "Ge": ["Germanium", 72.64],
-        "H":  ["Hydrogen", 1.00794], "He": ["Helium", 4.002602], "Hf": ["Hafnium", 178.49],
-        "Hg": ["Mercury", 200.59], "Ho": ["Holmium", 164.93032], "I":  ["Iodine", 126.90447],
-        "In": ["Indium", 114.818], "Ir": ["Iridium", 192.217], "K":  ["Potassium", 39.0983],
-        "Kr": ["Krypton", 83.798], "La": ["Lanthanum", 138.90547], "Li": ["Lithium", 6.941],
-        "Lu": ["Lutetium", 174.9668], "Mg": ["Magnesium", 24.305], "Mn": ["Manganese", 54.938045],
-        "Mo": ["Molybdenum", 95.96], "N":  ["Nitrogen", 14.0067], "Na": ["Sodium", 22.98976928],
-        "Nb": ["Niobium", 92.90638], "Nd": ["Neodymium", 144.242], "Ne": ["Neon", 20.1797],
-        "Ni": ["Nickel", 58.6934], "Np": ["Neptunium", 237], "O":  ["Oxygen", 15.9994],
-        "Os": ["Osmium", 190.23], "P":  ["Phosphorus", 30.973762], "Pa": ["Protactinium", 231.03588],
-        "Pb": ["Lead", 207.2], "Pd": ["Palladium", 106.42], "Pm": ["Promethium", 145],
-        "Po": ["Polonium", 209], "Pr": ["Praseodymium", 140.90765], "Pt": ["Platinum", 195.084],
-        "Pu": ["Plutonium", 244], "Ra": ["Radium", 226], "Rb": ["Rubidium", 85.4678],
-        "Re": ["Rhenium", 186.207], "Rh": ["Rhodium", 102.9055], "Rn": ["Radon", 222],
-        "Ru": ["Ruthenium", 101.07], "S":  ["Sulfur", 32.065], "Sb": ["Antimony", 121.76],
-        "Sc": ["Scandium", 44.955912], "Se": ["Selenium", 78.96], "Si": ["Silicon", 28.0855],
-        "Sm": ["Samarium", 150.36], "Sn": ["Tin", 118.71], "Sr": ["Strontium", 87.62],
-        "Ta": ["Tantalum", 180.94788], "Tb": ["Terbium", 158.92535], "Tc": ["Technetium", 98],
-        "Te": ["Tellurium", 127.6], "Th": ["Thorium", 232.03806], "Ti": ["Titanium", 47.867],
-        "Tl": ["Thallium", 204.3833], "Tm": ["Thulium", 168.93421], "U":  ["Uranium", 238.02891],
-        "V":  ["Vanadium", 50.9415], "W":  ["Tungsten", 183.84], "Xe": ["Xenon", 131.293],
-        "Y":  ["Yttrium", 88.90585], "Yb": ["Ytterbium", 173.054], "Zn": ["Zinc", 65.38],
-        "Zr": ["Zirconium", 91.224]
-    }
-    return periodic_table_dict
+    # Retorna um dicionário novo (que o chamador pode alterar) construído a
+    # partir da tabela compartilhada, sem reler o arquivo.
+    return get_periodic_table().to_dict()
 
 def compute_molar_mass(symbol_quantity_list, periodic_table_dict):
     """
@@ -129,7 +427,7 @@ def main():
         chemical_formula = input("Digite a fórmula química do composto: ")
         sample_mass = float(input("Digite a massa da amostra em gramas: "))
 
-        periodic_table = make_periodic_table()
+        periodic_table = get_periodic_table()
         # Chama a função parse_formula para obter a lista de símbolos e quantidades
         symbol_quantity_list = parse_formula(chemical_formula, periodic_table)
         
@@ -0,0 +1,325 @@
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from chemistry import get_periodic_table, parse_formula_cached, compute_molar_mass, \
+    known_symbols_for, FormulaError
+
+# Formato do snapshot (cabeçalho little-endian; arrays na ordem de bytes da máquina,
+# pois o snapshot é sempre lido na mesma máquina em que foi gravado):
+#   cabeçalho: MAGIC, mtime do catálogo de origem (ns), número de compostos,
+#              número de elementos com lista de ocorrências, tamanho das fórmulas em
+#              bytes, número de fórmulas ignoradas, tamanho das ignoradas em bytes
+#   dados: massas (d), as fórmulas, as fórmulas ignoradas (fórmula e mensagem de
+#          erro) e, para cada elemento, o símbolo (2 bytes, completado com espaço),
+#          o tamanho da lista e a lista (q)
+# Cada texto é gravado em UTF-8 precedido do seu tamanho em bytes (STRING_HEADER),
+# então uma fórmula pode conter qualquer caractere.
+MAGIC = b"CMPIDX03"
+HEADER = struct.Struct("<8sqQIQQQ")
+POSTING_HEADER = struct.Struct("<2sQ")
+STRING_HEADER = struct.Struct("<I")
+
+# Sufixo do snapshot gravado ao lado do catálogo original.
+SNAPSHOT_SUFFIX = ".cidx"
+
+# Acima desta razão entre o tamanho de uma lista e o número de candidatos, os
+# candidatos são procurados na lista por busca binária em vez de interseção de conjuntos.
+BISECT_RATIO = 16
+
+
+class CompoundIndex:
+    """
+    Um índice de compostos por composição e massa molar.
+
+    Os compostos ficam em ordem crescente de massa: masses[i] é a massa
+    molar de formulas[i]. Para cada elemento, postings[símbolo] é um
+    array('q') crescente com as posições dos compostos que o contêm, então
+    uma faixa de massas é uma faixa de posições, encontrada por bisect
+    tanto em masses quanto em cada lista. Um elemento com quantidade zero
+    na fórmula, ex: "Fe0O", não conta como presente.
+
+    skipped lista as fórmulas inválidas deixadas de fora, como tuplas
+    (fórmula, mensagem de erro).
+    """
+
+    def __init__(self, formulas, masses, postings, skipped=()):
+        self.formulas = formulas
+        self.masses = masses
+        self.postings = postings
+        self.skipped = list(skipped)
+
+    def __len__(self):
+        return len(self.formulas)
+
+    @classmethod
+    def from_formulas(cls, formulas, periodic_table_dict=None):
+        """
+        Constrói o índice a partir de fórmulas químicas (repetições são ignoradas).
+
+        Uma fórmula inválida não interrompe a construção: ela fica de fora do
+        índice e é registrada em skipped, como os erros por linha das
+        ferramentas em lote.
+
+        Parâmetros
+            formulas: as fórmulas químicas
+            periodic_table_dict: a tabela periódica (padrão: a tabela compartilhada)
+        Retorna: o CompoundIndex
+        """
+        if periodic_table_dict is None:
+            periodic_table_dict = get_periodic_table()
+
+        distinct, parsed, masses, skipped = [], [], [], []
+        for formula in dict.fromkeys(formulas):
+            try:
+                symbol_quantity_list = parse_formula_cached(formula, periodic_table_dict)
+                mass = compute_molar_mass(symbol_quantity_list, periodic_table_dict)
+            except FormulaError as e:
+                skipped.append((formula, str(e)))
+                continue
+            distinct.append(formula)
+            parsed.append(symbol_quantity_list)
+            masses.append(mass)
+
+        order = sorted(range(len(distinct)), key=masses.__getitem__)
+        postings = {}
+        for position, row in enumerate(order):
+            for symbol, quantity in parsed[row]:
+                if quantity:
+                    posting = postings.get(symbol)
+                    if posting is None:
+                        posting = postings[symbol] = array("q")
+                    posting.append(position)
+
+        return cls([distinct[row] for row in order],
+                   array("d", (masses[row] for row in order)), postings, skipped)
+
+    def mass_range(self, min_mass=None, max_mass=None):
+        """Retorna as posições [início, fim) dos compostos com massa na faixa (inclusiva)."""
+        start = 0 if min_mass is None else bisect_left(self.masses, min_mass)
+        stop = len(self.masses) if max_mass is None else bisect_right(self.masses, max_mass)
+        return start, max(start, stop)
+
+    def query_positions(self, elements=(), min_mass=None, max_mass=None):
+        """
+        Encontra os compostos que contêm todos os elementos, com massa na faixa.
+
+        Parâmetros
+            elements: os símbolos que os compostos devem conter
+            min_mass, max_mass: os limites (inclusivos) da massa molar, ou None
+        Retorna: a lista crescente (em ordem de massa) das posições dos compostos
+        """
+        start, stop = self.mass_range(min_mass, max_mass)
+        if not elements:
+            return list(range(start, stop))
+
+        # A parte de cada lista que cai na faixa de massas, da menor para a maior.
+        slices = []
+        for symbol in set(elements):
+            posting = self.postings.get(symbol)
+            if posting is None:
+                return []
+            slices.append((posting, bisect_left(posting, start), bisect_left(posting, stop)))
+        slices.sort(key=lambda item: item[2] - item[1])
+
+        posting, first, last = slices[0]
+        candidates = posting[first:last]
+        for posting, first, last in slices[1:]:
+            if not candidates:
+                break
+            if len(candidates) * BISECT_RATIO < last - first:
+                candidates = [position for position in candidates
+                              if _contains(posting, position, first, last)]
+            else:
+                candidates = sorted(set(candidates).intersection(posting[first:last]))
+        return list(candidates)
+
+    def query(self, elements=(), min_mass=None, max_mass=None, limit=None):
+        """
+        Retorna os compostos que contêm todos os elementos, com massa na faixa.
+
+        Ex: index.query(["Fe", "O"], 150, 250) retorna todos os compostos com
+        ferro e oxigênio e massa molar entre 150 e 250 g/mol.
+
+        Retorna: uma lista de tuplas (fórmula, massa molar), em ordem de massa
+        """
+        positions = self.query_positions(elements, min_mass, max_mass)
+        if limit is not None:
+            positions = positions[:limit]
+        formulas = self.formulas
+        masses = self.masses
+        return [(formulas[position], masses[position]) for position in positions]
+
+    def save(self, path, source_mtime=0):
+        """Grava o índice em disco, de forma atômica."""
+        data = _pack_strings(self.formulas)
+        skipped_data = _pack_strings(text for entry in self.skipped for text in entry)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, source_mtime, len(self.formulas), len(self.postings), len(data),
+                                len(self.skipped), len(skipped_data)))
+            self.masses.tofile(f)
+            f.write(data)
+            f.write(skipped_data)
+            for symbol, posting in self.postings.items():
+                f.write(POSTING_HEADER.pack(symbol.encode("ascii").ljust(2), len(posting)))
+                posting.tofile(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Lê um índice gravado com save().
+
+        Retorna: uma tupla (CompoundIndex, mtime do catálogo de origem)
+        Lança ValueError se o arquivo não for um índice válido.
+        """
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f"Arquivo de índice inválido: {path}")
+            magic, source_mtime, count, posting_count, data_size, skipped_count, skipped_size = \
+                HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"Arquivo de índice inválido: {path}")
+            try:
+                masses = array("d")
+                masses.fromfile(f, count)
+                data = f.read(data_size)
+                skipped_data = f.read(skipped_size)
+                if len(data) != data_size or len(skipped_data) != skipped_size:
+                    raise EOFError
+                postings = {}
+                for _ in range(posting_count):
+                    header = f.read(POSTING_HEADER.size)
+                    if len(header) != POSTING_HEADER.size:
+                        raise EOFError
+                    symbol, size = POSTING_HEADER.unpack(header)
+                    posting = array("q")
+                    posting.fromfile(f, size)
+                    postings[symbol.decode("ascii").rstrip()] = posting
+            except EOFError:
+                raise ValueError(f"Arquivo de índice incompleto: {path}")
+        try:
+            formulas = _unpack_strings(data)
+            texts = _unpack_strings(skipped_data)
+        except (struct.error, UnicodeDecodeError):
+            raise ValueError(f"Arquivo de índice inválido: {path}")
+        skipped = list(zip(texts[::2], texts[1::2]))
+        if len(formulas) != count or len(texts) != 2 * skipped_count:
+            raise ValueError(f"Arquivo de índice inválido: {path}")
+        return cls(formulas, masses, postings, skipped), source_mtime
+
+
+def _pack_strings(texts):
+    """Codifica textos em UTF-8, cada um precedido do seu tamanho em bytes."""
+    parts = []
+    for text in texts:
+        encoded = text.encode("utf-8")
+        parts.append(STRING_HEADER.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _unpack_strings(data):
+    """Decodifica os textos gravados por _pack_strings.
+    Lança struct.error ou UnicodeDecodeError se os dados estiverem corrompidos.
+    """
+    texts = []
+    position = 0
+    while position < len(data):
+        (size,) = STRING_HEADER.unpack_from(data, position)
+        position += STRING_HEADER.size
+        encoded = data[position:position + size]
+        if len(encoded) != size:
+            raise struct.error("texto truncado")
+        texts.append(encoded.decode("utf-8"))
+        position += size
+    return texts
+
+
+def _contains(posting, position, first, last):
+    """Retorna True se position está em posting[first:last], por busca binária."""
+    index = bisect_left(posting, position, first, last)
+    return index < last and posting[index] == position
+
+
+def read_catalog(filename):
+    """Lê um catálogo de fórmulas, uma por linha (linhas vazias são ignoradas)."""
+    with open(filename, "rt", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_or_build(filename):
+    """
+    Retorna o índice do catálogo de fórmulas de um arquivo.
+
+    Usa o snapshot gravado ao lado do catálogo se ele corresponder à versão
+    atual do arquivo; caso contrário, constrói o índice e grava o snapshot.
+
+    Lança FileNotFoundError se o catálogo não existir; as fórmulas
+    inválidas ficam em index.skipped.
+    """
+    source_mtime = os.stat(filename).st_mtime_ns
+    path = filename + SNAPSHOT_SUFFIX
+    try:
+        index, cached_mtime = CompoundIndex.load(path)
+        if cached_mtime == source_mtime:
+            return index
+    except (FileNotFoundError, ValueError):
+        pass
+
+    index = CompoundIndex.from_formulas(read_catalog(filename))
+    try:
+        index.save(path, source_mtime)
+    except OSError:
+        # Sem permissão para gravar o snapshot: o índice continua utilizável.
+        pass
+    return index
+
+
+def main(argv=None):
+    """Consulta um catálogo de fórmulas por composição e faixa de massa molar."""
+    parser = argparse.ArgumentParser(
+        description="Busca compostos de um catálogo (uma fórmula por linha) "
+                    "por elementos e faixa de massa molar.")
+    parser.add_argument("catalog", help="arquivo com uma fórmula por linha")
+    parser.add_argument("-e", "--elements", nargs="*", default=[],
+                        help="símbolos que os compostos devem conter, ex: Fe O")
+    parser.add_argument("--min", type=float, dest="min_mass", help="massa molar mínima (g/mol)")
+    parser.add_argument("--max", type=float, dest="max_mass", help="massa molar máxima (g/mol)")
+    parser.add_argument("-n", "--limit", type=int, default=20,
+                        help="número máximo de compostos listados (0 = todos)")
+    args = parser.parse_args(argv)
+
+    known_symbols = known_symbols_for(get_periodic_table())
+    for symbol in args.elements:
+        if symbol not in known_symbols:
+            parser.error(f"símbolo desconhecido: {symbol}")
+
+    start = time.perf_counter()
+    try:
+        index = load_or_build(args.catalog)
+    except FileNotFoundError as e:
+        print(f"[ERRO] Arquivo não encontrado: {e.filename}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
+    for formula, error in index.skipped:
+        print(f"[ERRO NA FÓRMULA] {formula}: {error}", file=sys.stderr)
+    positions = index.query_positions(args.elements, args.min_mass, args.max_mass)
+    elapsed = time.perf_counter() - loaded
+
+    for position in positions[:args.limit or None]:
+        print(f"{index.formulas[position]}\t{index.masses[position]:.5f}")
+    print(f"{len(positions)} de {len(index)} compostos ({len(index.skipped)} fórmulas ignoradas); "
+          f"índice carregado em "
+          f"{(loaded - start) * 1e3:.1f} ms, consulta em {elapsed * 1e3:.3f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
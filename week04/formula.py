@@ -1,21 +1,17 @@
 # Este arquivo contém a função parse_formula, que converte uma
 # string de fórmula química em uma lista que o nosso programa pode usar.
 
-from re import findall
+from chemistry import get_periodic_table, parse_formula_as
 
-def parse_formula(formula: str) -> list:
+def parse_formula(formula: str, periodic_table_dict=None) -> list:
     """
     Converte uma fórmula química em uma lista de tuplas.
     Exemplo: "H2O" se torna [("H", 2), ("O", 1)]
-    """
-    # Expressão regular para encontrar pares de (Elemento)(Quantidade)
-    pattern = r"([A-Z][a-z]?)(\d*)"
-    matches = findall(pattern, formula)
-
-    # Processa os resultados para adicionar quantidade 1 onde não for especificado
-    parsed_list = []
-    for symbol, quantity_str in matches:
-        quantity = int(quantity_str) if quantity_str else 1
-        parsed_list.append((symbol, quantity))
 
-    return parsed_list
\ No newline at end of file
+    Usa o mesmo analisador de chemistry.parse_formula, então aceita
+    parênteses e hidratos, soma elementos repetidos, ordena os símbolos e
+    lança FormulaError para fórmulas inválidas.
+    """
+    if periodic_table_dict is None:
+        periodic_table_dict = get_periodic_table()
+    return parse_formula_as(formula, periodic_table_dict, "tuples")
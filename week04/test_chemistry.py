@@ -0,0 +1,291 @@
+import io
+import json
+import os
+import pickle
+from array import array
+
+from chemistry import get_periodic_table, make_periodic_table, parse_formula, \
+    parse_formula_cached, parse_formula_as, compute_molar_mass, FormulaCache, FormulaError, \
+    FORMULA_CACHE, PeriodicTable, NAME_INDEX, ATOMIC_MASS_INDEX, known_symbols_for, symbol_index_for
+from formula import parse_formula as parse_formula_tuples
+from batch_molar_mass import batch_molar_masses, make_formulas, compute_molar_masses, CompoundMatrix
+from compound_index import CompoundIndex, load_or_build
+from bulk_stoichiometry import read_rows, process_rows, write_results, MolarMassMemo
+from pytest import approx
+import pytest
+
+
+def test_get_periodic_table():
+    """Verify that the shared periodic table is loaded once and is immutable."""
+    table = get_periodic_table()
+    assert table is get_periodic_table()
+    assert len(table) == 94
+
+    iron = table.index_of["Fe"]
+    assert table.symbols[iron] == "Fe"
+    assert table.names[iron] == "Iron"
+    assert table.masses[iron] == approx(55.845)
+    assert table["Fe"][NAME_INDEX] == "Iron"
+    assert table["Fe"][ATOMIC_MASS_INDEX] == approx(55.845)
+
+    # The dictionary from make_periodic_table has the same data.
+    assert make_periodic_table() == table.to_dict()
+
+    with pytest.raises(AttributeError):
+        table.masses = ()
+    with pytest.raises(TypeError):
+        table.index_of["Xx"] = 0
+
+    copy = pickle.loads(pickle.dumps(table))
+    assert isinstance(copy, PeriodicTable)
+    assert copy.to_dict() == table.to_dict()
+
+
+def test_parse_formula():
+    """Verify that parse_formula returns sorted [symbol, quantity] lists."""
+    periodic_table_dict = get_periodic_table()
+
+    assert parse_formula("H2O", periodic_table_dict) == [["H", 2], ["O", 1]]
+    assert parse_formula("Mg(OH)2", periodic_table_dict) == [["H", 2], ["Mg", 1], ["O", 2]]
+    assert parse_formula("C6H12O6", periodic_table_dict) == [["C", 6], ["H", 12], ["O", 6]]
+    assert parse_formula("(C2(NaCl)4H2)2C4Na", periodic_table_dict) == \
+        [["C", 8], ["Cl", 8], ["H", 4], ["Na", 9]]
+
+    # The lists returned to the caller must not share state with the cache.
+    result = parse_formula("H2O", periodic_table_dict)
+    result[0][1] = 99
+    assert parse_formula("H2O", periodic_table_dict) == [["H", 2], ["O", 1]]
+
+    for bad_formula in ["", "L", "H2L4", "(H2O", "H2O)", "h2o", None]:
+        with pytest.raises(FormulaError):
+            parse_formula(bad_formula, periodic_table_dict)
+
+
+def test_parse_formula_nested():
+    """Verify brackets, hydrates, coefficients and strict character checks."""
+    periodic_table_dict = get_periodic_table()
+
+    assert parse_formula("K4[Fe(CN)6]", periodic_table_dict) == \
+        [["C", 6], ["Fe", 1], ["K", 4], ["N", 6]]
+    for hydrate in ["CuSO4·5H2O", "CuSO4.5H2O", "CuSO4*5H2O"]:
+        assert parse_formula(hydrate, periodic_table_dict) == \
+            [["Cu", 1], ["H", 10], ["O", 9], ["S", 1]]
+    assert parse_formula("2H2O", periodic_table_dict) == [["H", 4], ["O", 2]]
+
+    deep = "(" * 200 + "H" + ")2" * 200
+    assert parse_formula(deep, periodic_table_dict) == [["H", 2 ** 200]]
+
+    # Whitespace is ignored, as in the original parser; other stray characters are errors.
+    assert parse_formula("H2 O", periodic_table_dict) == [["H", 2], ["O", 1]]
+    assert parse_formula(" Mg (OH)2\n", periodic_table_dict) == [["H", 2], ["Mg", 1], ["O", 2]]
+    for bad_formula in ["H2O-", "(H]", "[H)", "(2H)", "H2O·", "·H2O", "H2-O", "H2O!", "  "]:
+        with pytest.raises(FormulaError):
+            parse_formula(bad_formula, periodic_table_dict)
+
+
+def test_known_symbols_follow_table_changes():
+    """Verify that a symbol set is not reused after a dictionary table is edited in place."""
+    table = {"H": ["Hydrogen", 1.00794], "O": ["Oxygen", 15.9994]}
+    symbols = known_symbols_for(table)
+    assert symbols == {"H", "O"}
+    assert known_symbols_for(table) is symbols
+
+    # Same size, different key.
+    del table["O"]
+    table["Xx"] = ["Example", 1.0]
+    assert known_symbols_for(table) == {"H", "Xx"}
+    assert parse_formula("H2Xx", table) == [["H", 2], ["Xx", 1]]
+    with pytest.raises(FormulaError):
+        parse_formula("H2O", table)
+
+    periodic_table = get_periodic_table()
+    assert known_symbols_for(periodic_table) is periodic_table.known_symbols
+
+
+def test_parse_formula_cached():
+    """Verify that repeated formulas are served from the cache as tuples."""
+    periodic_table_dict = get_periodic_table()
+    FORMULA_CACHE.clear()
+
+    first = parse_formula_cached("Fe2O3", periodic_table_dict)
+    second = parse_formula_cached("Fe2O3", periodic_table_dict)
+    assert first == (("Fe", 2), ("O", 3))
+    assert second is first
+
+    stats = FORMULA_CACHE.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_parse_formula_as():
+    """Verify that every output view comes from a single cached parse."""
+    periodic_table_dict = get_periodic_table()
+    FORMULA_CACHE.clear()
+
+    assert parse_formula_as("Fe2O3", periodic_table_dict, "tuples") == [("Fe", 2), ("O", 3)]
+    assert parse_formula_as("Fe2O3", periodic_table_dict, "lists") == [["Fe", 2], ["O", 3]]
+    assert parse_formula_as("Fe2O3", periodic_table_dict, "dict") == {"Fe": 2, "O": 3}
+
+    vector = parse_formula_as("Fe2O3", periodic_table_dict, "vector")
+    index_of = symbol_index_for(known_symbols_for(periodic_table_dict))[1]
+    assert len(vector) == len(periodic_table_dict)
+    assert vector[index_of["Fe"]] == 2
+    assert vector[index_of["O"]] == 3
+    assert sum(vector) == 5
+
+    stats = FORMULA_CACHE.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 3
+
+    with pytest.raises(ValueError):
+        parse_formula_as("Fe2O3", periodic_table_dict, "matrix")
+
+
+def test_formula_module_delegates():
+    """Verify that formula.parse_formula uses the same parser as chemistry."""
+    assert parse_formula_tuples("H2O") == [("H", 2), ("O", 1)]
+    assert parse_formula_tuples("Mg(OH)2") == [("H", 2), ("Mg", 1), ("O", 2)]
+    with pytest.raises(FormulaError):
+        parse_formula_tuples("H2L4")
+
+
+def test_formula_cache_eviction():
+    """Verify that the cache evicts the least recently used formula."""
+    cache = FormulaCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_batch_molar_masses():
+    """Verify that the batch engine matches compute_molar_mass exactly."""
+    periodic_table_dict = get_periodic_table()
+    formulas = ["H2O", "C6H12O6", "Mg(OH)2", "H2O", "PO4H2(CH2)12CH3", "Fe2O3"]
+
+    expected = [compute_molar_mass(parse_formula(formula, periodic_table_dict),
+                                   periodic_table_dict) for formula in formulas]
+    assert list(batch_molar_masses(formulas, periodic_table_dict)) == expected
+    assert list(batch_molar_masses(formulas, make_periodic_table())) == expected
+    assert list(batch_molar_masses([], periodic_table_dict)) == []
+
+    # Empty rows, including at the start and the end, get a mass of zero.
+    matrix = CompoundMatrix(array("l", [0, 0, 2, 2, 3, 3]), array("l", [0, 1, 0]), array("l", [1, 2, 3]))
+    assert list(compute_molar_masses(matrix, array("d", [1.0, 10.0]))) == [0.0, 21.0, 0.0, 3.0, 0.0]
+
+
+def test_bulk_stoichiometry_rows():
+    """Verify that bulk rows are computed in order and errors are reported per row."""
+    stream = io.StringIO(
+        "formula,sample_mass\n"
+        "H2O,36.03056\n"
+        "H2O),5\n"
+        "Mg(OH)2,abc\n"
+        "H2O,18.01528\n")
+    results = list(process_rows(read_rows(stream, "csv")))
+
+    assert [result["line"] for result in results] == [2, 3, 4, 5]
+    assert results[0]["molar_mass"] == approx(18.01528)
+    assert results[0]["moles"] == approx(2.0)
+    assert results[0]["error"] is None
+    assert results[1]["error"].startswith("FormulaError")
+    assert "abc" in results[2]["error"]
+    assert results[3]["moles"] == approx(1.0)
+
+    stream = io.StringIO('{"formula": "NaCl", "sample_mass": 58.44}\n[1, 2]\n')
+    results = list(process_rows(read_rows(stream, "jsonl")))
+    assert results[0]["moles"] == approx(1.0, rel=1e-3)
+    assert results[1]["error"] is not None
+
+    # Non-finite masses are rejected, so the JSONL output stays valid JSON.
+    stream = io.StringIO('{"formula": "H2O", "sample_mass": NaN}\n'
+                         '{"formula": "H2O", "sample_mass": "inf"}\n'
+                         '{"formula": "H2O", "sample_mass": -Infinity}\n')
+    output = io.StringIO()
+    assert write_results(process_rows(read_rows(stream, "jsonl")), output, "jsonl") == (3, 3)
+    for line in output.getvalue().splitlines():
+        row = json.loads(line, parse_constant=pytest.fail)
+        assert row["moles"] is None
+
+    # The memo is a bounded LRU cache.
+    memo = MolarMassMemo(get_periodic_table(), max_size=2)
+    for formula in ["H2O", "NaCl", "CO2", "H2O"]:
+        memo.molar_mass(formula)
+    assert memo._results.stats()["size"] == 2
+    assert memo._results.stats()["evictions"] == 2
+
+    # A cached error is raised as a fresh exception, so its traceback does not grow.
+    errors = []
+    for _ in range(50):
+        with pytest.raises(FormulaError) as excinfo:
+            memo.molar_mass("H2Xx")
+        errors.append(excinfo.value)
+    assert len({id(error) for error in errors}) == len(errors)
+    assert len({str(error) for error in errors}) == 1
+    depth, traceback = 0, errors[-1].__traceback__
+    while traceback is not None:
+        depth, traceback = depth + 1, traceback.tb_next
+    assert depth <= 3
+
+
+def test_compound_index(tmp_path):
+    """Verify composition and mass range queries against a linear scan."""
+    periodic_table_dict = get_periodic_table()
+    formulas = make_formulas(3000, distinct=1500, seed=1) + ["Fe2O3", "FeO", "Fe3O4", "H2O", "Fe0O3"]
+    index = CompoundIndex.from_formulas(formulas + ["H2Xx", "(H2O"])
+    assert len(index) == len(set(formulas))
+    assert [formula for formula, _ in index.skipped] == ["H2Xx", "(H2O"]
+    assert list(index.masses) == sorted(index.masses)
+
+    def linear_scan(elements, min_mass, max_mass):
+        # A zero quantity does not count as present, as in the posting lists.
+        return [(formula, mass) for formula, mass in zip(index.formulas, index.masses)
+                if min_mass <= mass <= max_mass
+                and all(dict(parse_formula_cached(formula, periodic_table_dict)).get(symbol, 0) > 0
+                        for symbol in elements)]
+
+    for elements, min_mass, max_mass in [(["Fe", "O"], 150, 250), (["O"], 0, 1e9),
+                                         ([], 100, 101), (["Fe", "O", "H"], 0, 5000)]:
+        assert index.query(elements, min_mass, max_mass) == \
+            linear_scan(elements, min_mass, max_mass)
+
+    assert ("Fe2O3", approx(159.6882)) in index.query(["Fe", "O"], 150, 250)
+    assert index.query(["Og"]) == []
+
+    catalog = tmp_path / "catalog.txt"
+    catalog.write_text("\n".join(formulas + ["H2Xx"]) + "\n", encoding="utf-8")
+    built = load_or_build(str(catalog))
+    assert (tmp_path / "catalog.txt.cidx").exists()
+    loaded = load_or_build(str(catalog))
+    assert loaded.skipped == built.skipped == [("H2Xx", index.skipped[0][1])]
+    assert loaded.formulas == built.formulas
+    assert loaded.masses == built.masses
+    assert loaded.postings == built.postings
+
+
+def test_compound_index_snapshot_with_skipped(tmp_path):
+    """Verify that skipped formulas with tabs and newlines survive a snapshot round trip."""
+    index = CompoundIndex.from_formulas(["H2O", "H2\tO", "H2\tXx", "Na\nQq", "(CO2", "Fe2O3"])
+    assert index.formulas == ["H2O", "H2\tO", "Fe2O3"]
+    assert [formula for formula, _ in index.skipped] == ["H2\tXx", "Na\nQq", "(CO2"]
+
+    path = str(tmp_path / "index.cidx")
+    index.save(path, source_mtime=123)
+    loaded, source_mtime = CompoundIndex.load(path)
+    assert source_mtime == 123
+    assert loaded.formulas == index.formulas
+    assert loaded.skipped == index.skipped
+    assert loaded.query(["O"]) == index.query(["O"])
+
+    # A truncated snapshot is rejected instead of read back wrong.
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    with pytest.raises(ValueError):
+        CompoundIndex.load(path)
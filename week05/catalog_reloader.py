@@ -0,0 +1,209 @@
+import csv
+import os
+import threading
+import time
+from array import array
+
+from receipt import ProductCatalog, parse_cents, price_order, \
+    PRODUCT_ID_INDEX, PRODUCT_NAME_INDEX, PRODUCT_PRICE_INDEX
+
+# Intervalo padrão, em segundos, entre as verificações do arquivo.
+DEFAULT_INTERVAL = 1.0
+
+
+def read_catalog_rows(filename):
+    """Lê as linhas do CSV de produtos sem converter os preços.
+    Retorna: uma lista de tuplas (número do produto, nome, preço como texto).
+    Lança ValueError se alguma linha não tiver todas as colunas.
+    """
+    column_count = max(PRODUCT_ID_INDEX, PRODUCT_NAME_INDEX, PRODUCT_PRICE_INDEX) + 1
+    rows = []
+    with open(filename, "rt", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader, None)  # Pula a linha do cabeçalho
+        for row in reader:
+            if len(row) != 0:
+                if len(row) < column_count:
+                    raise ValueError(f"linha {reader.line_num} incompleta: {row}")
+                rows.append((row[PRODUCT_ID_INDEX], row[PRODUCT_NAME_INDEX],
+                             row[PRODUCT_PRICE_INDEX]))
+    return rows
+
+
+class CatalogReloader:
+    """
+    Mantém um ProductCatalog sempre atualizado com o CSV de produtos.
+
+    O catálogo é imutável: cada recarga monta um catálogo novo e troca a
+    referência de uma vez, então um recibo que já pegou self.catalog
+    termina com os preços antigos, sem travas, e os seguintes já usam os
+    novos. Na recarga, só os preços das linhas novas ou alteradas são
+    convertidos de novo; os demais são copiados do catálogo anterior.
+    """
+
+    def __init__(self, filename, interval=DEFAULT_INTERVAL):
+        self.filename = filename
+        self.interval = interval
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = self._file_signature()
+        # Texto original de cada linha: número do produto -> (nome, preço como texto).
+        self._rows = {}
+        self.catalog = ProductCatalog((), (), ())
+        self.catalog, self._rows = self._build(read_catalog_rows(filename))[:2]
+
+        self.reloads = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_reload_ms = 0.0
+        self.total_reload_ms = 0.0
+        self.rows_added = 0
+        self.rows_changed = 0
+        self.rows_removed = 0
+
+    def _file_signature(self):
+        """Retorna (mtime, tamanho) do CSV, usado para detectar alterações."""
+        stat = os.stat(self.filename)
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """Recarrega o catálogo se o arquivo mudou desde a última leitura.
+        Retorna: True se o catálogo foi trocado.
+        """
+        try:
+            signature = self._file_signature()
+        except OSError as e:
+            self._record_error(e)
+            return False
+        if signature == self._signature:
+            return False
+        return self.reload(signature)
+
+    def reload(self, signature=None):
+        """Relê o CSV e troca o catálogo, convertendo só as linhas alteradas.
+        Se o arquivo não puder ser lido ou tiver um preço inválido, o
+        catálogo atual é mantido e o erro é contado em errors.
+        Retorna: True se o catálogo foi trocado.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            try:
+                if signature is None:
+                    signature = self._file_signature()
+                rows = read_catalog_rows(self.filename)
+                catalog, new_rows, added, changed = self._build(rows)
+            except (OSError, csv.Error, ValueError) as e:
+                self._record_error(e)
+                return False
+
+            removed = len(self._rows) - (len(new_rows) - added)
+            self.catalog = catalog
+            self._rows = new_rows
+            self._signature = signature
+
+            elapsed_ms = (time.perf_counter() - start) * 1e3
+            self.reloads += 1
+            self.last_reload_ms = elapsed_ms
+            self.total_reload_ms += elapsed_ms
+            self.rows_added += added
+            self.rows_changed += changed
+            self.rows_removed += removed
+            return True
+
+    def _build(self, rows):
+        """Monta o catálogo novo, reaproveitando os preços das linhas iguais.
+        Retorna: uma tupla (catálogo, linhas, linhas novas, linhas alteradas).
+        """
+        old_rows = self._rows
+        old_catalog = self.catalog
+        product_ids, names, prices_cents = [], [], array("q")
+        index_of = {}
+        new_rows = {}
+        for product_id, name, price_text in rows:
+            if old_rows.get(product_id) == (name, price_text):
+                price_cents = old_catalog.price_cents(product_id)
+            else:
+                price_cents = parse_cents(price_text)
+            index = index_of.get(product_id)
+            if index is None:
+                index_of[product_id] = len(product_ids)
+                product_ids.append(product_id)
+                names.append(name)
+                prices_cents.append(price_cents)
+            else:
+                # Número repetido: a última linha vale, como em ProductCatalog.from_csv.
+                names[index] = name
+                prices_cents[index] = price_cents
+            new_rows[product_id] = (name, price_text)
+
+        # Contado por número de produto, depois de resolvidas as repetições.
+        added = changed = 0
+        for product_id, row in new_rows.items():
+            old_row = old_rows.get(product_id)
+            if old_row is None:
+                added += 1
+            elif old_row != row:
+                changed += 1
+        return ProductCatalog(product_ids, names, prices_cents), new_rows, added, changed
+
+    def _record_error(self, error):
+        """Conta uma recarga que falhou, guardando a mensagem de erro."""
+        self.errors += 1
+        self.last_error = str(error)
+
+    def price_order(self, items):
+        """Calcula um recibo com o catálogo atual (veja receipt.price_order)."""
+        return price_order(self.catalog, items)
+
+    def start(self):
+        """Começa a verificar o arquivo em uma thread em segundo plano."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="catalog-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread de verificação."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self):
+        """Laço da thread de verificação.
+        Um erro inesperado é contado em errors e a verificação continua, para
+        que a thread não morra em silêncio e as próximas alterações ainda
+        sejam carregadas.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self._record_error(e)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        """Retorna os contadores de recarga.
+        Retorna: um dicionário com products, reloads, errors, last_error,
+            last_reload_ms, total_reload_ms, rows_added, rows_changed e rows_removed.
+        """
+        return {
+            "products": len(self.catalog),
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_reload_ms": self.last_reload_ms,
+            "total_reload_ms": self.total_reload_ms,
+            "rows_added": self.rows_added,
+            "rows_changed": self.rows_changed,
+            "rows_removed": self.rows_removed,
+        }
@@ -0,0 +1,277 @@
+import csv
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+
+# Formato do índice (cabeçalho little-endian; tabelas na ordem de bytes da máquina,
+# pois o índice é sempre lido na mesma máquina em que foi gravado):
+#   cabeçalho: MAGIC, mtime (ns) e tamanho do CSV de origem, coluna da chave,
+#              número de chaves
+#   tabelas: deslocamentos das chaves (número + 1 inteiros q) e a posição,
+#            no CSV, da linha de cada chave (número inteiros q)
+#   dados: as chaves em UTF-8, ordenadas por bytes
+MAGIC = b"CSVIDX01"
+HEADER = struct.Struct("<8sqqIQ")
+OFFSET_SIZE = 8
+
+# Quantidade padrão de linhas guardadas no cache LRU.
+DEFAULT_CACHE_SIZE = 1024
+
+
+def index_path(filename, key_column_index):
+    """Retorna o caminho do índice de um CSV para uma coluna de chave."""
+    return f"{filename}.{key_column_index}.kidx"
+
+
+def build_index(filename, key_column_index, destination=None):
+    """Cria o índice chave -> posição da linha de um CSV, lendo o arquivo uma vez.
+
+    Só as chaves e as posições ficam em memória durante a construção; as
+    linhas são lidas de novo, do disco, quando consultadas. Se uma chave se
+    repete, vale a última linha, como em read_dictionary.
+
+    Parâmetros
+        filename: o caminho do arquivo CSV (a primeira linha é o cabeçalho)
+        key_column_index: o índice da coluna usada como chave
+        destination: o caminho do índice (padrão: index_path)
+    Retorna: o número de chaves gravadas
+    """
+    destination = destination or index_path(filename, key_column_index)
+    stat = os.stat(filename)
+    positions = {}
+    with open(filename, "rb") as csv_file:
+        lines = _LineTracker(csv_file)
+        reader = csv.reader(lines)
+        next(reader, None)  # Pula a linha do cabeçalho
+        start = lines.position
+        for row in reader:
+            if len(row) != 0:
+                positions[row[key_column_index].encode("utf-8")] = start
+            start = lines.position
+
+    keys = sorted(positions)
+    key_offsets = array("q", [0])
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+    row_positions = array("q", (positions[key] for key in keys))
+
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, key_column_index, len(keys)))
+        key_offsets.tofile(f)
+        row_positions.tofile(f)
+        f.writelines(keys)
+    os.replace(temp_path, destination)
+    return len(keys)
+
+
+class _LineTracker:
+    """Itera pelas linhas de um arquivo binário, decodificadas, guardando a posição após cada uma.
+
+    O leitor de CSV consome exatamente as linhas de um registro por vez,
+    então a posição depois de um registro é o início do próximo.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.position = stream.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self._stream.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode("utf-8")
+
+
+class _IndexState:
+    """Os mapeamentos de uma versão do CSV e do seu índice, trocados juntos."""
+    __slots__ = ("index", "data", "count", "keys_start", "key_offsets", "positions", "signature")
+
+    def __init__(self, filename, path):
+        with open(path, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(filename, "rb") as f:
+            # mmap não aceita arquivos vazios; um CSV sem linhas não tem chaves.
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if os.fstat(f.fileno()).st_size else b""
+
+        _, mtime, size, _, self.count = HEADER.unpack_from(self.index, 0)
+        # (mtime, tamanho) do CSV a partir do qual o índice foi gerado.
+        self.signature = (mtime, size)
+        # As tabelas são lidas diretamente do mapeamento, sem cópias.
+        positions_start = HEADER.size + (self.count + 1) * OFFSET_SIZE
+        self.keys_start = positions_start + self.count * OFFSET_SIZE
+        view = memoryview(self.index)
+        self.key_offsets = view[HEADER.size:positions_start].cast("q")
+        self.positions = view[positions_start:self.keys_start].cast("q")
+        view.release()
+
+    def close(self):
+        self.key_offsets.release()
+        self.positions.release()
+        self.index.close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+class IndexedCSV(Mapping):
+    """
+    Um dicionário somente leitura sobre um CSV, carregado sob demanda.
+
+    As chaves ficam em um índice ordenado no disco e o CSV é mapeado em
+    memória: cada consulta faz uma busca binária no índice e lê só a linha
+    pedida. As linhas mais usadas ficam em um cache LRU, então a memória
+    usada não depende do tamanho do arquivo. Os valores são as listas de
+    colunas da linha, como em read_dictionary.
+
+    Cada consulta compara o mtime e o tamanho do CSV com os do índice; se o
+    arquivo mudou, o índice é refeito, os mapeamentos são trocados e o cache
+    é esvaziado antes de responder, em vez de ler linhas em posições antigas.
+    Os mapeamentos antigos não são fechados, já que outra thread pode estar
+    lendo deles; são liberados quando a última referência desaparece.
+    """
+
+    def __init__(self, filename, key_column_index, cache_size=DEFAULT_CACHE_SIZE):
+        self.filename = filename
+        self.key_column_index = key_column_index
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.reloads = 0
+        self._state = self._open()
+
+    def _open(self):
+        """Refaz o índice, se preciso, e mapeia o índice e o CSV."""
+        path = index_path(self.filename, self.key_column_index)
+        if not self._index_is_current(path):
+            build_index(self.filename, self.key_column_index, path)
+        return _IndexState(self.filename, path)
+
+    def _index_is_current(self, path):
+        """Retorna True se o índice existe e foi gerado a partir da versão atual do CSV."""
+        stat = os.stat(self.filename)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) != HEADER.size:
+            return False
+        magic, mtime, size, key_column_index, _ = HEADER.unpack(header)
+        return (magic == MAGIC and mtime == stat.st_mtime_ns and size == stat.st_size
+                and key_column_index == self.key_column_index)
+
+    def _current_state(self):
+        """Retorna os mapeamentos da versão atual do CSV, refazendo-os se o arquivo mudou.
+        Lança OSError se o CSV não puder mais ser lido.
+        """
+        state = self._state
+        stat = os.stat(self.filename)
+        if (stat.st_mtime_ns, stat.st_size) == state.signature:
+            return state
+        with self._reload_lock:
+            state = self._state
+            stat = os.stat(self.filename)
+            if (stat.st_mtime_ns, stat.st_size) != state.signature:
+                state = self._open()
+                with self._lock:
+                    self._state = state
+                    self._cache.clear()
+                self.reloads += 1
+        return state
+
+    def __len__(self):
+        return self._current_state().count
+
+    @staticmethod
+    def _key_at(state, index):
+        """Retorna os bytes da chave na posição index do índice."""
+        return state.index[state.keys_start + state.key_offsets[index]:
+                           state.keys_start + state.key_offsets[index + 1]]
+
+    def _find(self, state, key):
+        """Retorna a posição de key no índice, ou -1."""
+        if not isinstance(key, str):
+            return -1
+        target = key.encode("utf-8", errors="surrogatepass")
+        key_at = self._key_at
+        low, high = 0, state.count
+        while low < high:
+            middle = (low + high) // 2
+            if key_at(state, middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < state.count and key_at(state, low) == target:
+            return low
+        return -1
+
+    @staticmethod
+    def _read_row(state, position):
+        """Lê e separa em colunas o registro do CSV que começa em position."""
+        data = state.data
+
+        def lines():
+            start = position
+            while start < len(data):
+                end = data.find(b"\n", start)
+                end = len(data) if end < 0 else end + 1
+                yield data[start:end].decode("utf-8")
+                start = end
+
+        return next(csv.reader(lines()))
+
+    def __getitem__(self, key):
+        state = self._current_state()
+        with self._lock:
+            row = self._cache.get(key) if self._state is state else None
+            if row is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(row)
+            self.misses += 1
+
+        index = self._find(state, key)
+        if index < 0:
+            raise KeyError(key)
+        row = tuple(self._read_row(state, state.positions[index]))
+
+        with self._lock:
+            # Uma linha lida de uma versão já trocada não entra no cache.
+            if self._state is state:
+                self._cache[key] = row
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return list(row)
+
+    def __contains__(self, key):
+        state = self._current_state()
+        return key in self._cache or self._find(state, key) >= 0
+
+    def __iter__(self):
+        state = self._current_state()
+        for index in range(state.count):
+            yield self._key_at(state, index).decode("utf-8")
+
+    def __repr__(self):
+        return f"IndexedCSV({self.filename!r}, {self._state.count} chaves)"
+
+    def close(self):
+        """Libera os mapeamentos de memória."""
+        self._state.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,83 @@
+import random
+import sys
+import timeit
+from array import array
+from operator import mul
+
+from receipt import load_catalog, price_order, sales_tax_for, ProductCatalog
+
+
+def encode_order(catalog, items):
+    """Converte as linhas de um pedido em vetores de índices do catálogo e quantidades.
+    Parâmetros
+        catalog: um ProductCatalog
+        items: as tuplas (número do produto, quantidade) do pedido
+    Retorna: uma tupla (indices, quantities) de arrays alinhados
+    Lança KeyError se algum produto não estiver no catálogo.
+    """
+    if not items:
+        return array("l"), array("q")
+    product_ids, quantities = zip(*items)
+    indices = array("l", map(catalog.index_of.__getitem__, product_ids))
+    return indices, array("q", quantities)
+
+
+def total_order(catalog, indices, quantities):
+    """Calcula os totais de um pedido codificado, em centavos inteiros.
+
+    Os preços são reunidos em um vetor e multiplicados pelas quantidades
+    de uma vez, e as somas são feitas sobre os vetores; como tudo é inteiro,
+    os totais são idênticos aos de receipt.price_order.
+
+    Parâmetros
+        catalog: o ProductCatalog usado em encode_order
+        indices, quantities: os vetores de encode_order
+    Retorna: um dicionário com total_items, subtotal_cents, sales_tax_cents,
+        total_cents e line_totals_cents (o total de cada linha, um array('q'))
+    """
+    prices = array("q", map(catalog.prices_cents.__getitem__, indices))
+    line_totals = array("q", map(mul, prices, quantities))
+    subtotal_cents = sum(line_totals)
+    sales_tax_cents = sales_tax_for(subtotal_cents)
+    return {"total_items": sum(quantities), "subtotal_cents": subtotal_cents,
+            "sales_tax_cents": sales_tax_cents, "total_cents": subtotal_cents + sales_tax_cents,
+            "line_totals_cents": line_totals}
+
+
+def price_order_totals(catalog, items):
+    """Calcula só os totais de um pedido grande (veja encode_order e total_order)."""
+    if not isinstance(catalog, ProductCatalog):
+        raise TypeError("price_order_totals precisa de um ProductCatalog.")
+    return total_order(catalog, *encode_order(catalog, items))
+
+
+def make_order(catalog, lines, seed=0):
+    """Gera um pedido sintético com o número de linhas pedido."""
+    rng = random.Random(seed)
+    product_ids = list(catalog)
+    return [(rng.choice(product_ids), rng.randint(1, 24)) for _ in range(lines)]
+
+
+def main():
+    """Compara os totais vetoriais com o laço de price_order em um pedido grande."""
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    catalog = load_catalog(sys.argv[2] if len(sys.argv) > 2 else "products.csv")
+    items = make_order(catalog, lines)
+
+    totals_fields = ("total_items", "subtotal_cents", "sales_tax_cents", "total_cents")
+    expected = price_order(catalog, items)
+    actual = price_order_totals(catalog, items)
+    assert all(actual[field] == expected[field] for field in totals_fields), \
+        "os totais vetoriais divergem de price_order"
+
+    print(f"Totais de um pedido com {lines} linhas")
+    baseline = None
+    for name, function in (("price_order (laço)", lambda: price_order(catalog, items)),
+                           ("vetorial (array)", lambda: price_order_totals(catalog, items))):
+        seconds = min(timeit.repeat(function, number=1, repeat=3))
+        baseline = baseline or seconds
+        print(f"  {name:<22} {seconds * 1e3:9.1f} ms  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
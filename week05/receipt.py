@@ -1,5 +1,12 @@
 import csv
+import os
+import struct
+from array import array
+from collections.abc import Mapping
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sales_log import SalesLog, SALES_LOG_ENV
 
 # As constantes de índice permanecem as mesmas.
 PRODUCT_ID_INDEX = 0
@@ -8,68 +15,53 @@ PRODUCT_PRICE_INDEX = 2
 REQUEST_ID_INDEX = 0
 REQUEST_QUANTITY_INDEX = 1
 
+# Nome da loja e taxa do imposto sobre vendas, em pontos percentuais.
+STORE_NAME = "Inkom Emporium"
+SALES_TAX_PERCENT = 6
+
 def main():
     try:
-        # Lê o catálogo de produtos para um dicionário.
-        products_dict = read_dictionary("products.csv", PRODUCT_ID_INDEX)
+        # Lê o catálogo de produtos (ou o seu snapshot binário).
+        products_dict = load_catalog("products.csv")
 
         # ALTERAÇÃO: Nome da loja conforme o requisito.
-        print("Inkom Emporium")
+        print(STORE_NAME)
         print()
 
-        # Abre o arquivo de pedido do cliente para leitura.
-        with open("request.csv", "rt") as request_file:
-            reader = csv.reader(request_file)
-            # Pula a primeira linha (cabeçalho)
-            next(reader)
+        # Lê o pedido do cliente e calcula os valores do recibo.
+        receipt = price_order(products_dict, read_request("request.csv"))
 
-            print("Itens Encomendados:")
-            
-            # Inicializa variáveis para os cálculos
-            subtotal = 0
-            total_items = 0
+        print("Itens Encomendados:")
+        for item in receipt["items"]:
+            # Exibe os detalhes do item no recibo.
+            print(f"{item['name']}: {item['quantity']} @ ${format_cents(item['price_cents'])}")
 
-            # ALTERAÇÃO: Loop corrigido para iterar sobre o 'reader' do CSV.
-            for row in reader:
-                # O reader já divide a linha em uma lista.
-                product_id = row[REQUEST_ID_INDEX]
-                quantity = int(row[REQUEST_QUANTITY_INDEX])
-
-                # Busca o produto no dicionário (pode gerar KeyError).
-                product_data = products_dict[product_id]
-
-                # Extrai os dados do produto.
-                product_name = product_data[PRODUCT_NAME_INDEX]
-                product_price = float(product_data[PRODUCT_PRICE_INDEX])
-
-                # Exibe os detalhes do item no recibo.
-                print(f"{product_name}: {quantity} @ ${product_price:.2f}")
-
-                # Acumula os totais.
-                total_items += quantity
-                subtotal += product_price * quantity
-        
-        # Calcula imposto e total final.
-        sales_tax_rate = 0.06
-        sales_tax = subtotal * sales_tax_rate
-        total_due = subtotal + sales_tax
-        
         # Exibe o resumo do pedido.
         print()
-        print(f"Número de Itens: {total_items}")
-        print(f"Subtotal: ${subtotal:.2f}")
-        print(f"Imposto sobre Vendas (6%): ${sales_tax:.2f}")
-        print(f"Total: ${total_due:.2f}")
+        print(f"Número de Itens: {receipt['total_items']}")
+        print(f"Subtotal: ${format_cents(receipt['subtotal_cents'])}")
+        print(f"Imposto sobre Vendas ({SALES_TAX_PERCENT}%): ${format_cents(receipt['sales_tax_cents'])}")
+        print(f"Total: ${format_cents(receipt['total_cents'])}")
         print()
 
         # ALTERAÇÃO: Mensagem final conforme o requisito.
-        print("Thank you for shopping at the Inkom Emporium.")
+        print(f"Thank you for shopping at the {STORE_NAME}.")
 
         # Obtém a data e hora atuais.
         current_date_time = datetime.now()
         # ALTERAÇÃO: Formato de data e hora conforme o requisito.
         print(f"{current_date_time:%a %b %d %H:%M:%S %Y}")
 
+        # Registra a venda no log de vendas indicado pela variável de ambiente
+        # SALES_LOG, se houver (veja sales_analytics.py e sales_log.compact).
+        sales_log_path = os.environ.get(SALES_LOG_ENV)
+        if sales_log_path:
+            try:
+                with SalesLog(sales_log_path) as sales_log:
+                    sales_log.append(receipt, current_date_time.timestamp())
+            except OSError as e:
+                print(f"Aviso: não foi possível gravar o log de vendas: {e}")
+
     except FileNotFoundError as e:
         # ALTERAÇÃO: Mensagem de erro para FileNotFoundError conforme o requisito.
         print("Error: missing file")
@@ -84,13 +76,306 @@ def main():
         print(f"Ocorreu um erro inesperado: {e}")
 
 
-def read_dictionary(filename, key_column_index):
+def read_request(filename):
+    """Lê um arquivo de pedido (colunas Product # e Quantity).
+    Parâmetros:
+        filename: o caminho do arquivo CSV do pedido.
+    Retorna: uma lista de tuplas (número do produto, quantidade).
+    """
+    items = []
+    with open(filename, "rt") as request_file:
+        reader = csv.reader(request_file)
+        # Pula a primeira linha (cabeçalho)
+        next(reader, None)
+        for row in reader:
+            if len(row) != 0:
+                items.append((row[REQUEST_ID_INDEX], int(row[REQUEST_QUANTITY_INDEX])))
+    return items
+
+
+def price_order(products_dict, items):
+    """Calcula os valores do recibo de um pedido, em centavos inteiros.
+    Parâmetros:
+        products_dict: um ProductCatalog ou o dicionário de read_dictionary.
+        items: as tuplas (número do produto, quantidade) do pedido.
+    Retorna: um dicionário com a lista de itens (product_id, name,
+        quantity, price_cents) e os totais total_items, subtotal_cents,
+        sales_tax_cents e total_cents.
+    Lança KeyError se algum produto não estiver no catálogo.
+    """
+    receipt_items = []
+    subtotal_cents = 0
+    total_items = 0
+    for product_id, quantity in items:
+        # Busca o produto no dicionário (pode gerar KeyError).
+        product_data = products_dict[product_id]
+        if isinstance(product_data, Product):
+            price_cents = product_data.price_cents
+        else:
+            price_cents = parse_cents(product_data[PRODUCT_PRICE_INDEX])
+        receipt_items.append({"product_id": product_id,
+                              "name": product_data[PRODUCT_NAME_INDEX],
+                              "quantity": quantity,
+                              "price_cents": price_cents})
+
+        # Acumula os totais.
+        total_items += quantity
+        subtotal_cents += price_cents * quantity
+
+    # Calcula imposto e total final.
+    sales_tax_cents = sales_tax_for(subtotal_cents)
+    return {"items": receipt_items, "total_items": total_items,
+            "subtotal_cents": subtotal_cents, "sales_tax_cents": sales_tax_cents,
+            "total_cents": subtotal_cents + sales_tax_cents}
+
+
+# Valores em centavos do recibo e os campos correspondentes, em dólares.
+CENTS_FIELDS = (("subtotal_cents", "subtotal"), ("sales_tax_cents", "sales_tax"),
+                ("total_cents", "total"))
+
+
+def receipt_in_dollars(receipt):
+    """Converte os valores em centavos de um recibo de price_order para dólares.
+    Retorna: uma cópia do recibo com subtotal, sales_tax, total e o price de
+        cada item em dólares, no lugar dos campos terminados em _cents.
+    """
+    converted = {key: value for key, value in receipt.items()
+                 if not key.endswith("_cents")}
+    for cents_field, field in CENTS_FIELDS:
+        if cents_field in receipt:
+            converted[field] = receipt[cents_field] / 100
+    if "items" in receipt:
+        converted["items"] = [{"product_id": item["product_id"], "name": item["name"],
+                               "quantity": item["quantity"], "price": item["price_cents"] / 100}
+                              for item in receipt["items"]]
+    return converted
+
+
+def sales_tax_for(subtotal_cents):
+    """Retorna o imposto sobre vendas de um subtotal, em centavos (metades arredondadas para cima).
+
+    Antes o imposto era calculado em float e formatado com .2f, o que
+    arredondava algumas metades para baixo (ex: 6% de $0.75 = 0.045 virava
+    0.04); em centavos inteiros ele passa a ser 0.05.
+    """
+    return (subtotal_cents * SALES_TAX_PERCENT + 50) // 100
+
+
+def parse_cents(text):
+    """Converte um preço em dólares, ex: "2.85", em centavos inteiros (285).
+    Lança ValueError se o preço não for um número com no máximo dois decimais.
+    """
+    try:
+        cents = Decimal(text.strip()).scaleb(2)
+    except (InvalidOperation, AttributeError):
+        raise ValueError(f"Preço inválido: {text!r}")
+    if not cents.is_finite() or cents != cents.to_integral_value():
+        raise ValueError(f"Preço inválido: {text!r}")
+    return int(cents)
+
+
+def format_cents(cents):
+    """Formata centavos inteiros como dólares, ex: 285 -> "2.85"."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+class Product:
+    """
+    Um produto do catálogo, com o preço em centavos inteiros.
+
+    Também se comporta como a linha do CSV de read_dictionary:
+    product[PRODUCT_NAME_INDEX] é o nome e product[PRODUCT_PRICE_INDEX] é o
+    preço em dólares.
+    """
+    __slots__ = ("product_id", "name", "price_cents")
+
+    def __init__(self, product_id, name, price_cents):
+        self.product_id = product_id
+        self.name = name
+        self.price_cents = price_cents
+
+    @property
+    def price(self):
+        """O preço em dólares."""
+        return self.price_cents / 100
+
+    def __getitem__(self, index):
+        return (self.product_id, self.name, self.price)[index]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.product_id, self.name, self.price))
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return (self.product_id, self.name, self.price_cents) == \
+            (other.product_id, other.name, other.price_cents)
+
+    def __repr__(self):
+        return f"Product({self.product_id!r}, {self.name!r}, {self.price_cents})"
+
+
+# Formato do snapshot do catálogo (cabeçalho little-endian; preços na ordem
+# de bytes da máquina, pois o snapshot é sempre lido na mesma máquina):
+#   cabeçalho: MAGIC, mtime do CSV de origem (ns), número de produtos,
+#              tamanho dos números e dos nomes em bytes
+#   dados: preços em centavos (q), números e nomes em UTF-8 separados por "\0"
+CATALOG_MAGIC = b"PRODCAT1"
+CATALOG_HEADER = struct.Struct("<8sqQQQ")
+CATALOG_SUFFIX = ".pcat"
+
+
+class ProductCatalog(Mapping):
+    """
+    Catálogo de produtos imutável, guardado em vetores paralelos.
+
+    product_ids e names são tuplas e prices_cents é um array('q') de
+    centavos, alinhados pelo índice do produto; index_of mapeia cada número
+    de produto ao seu índice. catalog[product_id] retorna um Product, que
+    pode ser usado no lugar da linha do CSV de read_dictionary.
+
+    Cada número de produto aparece uma única vez; from_csv fica com a última
+    linha de um número repetido, como o dicionário de read_dictionary.
+    """
+
+    def __init__(self, product_ids, names, prices_cents):
+        if not len(product_ids) == len(names) == len(prices_cents):
+            raise ValueError("Os vetores do catálogo devem ter o mesmo tamanho.")
+        self.product_ids = tuple(product_ids)
+        self.names = tuple(names)
+        self.prices_cents = array("q", prices_cents)
+        self.index_of = {product_id: index for index, product_id in enumerate(self.product_ids)}
+        if len(self.index_of) != len(self.product_ids):
+            raise ValueError("O catálogo tem números de produto repetidos.")
+
+    def __reduce__(self):
+        return (ProductCatalog, (self.product_ids, self.names, self.prices_cents))
+
+    def __getitem__(self, product_id):
+        index = self.index_of[product_id]
+        return Product(product_id, self.names[index], self.prices_cents[index])
+
+    def __contains__(self, product_id):
+        return product_id in self.index_of
+
+    def __iter__(self):
+        return iter(self.product_ids)
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def __repr__(self):
+        return f"ProductCatalog({len(self)} produtos)"
+
+    def price_cents(self, product_id):
+        """Retorna o preço de um produto em centavos (lança KeyError se não existir)."""
+        return self.prices_cents[self.index_of[product_id]]
+
+    @classmethod
+    def from_csv(cls, filename):
+        """Lê o catálogo de um CSV com as colunas Product #, Name e Price."""
+        product_ids, names, prices_cents = [], [], array("q")
+        index_of = {}
+        with open(filename, "rt", newline="") as csv_file:
+            reader = csv.reader(csv_file)
+            next(reader)  # Pula a linha do cabeçalho
+            for row in reader:
+                if len(row) != 0:
+                    product_id = row[PRODUCT_ID_INDEX]
+                    price_cents = parse_cents(row[PRODUCT_PRICE_INDEX])
+                    index = index_of.get(product_id)
+                    if index is None:
+                        index_of[product_id] = len(product_ids)
+                        product_ids.append(product_id)
+                        names.append(row[PRODUCT_NAME_INDEX])
+                        prices_cents.append(price_cents)
+                    else:
+                        # Número repetido: a última linha vale, na posição da primeira.
+                        names[index] = row[PRODUCT_NAME_INDEX]
+                        prices_cents[index] = price_cents
+        return cls(product_ids, names, prices_cents)
+
+    def save(self, path, source_mtime=0):
+        """Grava o catálogo em disco, de forma atômica."""
+        ids_data = "\0".join(self.product_ids).encode("utf-8")
+        names_data = "\0".join(self.names).encode("utf-8")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(CATALOG_HEADER.pack(CATALOG_MAGIC, source_mtime, len(self),
+                                        len(ids_data), len(names_data)))
+            self.prices_cents.tofile(f)
+            f.write(ids_data)
+            f.write(names_data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Lê um catálogo gravado com save().
+        Retorna: uma tupla (ProductCatalog, mtime do CSV de origem).
+        Lança ValueError se o arquivo não for um catálogo válido.
+        """
+        with open(path, "rb") as f:
+            header = f.read(CATALOG_HEADER.size)
+            if len(header) != CATALOG_HEADER.size:
+                raise ValueError(f"Snapshot de catálogo inválido: {path}")
+            magic, source_mtime, count, ids_size, names_size = CATALOG_HEADER.unpack(header)
+            if magic != CATALOG_MAGIC:
+                raise ValueError(f"Snapshot de catálogo inválido: {path}")
+            prices_cents = array("q")
+            try:
+                prices_cents.fromfile(f, count)
+            except EOFError:
+                raise ValueError(f"Snapshot de catálogo incompleto: {path}")
+            ids_data = f.read(ids_size)
+            names_data = f.read(names_size)
+        if len(ids_data) != ids_size or len(names_data) != names_size:
+            raise ValueError(f"Snapshot de catálogo incompleto: {path}")
+        product_ids = ids_data.decode("utf-8").split("\0") if count else []
+        names = names_data.decode("utf-8").split("\0") if count else []
+        return cls(product_ids, names, prices_cents), source_mtime
+
+
+def load_catalog(filename):
+    """Retorna o catálogo de produtos de um CSV.
+    Usa o snapshot binário gravado ao lado do CSV se ele corresponder à
+    versão atual do arquivo; caso contrário, lê o CSV e grava o snapshot.
+    Lança FileNotFoundError se o CSV não existir.
+    """
+    source_mtime = os.stat(filename).st_mtime_ns
+    path = filename + CATALOG_SUFFIX
+    try:
+        catalog, cached_mtime = ProductCatalog.load(path)
+        if cached_mtime == source_mtime:
+            return catalog
+    except (FileNotFoundError, ValueError):
+        pass
+
+    catalog = ProductCatalog.from_csv(filename)
+    try:
+        catalog.save(path, source_mtime)
+    except OSError:
+        # Sem permissão para gravar o snapshot: o catálogo continua utilizável.
+        pass
+    return catalog
+
+
+def read_dictionary(filename, key_column_index, lazy=False):
     """Lê o conteúdo de um arquivo CSV em um dicionário composto.
     Parâmetros:
         filename: o caminho do arquivo CSV a ser lido.
         key_column_index: o índice da coluna a ser usada como chave no dicionário.
+        lazy: se True, retorna um csv_index.IndexedCSV, que lê as linhas do
+            disco sob demanda em vez de carregar o arquivo inteiro.
     Retorna: um dicionário que contém os dados do arquivo CSV.
     """
+    if lazy:
+        from csv_index import IndexedCSV
+        return IndexedCSV(filename, key_column_index)
+
     dictionary = {}
     with open(filename, "rt") as csv_file:
         reader = csv.reader(csv_file)
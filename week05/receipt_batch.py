@@ -0,0 +1,232 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from receipt import load_catalog, read_request, price_order, receipt_in_dollars
+from sales_log import SalesLog
+
+# Quantidade padrão de pedidos enviados de uma vez para cada processo.
+DEFAULT_CHUNK_SIZE = 200
+
+# Formatos de saída suportados.
+FORMATS = ("csv", "jsonl")
+
+# Colunas do CSV de recibos (um pedido por linha; os itens ficam só no JSONL).
+OUTPUT_FIELDS = ["request", "lines", "total_items", "subtotal", "sales_tax", "total",
+                 "latency_ms", "error"]
+
+
+def iter_request_files(paths, stream=None):
+    """Lista os arquivos de pedido a processar, sem carregar a lista inteira.
+    Parâmetros:
+        paths: arquivos e diretórios; de cada diretório são usados os
+            arquivos .csv, em ordem alfabética. "-" lê os nomes de stream,
+            um por linha.
+        stream: o arquivo de onde "-" lê os nomes (padrão: stdin).
+    Retorna: um gerador com o caminho de cada arquivo de pedido.
+    """
+    for path in paths:
+        if path == "-":
+            for line in stream or sys.stdin:
+                name = line.strip()
+                if name:
+                    yield name
+        elif os.path.isdir(path):
+            with os.scandir(path) as entries:
+                names = sorted(entry.name for entry in entries
+                               if entry.name.lower().endswith(".csv") and entry.is_file())
+            for name in names:
+                yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def process_request(products_dict, filename):
+    """Calcula o recibo de um arquivo de pedido.
+    Retorna: um dicionário com request, os campos de price_order, latency_ms
+        (o tempo gasto neste pedido) e error; erros são registrados na
+        coluna error em vez de interromper o lote.
+    """
+    start = time.perf_counter()
+    result = {"request": filename}
+    try:
+        result.update(price_order(products_dict, read_request(filename)))
+        result["error"] = None
+    except KeyError as e:
+        result["error"] = f"produto desconhecido: {e}"
+    except IndexError:
+        result["error"] = "linha incompleta: o pedido precisa das colunas Product # e Quantity"
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        # UnicodeDecodeError é um ValueError, mas vem da leitura do arquivo.
+        result["error"] = f"erro ao ler o pedido: {e}"
+    except ValueError as e:
+        result["error"] = f"quantidade inválida: {e}"
+    result["latency_ms"] = (time.perf_counter() - start) * 1e3
+    return result
+
+
+# Catálogo de produtos de cada processo do pool.
+_worker_products = None
+
+
+def init_worker(products_dict):
+    """Recebe o catálogo, lido uma única vez pelo processo principal."""
+    global _worker_products
+    _worker_products = products_dict
+
+
+def process_chunk(filenames):
+    """Processa um bloco de pedidos em um processo do pool."""
+    return [process_request(_worker_products, filename) for filename in filenames]
+
+
+def process_requests(products_dict, filenames, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Processa os pedidos, em ordem, no processo atual ou em um pool de processos.
+    Parâmetros:
+        products_dict: o catálogo de produtos (veja load_catalog)
+        filenames: um iterável de arquivos de pedido
+        workers: o número de processos; 1 processa no processo atual
+        chunk_size: quantos pedidos cada processo recebe de uma vez
+    Retorna: um gerador de recibos (veja process_request), na ordem de entrada
+    """
+    if workers <= 1:
+        for filename in filenames:
+            yield process_request(products_dict, filename)
+        return
+
+    iterator = iter(filenames)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(products_dict,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(process_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def log_receipts(receipts, sales_log):
+    """Acrescenta os recibos sem erro ao log de vendas, repassando todos os recibos."""
+    for receipt in receipts:
+        if receipt["error"] is None:
+            sales_log.append(receipt)
+        yield receipt
+
+
+def _for_output(receipt):
+    """Converte o recibo para dólares e arredonda a latência, para a saída."""
+    converted = receipt_in_dollars(receipt)
+    converted["latency_ms"] = round(receipt["latency_ms"], 3)
+    return converted
+
+
+def write_receipts(receipts, output, output_format):
+    """Escreve os recibos à medida que são produzidos.
+    Parâmetros:
+        receipts: um iterável de recibos de process_request
+        output: o arquivo de saída
+        output_format: "jsonl" (um recibo completo por linha) ou "csv"
+            (uma linha de totais por pedido, com as colunas de OUTPUT_FIELDS)
+    Retorna: uma tupla (pedidos escritos, pedidos com erro, lista de latências em ms)
+    """
+    count = errors = 0
+    latencies = []
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+
+        def write(receipt):
+            row = _for_output(receipt)
+            row["lines"] = len(receipt["items"]) if "items" in receipt else None
+            writer.writerow(row)
+    else:
+        def write(receipt):
+            output.write(json.dumps(_for_output(receipt)))
+            output.write("\n")
+    for receipt in receipts:
+        write(receipt)
+        count += 1
+        errors += receipt["error"] is not None
+        latencies.append(receipt["latency_ms"])
+    return count, errors, latencies
+
+
+def percentile(sorted_values, fraction):
+    """Retorna o percentil (pelo método do posto mais próximo) de valores já ordenados."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(count, errors, latencies, elapsed):
+    """Monta o resumo do lote: pedidos, erros, pedidos/s e latências por pedido."""
+    latencies = sorted(latencies)
+    return {
+        "orders": count,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "orders_per_second": count / elapsed if elapsed > 0 else 0.0,
+        "latency_p50_ms": percentile(latencies, 0.50),
+        "latency_p99_ms": percentile(latencies, 0.99),
+        "latency_max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    """Calcula os recibos de muitos arquivos de pedido de uma vez."""
+    parser = argparse.ArgumentParser(
+        description="Processa em lote arquivos de pedido (Product #, Quantity).")
+    parser.add_argument("requests", nargs="+",
+                        help="arquivos ou diretórios de pedidos ('-' lê os nomes de stdin)")
+    parser.add_argument("-p", "--products", default="products.csv", help="catálogo de produtos")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de recibos ('-' para stdout)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("-s", "--summary", help="grava o resumo do lote neste arquivo JSON")
+    parser.add_argument("-l", "--sales-log", help="acrescenta os pedidos a este log de vendas")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="número de processos (0 = número de CPUs)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    products_dict = load_catalog(args.products)
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if args.output == "-":
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(args.output, "wt", newline="", encoding="utf-8"))
+        # O arquivo de saída pode estar no diretório dos pedidos.
+        output_path = None if args.output == "-" else os.path.abspath(args.output)
+        filenames = (filename for filename in iter_request_files(args.requests)
+                     if os.path.abspath(filename) != output_path)
+        receipts = process_requests(products_dict, filenames, workers, args.chunk_size)
+        if args.sales_log:
+            receipts = log_receipts(receipts, stack.enter_context(SalesLog(args.sales_log)))
+        count, errors, latencies = write_receipts(receipts, output, args.format)
+    summary = summarize(count, errors, latencies, time.perf_counter() - start)
+
+    if args.summary:
+        with open(args.summary, "wt", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    print(f"{count} pedidos processados ({errors} com erro) em {summary['elapsed_s']:.2f} s "
+          f"({summary['orders_per_second']:,.0f} pedidos/s); latência por pedido: "
+          f"p50 {summary['latency_p50_ms']:.3f} ms, p99 {summary['latency_p99_ms']:.3f} ms",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from receipt import load_catalog
+from receipt_batch import percentile
+from receipt_service import DEFAULT_HOST, DEFAULT_PORT, latency_histogram, format_histogram
+
+
+class ServiceClient:
+    """Cliente HTTP mínimo que reaproveita uma conexão (keep-alive) com o serviço."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, payload=None):
+        """Envia um pedido e retorna (status, JSON), reabrindo a conexão se preciso."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("conexão fechada pelo serviço")
+        status = int(status_line.split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value.strip().lower() != "close"
+        data = await self._reader.readexactly(length)
+        if not keep_alive:
+            await self.close()
+        return status, json.loads(data)
+
+    async def close(self):
+        """Fecha a conexão."""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._writer = self._reader = None
+
+
+def make_orders(product_ids, count, max_lines=10, seed=0):
+    """Gera pedidos sintéticos para a carga."""
+    rng = random.Random(seed)
+    return [{"items": [[rng.choice(product_ids), rng.randint(1, 5)]
+                       for _ in range(rng.randint(1, max_lines))]}
+            for _ in range(count)]
+
+
+async def run_client(client, orders, latencies, statuses):
+    """Envia uma sequência de pedidos por uma conexão, anotando latência e status."""
+    try:
+        for order in orders:
+            start = time.perf_counter()
+            status, _ = await client.request("POST", "/receipt", order)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        await client.close()
+
+
+async def run_load(host, port, orders, concurrency):
+    """Distribui os pedidos entre conexões simultâneas.
+    Retorna: uma tupla (latências em ms, contagem por status HTTP, tempo decorrido em s)
+    """
+    latencies = []
+    statuses = {}
+    shares = [orders[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(ServiceClient(host, port), share, latencies, statuses)
+                           for share in shares if share))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def main(argv=None):
+    """Gera carga no serviço de recibos e imprime o histograma de latências."""
+    parser = argparse.ArgumentParser(description="Gerador de carga para receipt_service.py.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-n", "--orders", type=int, default=10000, help="total de pedidos")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="conexões simultâneas")
+    parser.add_argument("-p", "--products", default="products.csv",
+                        help="catálogo de onde vêm os números dos produtos")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    orders = make_orders(list(load_catalog(args.products)), args.orders, seed=args.seed)
+    try:
+        latencies, statuses, elapsed = asyncio.run(
+            run_load(args.host, args.port, orders, args.concurrency))
+    except OSError as e:
+        print(f"Erro ao conectar ao serviço em {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+
+    latencies.sort()
+    rate = len(latencies) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(latencies)} pedidos em {elapsed:.2f} s ({rate:,.0f} pedidos/s), "
+          f"{args.concurrency} conexões")
+    print("Status: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    print(f"Latência: p50 {percentile(latencies, 0.50):.3f} ms, "
+          f"p90 {percentile(latencies, 0.90):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms, "
+          f"máx {latencies[-1] if latencies else 0.0:.3f} ms")
+    print(format_histogram(latency_histogram(latencies)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
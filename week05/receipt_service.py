@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+
+from catalog_reloader import CatalogReloader
+from receipt import receipt_in_dollars
+from receipt_batch import percentile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8112
+
+# Pedidos atendidos ao mesmo tempo; acima disso o serviço responde 503.
+DEFAULT_MAX_IN_FLIGHT = 256
+
+# Tamanho máximo do corpo de um pedido, em bytes.
+MAX_BODY_SIZE = 1 << 20
+
+# Pedidos com mais linhas que isso são calculados em uma thread, fora do laço
+# de eventos, para não atrasar as outras conexões.
+INLINE_ORDER_LINES = 256
+
+# Quantidade de latências recentes usadas nos percentis e no histograma.
+LATENCY_WINDOW = 10000
+
+# Limites superiores (em ms) das faixas do histograma de latências.
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+def latency_histogram(latencies, buckets=LATENCY_BUCKETS_MS):
+    """Conta as latências (em ms) de cada faixa do histograma.
+    Retorna: uma lista de pares (limite superior em ms, quantidade); a última
+        faixa, com limite None, conta as latências acima do maior limite.
+    """
+    counts = [0] * (len(buckets) + 1)
+    for latency in latencies:
+        counts[bisect_left(buckets, latency)] += 1
+    return list(zip(list(buckets) + [None], counts))
+
+
+def format_histogram(histogram, width=40):
+    """Formata o histograma de latency_histogram como linhas de texto com barras."""
+    largest = max((count for _, count in histogram), default=0) or 1
+    lines = []
+    for bound, count in histogram:
+        label = f"<= {bound:g} ms" if bound is not None else "> maior faixa"
+        lines.append(f"  {label:>14} {count:8} {'#' * round(count * width / largest)}")
+    return "\n".join(lines)
+
+
+def parse_content_length(headers):
+    """Retorna o tamanho do corpo indicado pelo cabeçalho Content-Length.
+    Lança ValueError se o valor não for um inteiro maior ou igual a zero.
+    """
+    value = headers.get("content-length", "").strip()
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"Content-Length inválido: {value!r}")
+    return int(value)
+
+
+def parse_items(payload):
+    """Valida o corpo de POST /receipt e retorna as tuplas (número do produto, quantidade).
+    O corpo é {"items": [["D150", 2], ...]} ou {"items": [{"product_id": "D150", "quantity": 2}, ...]}.
+    Lança ValueError se o corpo não tiver esse formato.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        raise ValueError('o corpo deve ser {"items": [["D150", 2], ...]}')
+    items = []
+    for item in payload["items"]:
+        if isinstance(item, dict):
+            item = (item.get("product_id"), item.get("quantity"))
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ValueError(f"item inválido: {item!r}")
+        product_id, quantity = item
+        if not isinstance(product_id, str) or not isinstance(quantity, int) \
+                or isinstance(quantity, bool) or quantity < 0:
+            raise ValueError(f"item inválido: {item!r}")
+        items.append((product_id, quantity))
+    return items
+
+
+class ReceiptService:
+    """
+    Serviço HTTP/JSON local que calcula recibos com o catálogo em memória.
+
+    O catálogo é lido uma vez e mantido atualizado por um CatalogReloader.
+    Quando já há max_in_flight pedidos em andamento, os seguintes são
+    recusados com 503 em vez de ficarem acumulados na memória.
+
+    Pedidos pequenos são calculados no próprio laço de eventos; os com mais
+    de INLINE_ORDER_LINES linhas vão para uma thread. O cálculo continua
+    disputando o GIL, mas o laço volta a atender as outras conexões entre
+    as fatias de tempo da thread em vez de ficar parado até o fim do pedido.
+
+    Rotas:
+        POST /receipt  corpo {"items": [["D150", 2], ...]}  -> o recibo em dólares
+        GET  /metrics  -> pedidos, recusas, latências (ms) e o catálogo
+    """
+
+    def __init__(self, products_filename, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 reload_interval=None):
+        self.reloader = CatalogReloader(products_filename)
+        self.reload_interval = reload_interval
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Inicia o servidor (e a verificação do catálogo, se houver intervalo)."""
+        if self.reload_interval:
+            self.reloader.interval = self.reload_interval
+            self.reloader.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Encerra o servidor e a verificação do catálogo."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.reloader.stop()
+
+    def receipt(self, items):
+        """Calcula o recibo de um pedido, em dólares (lança KeyError para produtos desconhecidos)."""
+        return receipt_in_dollars(self.reloader.price_order(items))
+
+    def metrics(self):
+        """Retorna as contagens de pedidos, os percentis e o histograma de latência."""
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "histogram": [{"le_ms": bound, "count": count}
+                          for bound, count in latency_histogram(latencies)],
+            "catalog": self.reloader.stats(),
+        }
+
+    async def _route(self, method, path, body):
+        """Despacha um pedido e retorna (status, objeto JSON)."""
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.metrics()
+        if path == "/receipt":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            start = time.perf_counter()
+            try:
+                items = parse_items(json.loads(body))
+                if len(items) > INLINE_ORDER_LINES:
+                    receipt = await asyncio.get_running_loop().run_in_executor(
+                        None, self.receipt, items)
+                else:
+                    receipt = self.receipt(items)
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            except KeyError as e:
+                return 400, {"error": f"produto desconhecido: {e}"}
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            self.requests += 1
+            return 200, receipt
+        return 404, {"error": f"rota desconhecida: {path}"}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        """Envia uma resposta JSON e espera o cliente recebê-la."""
+        data = json.dumps(payload).encode("utf-8")
+        retry_after = "Retry-After: 1\r\n" if status == 503 else ""
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n{retry_after}"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        """Atende os pedidos HTTP/1.1 de uma conexão até que ela seja fechada."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = parse_content_length(headers)
+                except ValueError as e:
+                    # Sem um tamanho válido não dá para saber onde o corpo termina.
+                    await self._respond(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {"error": f"corpo maior que {MAX_BODY_SIZE} bytes"},
+                                        keep_alive=False)
+                    break
+                if self.in_flight >= self.max_in_flight:
+                    # Descarta o corpo e recusa o pedido: o cliente deve tentar de novo depois.
+                    if length:
+                        await reader.readexactly(length)
+                    self.rejected += 1
+                    await self._respond(writer, 503, {"error": "serviço sobrecarregado, tente novamente"},
+                                        keep_alive)
+                else:
+                    # O pedido ocupa uma vaga até a resposta ser entregue, então
+                    # clientes lentos também contam para o limite.
+                    self.in_flight += 1
+                    try:
+                        body = await reader.readexactly(length) if length else b""
+                        status, payload = await self._route(method, path, body)
+                        await self._respond(writer, status, payload, keep_alive)
+                    finally:
+                        self.in_flight -= 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run_server(host, port, products_filename, max_in_flight, reload_interval):
+    service = ReceiptService(products_filename, max_in_flight, reload_interval)
+    address = await service.start(host, port)
+    print(f"Serviço de recibos em http://{address[0]}:{address[1]} "
+          f"({len(service.reloader.catalog)} produtos)")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    """Inicia o serviço HTTP de recibos."""
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de recibos.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-p", "--products", default="products.csv", help="catálogo de produtos")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="segundos entre as verificações do catálogo (0 = não recarrega)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_server(args.host, args.port, args.products, args.max_in_flight,
+                               args.reload_interval))
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import heapq
+import os
+import sys
+from datetime import datetime, timezone
+
+from receipt import format_cents
+from sales_log import iter_blocks, SALES_LOG_ENV, SALES_LOG_FILE
+
+# Duração de uma hora, em segundos. As horas são contadas em UTC, tanto nos
+# agrupamentos quanto nas datas impressas e lidas pela linha de comando.
+HOUR = 3600
+
+
+def _in_range(timestamp, since, until):
+    """Retorna True se timestamp está em [since, until); None não limita."""
+    return (since is None or timestamp >= since) and (until is None or timestamp < until)
+
+
+def _block_in_range(block, since, until):
+    """Retorna False se nenhum pedido do bloco pode estar na faixa de datas."""
+    if not len(block):
+        return False
+    return (since is None or max(block.timestamps) >= since) and \
+        (until is None or min(block.timestamps) < until)
+
+
+def product_revenue(path=SALES_LOG_FILE, since=None, until=None):
+    """Soma as quantidades vendidas e a receita de cada produto, bloco a bloco.
+    Parâmetros:
+        path: o arquivo do log de vendas.
+        since, until: limites da data/hora dos pedidos, em segundos
+            ([since, until)); None não limita.
+    Retorna: um dicionário {número do produto: [quantidade, receita em centavos]}.
+    """
+    totals = {}
+    for block in iter_blocks(path):
+        if not _block_in_range(block, since, until):
+            continue
+        # Acumula por código do bloco e só depois junta pelo número do produto.
+        quantities = [0] * len(block.product_ids)
+        revenues = [0] * len(block.product_ids)
+        if since is None and until is None:
+            for code, quantity, price in zip(block.codes, block.quantities, block.prices):
+                quantities[code] += quantity
+                revenues[code] += quantity * price
+        else:
+            line = 0
+            for timestamp, line_count in zip(block.timestamps, block.line_counts):
+                if _in_range(timestamp, since, until):
+                    for index in range(line, line + line_count):
+                        code = block.codes[index]
+                        quantities[code] += block.quantities[index]
+                        revenues[code] += block.quantities[index] * block.prices[index]
+                line += line_count
+
+        for product_id, quantity, revenue in zip(block.product_ids, quantities, revenues):
+            if quantity or revenue:
+                total = totals.get(product_id)
+                if total is None:
+                    totals[product_id] = [quantity, revenue]
+                else:
+                    total[0] += quantity
+                    total[1] += revenue
+    return totals
+
+
+def top_sellers(path=SALES_LOG_FILE, count=10, by="revenue", since=None, until=None):
+    """Retorna os produtos mais vendidos.
+    Parâmetros:
+        by: "revenue" (receita) ou "quantity" (unidades vendidas).
+    Retorna: uma lista de tuplas (número do produto, quantidade, receita em
+        centavos), da maior para a menor.
+    """
+    if by not in ("revenue", "quantity"):
+        raise ValueError(f"Critério desconhecido: {by!r}")
+    key_index = 1 if by == "quantity" else 2
+    rows = ((product_id, quantity, revenue)
+            for product_id, (quantity, revenue) in product_revenue(path, since, until).items())
+    return heapq.nlargest(count, rows, key=lambda row: (row[key_index], row[0]))
+
+
+def hourly_totals(path=SALES_LOG_FILE, since=None, until=None):
+    """Soma os pedidos de cada hora (UTC), bloco a bloco.
+    Retorna: um dicionário ordenado {início da hora em segundos:
+        [pedidos, subtotal, imposto, total]}, com os valores em centavos.
+    """
+    totals = {}
+    for block in iter_blocks(path):
+        if not _block_in_range(block, since, until):
+            continue
+        for timestamp, subtotal, tax in zip(block.timestamps, block.subtotals, block.taxes):
+            if not _in_range(timestamp, since, until):
+                continue
+            hour = timestamp - timestamp % HOUR
+            total = totals.get(hour)
+            if total is None:
+                total = totals[hour] = [0, 0, 0, 0]
+            total[0] += 1
+            total[1] += subtotal
+            total[2] += tax
+            total[3] += subtotal + tax
+    return dict(sorted(totals.items()))
+
+
+def parse_time(text):
+    """Converte uma data/hora ISO, ex: "2024-05-01T13:00", em segundos.
+    Sem fuso horário explícito, a data/hora é tomada como UTC.
+    """
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def format_hour(hour):
+    """Formata o início de uma hora, em segundos, como data/hora UTC."""
+    return f"{datetime.fromtimestamp(hour, timezone.utc):%Y-%m-%d %H:00} UTC"
+
+
+def main(argv=None):
+    """Consulta o log de vendas gravado por receipt.py."""
+    parser = argparse.ArgumentParser(description="Relatórios de vendas a partir do log de vendas.")
+    parser.add_argument("report", choices=("revenue", "top", "hourly"),
+                        help="receita por produto, mais vendidos ou totais por hora")
+    parser.add_argument("-l", "--log", default=os.environ.get(SALES_LOG_ENV, SALES_LOG_FILE),
+                        help=f"arquivo do log de vendas (padrão: ${SALES_LOG_ENV} ou {SALES_LOG_FILE})")
+    parser.add_argument("--since", type=parse_time, help="data/hora inicial (ISO, UTC)")
+    parser.add_argument("--until", type=parse_time, help="data/hora final, exclusiva (ISO, UTC)")
+    parser.add_argument("-n", "--count", type=int, default=10, help="produtos no relatório top")
+    parser.add_argument("--by", choices=("revenue", "quantity"), default="revenue")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.report == "revenue":
+            totals = product_revenue(args.log, args.since, args.until)
+            for product_id, (quantity, revenue) in sorted(totals.items()):
+                print(f"{product_id:<12} {quantity:>10} ${format_cents(revenue):>14}")
+        elif args.report == "top":
+            rows = top_sellers(args.log, args.count, args.by, args.since, args.until)
+            for rank, (product_id, quantity, revenue) in enumerate(rows, 1):
+                print(f"{rank:>3}. {product_id:<12} {quantity:>10} ${format_cents(revenue):>14}")
+        else:
+            for hour, (orders, subtotal, tax, total) in hourly_totals(
+                    args.log, args.since, args.until).items():
+                print(f"{format_hour(hour)}  {orders:>8} pedidos  "
+                      f"subtotal ${format_cents(subtotal):>12}  imposto ${format_cents(tax):>10}  "
+                      f"total ${format_cents(total):>12}")
+    except FileNotFoundError as e:
+        print(f"Error: missing file\n{e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+# Formato do log de vendas: uma sequência de blocos, só acrescentados ao fim
+# do arquivo. Cada bloco guarda um grupo de pedidos em colunas (cabeçalho
+# little-endian; colunas na ordem de bytes da máquina):
+#   cabeçalho: MAGIC, número de pedidos, número de itens, número de produtos
+#              distintos no bloco, tamanho dos números dos produtos em bytes,
+#              CRC-32 do restante do cabeçalho e dos dados do bloco
+#   pedidos: data/hora (q, segundos desde 1970), subtotal (q), imposto (q),
+#            número de itens (I)
+#   itens: código do produto no bloco (I), quantidade (q), preço em centavos (q)
+#   dicionário: os números dos produtos do bloco em UTF-8, separados por "\0"
+BLOCK_MAGIC = b"SBL2"
+BLOCK_HEADER = struct.Struct("<4sIIIII")
+
+# Parte do cabeçalho coberta pelo CRC (tudo menos o próprio CRC).
+CHECKED_HEADER_SIZE = BLOCK_HEADER.size - 4
+
+# Bytes ocupados por pedido e por item nas colunas de um bloco.
+ORDER_SIZE = 3 * array("q").itemsize + array("I").itemsize
+LINE_SIZE = array("I").itemsize + 2 * array("q").itemsize
+
+# Arquivo padrão do log, ao lado do catálogo de produtos.
+SALES_LOG_FILE = "sales.slog"
+
+# Variável de ambiente com o caminho do log usado por receipt.py; sem ela,
+# receipt.py não grava o log.
+SALES_LOG_ENV = "SALES_LOG"
+
+# Quantidade padrão de pedidos guardados em memória antes de gravar um bloco.
+DEFAULT_BLOCK_ORDERS = 4096
+
+
+class SalesBlock:
+    """As colunas de um bloco do log de vendas.
+
+    Os pedidos do bloco estão em timestamps, subtotals, taxes e line_counts;
+    os itens de todos os pedidos, em ordem, estão em codes, quantities e
+    prices, e product_ids[code] é o número do produto de cada código.
+    """
+    __slots__ = ("timestamps", "subtotals", "taxes", "line_counts",
+                 "codes", "quantities", "prices", "product_ids")
+
+    def __init__(self):
+        self.timestamps = array("q")
+        self.subtotals = array("q")
+        self.taxes = array("q")
+        self.line_counts = array("I")
+        self.codes = array("I")
+        self.quantities = array("q")
+        self.prices = array("q")
+        self.product_ids = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def to_bytes(self):
+        """Codifica o bloco no formato do log."""
+        ids_data = "\0".join(self.product_ids).encode("utf-8")
+        parts = [column.tobytes() for column in (self.timestamps, self.subtotals, self.taxes,
+                                                 self.line_counts, self.codes, self.quantities,
+                                                 self.prices)]
+        parts.append(ids_data)
+        data = b"".join(parts)
+        header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(self.timestamps), len(self.codes),
+                                   len(self.product_ids), len(ids_data), 0)
+        checksum = zlib.crc32(data, zlib.crc32(header[:CHECKED_HEADER_SIZE]))
+        return header[:CHECKED_HEADER_SIZE] + struct.pack("<I", checksum) + data
+
+    def orders(self):
+        """Retorna os pedidos do bloco como tuplas (data/hora, recibo em centavos)."""
+        line = 0
+        for timestamp, subtotal, tax, line_count in zip(self.timestamps, self.subtotals,
+                                                        self.taxes, self.line_counts):
+            items = [{"product_id": self.product_ids[self.codes[index]],
+                      "quantity": self.quantities[index], "price_cents": self.prices[index]}
+                     for index in range(line, line + line_count)]
+            line += line_count
+            yield timestamp, {"items": items, "subtotal_cents": subtotal, "sales_tax_cents": tax}
+
+
+class SalesLog:
+    """
+    Grava os pedidos calculados em um log de vendas colunar, só por acréscimo.
+
+    Os pedidos ficam em memória até completar um bloco (ou até flush/close),
+    e cada bloco é gravado com uma única chamada de escrita em modo de
+    acréscimo, então blocos já gravados nunca são alterados. Cada bloco tem
+    um CRC-32, e um bloco danificado (uma gravação interrompida, mesmo que
+    outros blocos tenham sido acrescentados depois dele) é ignorado pelos
+    leitores, que continuam no próximo bloco válido.
+
+    Cada processo grava pelo menos um bloco, então quem grava poucos pedidos
+    por vez (como receipt.py) deixa blocos pequenos; compact() os junta.
+    """
+
+    def __init__(self, path=SALES_LOG_FILE, block_orders=DEFAULT_BLOCK_ORDERS):
+        self.path = path
+        self.block_orders = block_orders
+        self._block = SalesBlock()
+        self._codes = {}
+
+    def append(self, receipt, timestamp=None):
+        """Acrescenta um pedido calculado por receipt.price_order.
+        Parâmetros:
+            receipt: o recibo, com os valores em centavos.
+            timestamp: a data/hora da venda, em segundos (padrão: agora).
+        """
+        block = self._block
+        codes = self._codes
+        block.timestamps.append(int(time.time() if timestamp is None else timestamp))
+        block.subtotals.append(receipt["subtotal_cents"])
+        block.taxes.append(receipt["sales_tax_cents"])
+        block.line_counts.append(len(receipt["items"]))
+        for item in receipt["items"]:
+            code = codes.get(item["product_id"])
+            if code is None:
+                code = codes[item["product_id"]] = len(block.product_ids)
+                block.product_ids.append(item["product_id"])
+            block.codes.append(code)
+            block.quantities.append(item["quantity"])
+            block.prices.append(item["price_cents"])
+        if len(block) >= self.block_orders:
+            self.flush()
+
+    def flush(self):
+        """Grava os pedidos em memória como um novo bloco no fim do log."""
+        if not len(self._block):
+            return
+        data = self._block.to_bytes()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = os.write(fd, data)
+            while written < len(data):
+                written += os.write(fd, data[written:])
+        finally:
+            os.close(fd)
+        self._block = SalesBlock()
+        self._codes = {}
+
+    def close(self):
+        """Grava os pedidos que ainda estão em memória."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_column(data, offset, typecode, count):
+    """Lê uma coluna de count valores de data a partir de offset.
+    Retorna: uma tupla (array, posição após a coluna).
+    """
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(data[offset:end])
+    return column, end
+
+
+def _decode_block(data, order_count, line_count, product_count, ids_size):
+    """Monta um SalesBlock a partir dos dados de um bloco, já verificados."""
+    block = SalesBlock()
+    offset = 0
+    block.timestamps, offset = _read_column(data, offset, "q", order_count)
+    block.subtotals, offset = _read_column(data, offset, "q", order_count)
+    block.taxes, offset = _read_column(data, offset, "q", order_count)
+    block.line_counts, offset = _read_column(data, offset, "I", order_count)
+    block.codes, offset = _read_column(data, offset, "I", line_count)
+    block.quantities, offset = _read_column(data, offset, "q", line_count)
+    block.prices, offset = _read_column(data, offset, "q", line_count)
+    ids_data = data[offset:offset + ids_size].decode("utf-8")
+    block.product_ids = ids_data.split("\0") if product_count else []
+    return block
+
+
+def iter_blocks(path=SALES_LOG_FILE):
+    """Lê os blocos do log de vendas um de cada vez, sem carregar o arquivo inteiro.
+
+    Um bloco com o CRC errado ou cortado no meio é pulado: a leitura continua
+    no próximo cabeçalho válido do arquivo.
+
+    Retorna: um gerador de SalesBlock, na ordem em que foram gravados.
+    Lança ValueError se o arquivo não for um log de vendas.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(BLOCK_MAGIC)] != BLOCK_MAGIC:
+                raise ValueError(f"Log de vendas inválido: {path}")
+            end = len(mm)
+            position = 0
+            while position + BLOCK_HEADER.size <= end:
+                magic, order_count, line_count, product_count, ids_size, checksum = \
+                    BLOCK_HEADER.unpack_from(mm, position)
+                start = position + BLOCK_HEADER.size
+                size = order_count * ORDER_SIZE + line_count * LINE_SIZE + ids_size
+                if magic == BLOCK_MAGIC and start + size <= end:
+                    data = mm[start:start + size]
+                    header = mm[position:position + CHECKED_HEADER_SIZE]
+                    if zlib.crc32(data, zlib.crc32(header)) == checksum:
+                        yield _decode_block(data, order_count, line_count, product_count, ids_size)
+                        position = start + size
+                        continue
+                # Bloco danificado: procura o próximo cabeçalho.
+                position = mm.find(BLOCK_MAGIC, position + 1)
+                if position < 0:
+                    return
+
+
+def compact(path=SALES_LOG_FILE, block_orders=DEFAULT_BLOCK_ORDERS):
+    """Reescreve o log juntando os blocos pequenos em blocos de block_orders pedidos.
+
+    O novo log é gravado em um arquivo temporário e troca o antigo de uma vez;
+    pedidos acrescentados por outro processo durante a compactação se perdem,
+    então ela deve rodar quando ninguém estiver gravando.
+
+    Retorna: uma tupla (blocos antes, blocos depois).
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    before = 0
+    with SalesLog(temp_path, block_orders) as sales_log:
+        for block in iter_blocks(path):
+            before += 1
+            for timestamp, receipt in block.orders():
+                sales_log.append(receipt, timestamp)
+    if not os.path.exists(temp_path):
+        open(temp_path, "wb").close()
+    os.replace(temp_path, path)
+    return before, sum(1 for _ in iter_blocks(path))
+
+
+def main(argv=None):
+    """Compacta um log de vendas: python sales_log.py [arquivo]."""
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else os.environ.get(SALES_LOG_ENV, SALES_LOG_FILE)
+    try:
+        before, after = compact(path)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    print(f"{path}: {before} blocos -> {after} blocos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
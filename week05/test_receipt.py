@@ -0,0 +1,416 @@
+import asyncio
+import io
+import json
+import os
+import pickle
+import shutil
+import time
+from os import path
+
+from receipt import read_dictionary, read_request, price_order, parse_cents, format_cents, \
+    sales_tax_for, load_catalog, SALES_TAX_PERCENT, Product, ProductCatalog, \
+    PRODUCT_ID_INDEX, PRODUCT_NAME_INDEX, PRODUCT_PRICE_INDEX
+from catalog_reloader import CatalogReloader
+from csv_index import IndexedCSV
+from order_totals import make_order, price_order_totals
+from receipt_loadgen import ServiceClient
+from receipt_service import ReceiptService, latency_histogram, INLINE_ORDER_LINES
+from sales_analytics import product_revenue, top_sellers, hourly_totals, parse_time
+from sales_log import SalesLog, iter_blocks, compact
+from receipt_batch import iter_request_files, process_requests, write_receipts, percentile
+import pytest
+
+PRODUCTS_FILE = path.join(path.dirname(__file__), "products.csv")
+
+
+def write_request(filename, rows):
+    """Write a request file with the given (product number, quantity) rows."""
+    with open(filename, "wt") as request_file:
+        request_file.write("Product #,Quantity\n")
+        for product_id, quantity in rows:
+            request_file.write(f"{product_id},{quantity}\n")
+
+
+def test_price_order():
+    """Verify the totals of the sample request.csv order."""
+    items = read_request(path.join(path.dirname(__file__), "request.csv"))
+    receipt = price_order(ProductCatalog.from_csv(PRODUCTS_FILE), items)
+    assert price_order(read_dictionary(PRODUCTS_FILE, PRODUCT_ID_INDEX), items) == receipt
+
+    assert receipt["total_items"] == 12
+    assert receipt["subtotal_cents"] == 1526
+    assert receipt["sales_tax_cents"] == 92
+    assert receipt["total_cents"] == 1618
+    assert receipt["items"][0] == {"product_id": "W112", "name": "wheat bread",
+                                   "quantity": 2, "price_cents": 255}
+
+
+def test_process_requests(tmp_path):
+    """Verify that the batch engine keeps input order and reports errors per order."""
+    products_dict = ProductCatalog.from_csv(PRODUCTS_FILE)
+    write_request(tmp_path / "a.csv", [("D150", 2), ("C013", 1)])
+    write_request(tmp_path / "b.csv", [("X999", 1)])
+    write_request(tmp_path / "c.csv", [("W112", "two")])
+    # A row without the Quantity column and a file that is not valid UTF-8.
+    (tmp_path / "d.csv").write_text("Product #,Quantity\nD150\n")
+    (tmp_path / "e.csv").write_bytes(b"Product #,Quantity\nD\xff150,1\n")
+    (tmp_path / "notes.txt").write_text("not a request")
+
+    filenames = list(iter_request_files([str(tmp_path), str(tmp_path / "missing.csv")]))
+    assert [path.basename(filename) for filename in filenames] == \
+        ["a.csv", "b.csv", "c.csv", "d.csv", "e.csv", "missing.csv"]
+
+    for workers in (1, 2):
+        receipts = list(process_requests(products_dict, filenames, workers, chunk_size=1))
+        assert [receipt["request"] for receipt in receipts] == filenames
+        assert receipts[0]["error"] is None
+        assert receipts[0]["total_cents"] == 694
+        assert "X999" in receipts[1]["error"]
+        assert receipts[2]["error"].startswith("quantidade inválida")
+        assert receipts[3]["error"].startswith("linha incompleta")
+        assert receipts[4]["error"].startswith("erro ao ler o pedido")
+        assert receipts[5]["error"].startswith("erro ao ler o pedido")
+
+    output = io.StringIO()
+    count, errors, latencies = write_receipts(receipts, output, "jsonl")
+    assert (count, errors, len(latencies)) == (6, 5, 6)
+    first = json.loads(output.getvalue().splitlines()[0])
+    assert first["total"] == 6.94
+
+
+def test_cents():
+    """Verify that prices are parsed and taxed in integer cents."""
+    assert parse_cents("2.85") == 285
+    assert parse_cents(" 4.5 ") == 450
+    assert parse_cents("12") == 1200
+    for bad_price in ["", "abc", "1.005", "nan"]:
+        with pytest.raises(ValueError):
+            parse_cents(bad_price)
+
+    assert format_cents(1618) == "16.18"
+    assert format_cents(5) == "0.05"
+    assert format_cents(-250) == "-2.50"
+
+    # 6% of $0.25 is 1.5 cents, rounded half up.
+    assert sales_tax_for(25) == 2
+    assert sales_tax_for(1526) == 92
+    # The old float formatting printed 0.04 for the 4.5 cents on $0.75.
+    assert f"{0.75 * SALES_TAX_PERCENT / 100:.2f}" == "0.04"
+    assert sales_tax_for(75) == 5
+    # Just below and above the half-cent boundary.
+    assert sales_tax_for(74) == 4
+    assert sales_tax_for(8) == 0
+    assert sales_tax_for(9) == 1
+
+
+def test_product_catalog(tmp_path):
+    """Verify the typed catalog, its row compatibility and its binary snapshot."""
+    catalog = ProductCatalog.from_csv(PRODUCTS_FILE)
+    assert len(catalog) == 16
+    assert catalog["D150"] == Product("D150", "1 gallon milk", 285)
+    assert catalog.price_cents("H025") == 450
+    assert "X999" not in catalog
+
+    # Each record can stand in for the CSV row of read_dictionary.
+    milk = catalog["D150"]
+    assert len(milk) == 3
+    assert milk[PRODUCT_NAME_INDEX] == "1 gallon milk"
+    assert milk[PRODUCT_PRICE_INDEX] == 2.85
+
+    assert pickle.loads(pickle.dumps(catalog))["W112"] == catalog["W112"]
+
+    products_file = tmp_path / "products.csv"
+    shutil.copy(PRODUCTS_FILE, products_file)
+    built = load_catalog(str(products_file))
+    assert (tmp_path / "products.csv.pcat").exists()
+    loaded = load_catalog(str(products_file))
+    assert loaded.product_ids == built.product_ids
+    assert loaded.names == built.names
+    assert loaded.prices_cents == built.prices_cents
+
+    # A repeated product number keeps its first position and its last row,
+    # like the dictionary from read_dictionary.
+    duplicates_file = tmp_path / "duplicates.csv"
+    duplicates_file.write_text("Product #,Name,Price\nA1,old,1.00\nB2,other,2.00\nA1,new,3.00\n")
+    catalog = ProductCatalog.from_csv(str(duplicates_file))
+    assert list(catalog) == ["A1", "B2"]
+    assert len(catalog) == 2
+    assert catalog["A1"] == Product("A1", "new", 300)
+    assert dict(catalog.items()) == {key: Product(key, row[1], parse_cents(row[2]))
+                                     for key, row in read_dictionary(str(duplicates_file), 0).items()}
+    with pytest.raises(ValueError):
+        ProductCatalog(["A1", "A1"], ["x", "y"], [1, 2])
+
+
+def test_percentile():
+    """Verify the nearest-rank percentile used in the batch summary."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.50) == 50
+    assert percentile([], 0.99) == 0.0
+
+
+def test_catalog_reloader(tmp_path):
+    """Verify that catalog changes are swapped in with per-row counters."""
+    products_file = tmp_path / "products.csv"
+    shutil.copy(PRODUCTS_FILE, products_file)
+    reloader = CatalogReloader(str(products_file), interval=0.01)
+    old_catalog = reloader.catalog
+    assert old_catalog.price_cents("D150") == 285
+    assert reloader.check() is False
+
+    lines = products_file.read_text().splitlines()
+    lines = [line.replace("D150,1 gallon milk,2.85", "D150,1 gallon milk,2.99")
+             for line in lines if not line.startswith("C013")]
+    lines.append("N001,new product,1.00")
+    products_file.write_text("\n".join(lines) + "\n")
+
+    assert reloader.reload() is True
+    assert reloader.catalog.price_cents("D150") == 299
+    assert reloader.catalog.price_cents("N001") == 100
+    assert "C013" not in reloader.catalog
+    # A receipt that already holds the old catalog keeps the old prices.
+    assert old_catalog.price_cents("D150") == 285
+
+    stats = reloader.stats()
+    assert (stats["reloads"], stats["rows_added"], stats["rows_changed"], stats["rows_removed"]) == \
+        (1, 1, 1, 1)
+    assert stats["products"] == 16
+
+    # A broken file keeps the current catalog.
+    products_file.write_text("Product #,Name,Price\nD150,1 gallon milk,abc\n")
+    assert reloader.reload() is False
+    assert reloader.catalog.price_cents("D150") == 299
+    assert reloader.stats()["errors"] == 1
+
+    # So does a row without the price column.
+    products_file.write_text("Product #,Name,Price\nD150,1 gallon milk\n")
+    assert reloader.reload() is False
+    assert reloader.catalog.price_cents("D150") == 299
+    assert reloader.stats()["errors"] == 2
+    assert "incompleta" in reloader.stats()["last_error"]
+
+    assert reloader.price_order([("D150", 2)])["subtotal_cents"] == 598
+
+    # The background thread picks up the next change on its own, after a broken one.
+    with reloader:
+        for _ in range(200):
+            if reloader.stats()["errors"] >= 3:
+                break
+            time.sleep(0.01)
+        # Replaced in one step, so the thread never reads a half-written file.
+        (tmp_path / "products.tmp").write_text("Product #,Name,Price\nD150,1 gallon milk,3.05\n")
+        os.replace(tmp_path / "products.tmp", products_file)
+        for _ in range(200):
+            if reloader.catalog.price_cents("D150") == 305:
+                break
+            time.sleep(0.01)
+    assert reloader.stats()["errors"] >= 3
+    assert reloader.catalog.price_cents("D150") == 305
+    assert len(reloader.catalog) == 1
+
+    # An unexpected exception is counted and does not stop the thread.
+    calls = []
+
+    def failing_check():
+        calls.append(None)
+        raise RuntimeError("boom")
+
+    reloader.check = failing_check
+    with reloader:
+        for _ in range(200):
+            if len(calls) >= 2:
+                break
+            time.sleep(0.01)
+    assert len(calls) >= 2
+    assert reloader.stats()["last_error"] == "boom"
+
+
+def test_catalog_reloader_duplicates(tmp_path):
+    """Verify the reload counters when a product number is repeated in the CSV."""
+    products_file = tmp_path / "products.csv"
+    products_file.write_text("Product #,Name,Price\nA1,old,1.00\nB2,other,2.00\nA1,new,3.00\n")
+    reloader = CatalogReloader(str(products_file))
+    assert list(reloader.catalog) == ["A1", "B2"]
+    assert reloader.catalog.price_cents("A1") == 300
+
+    def reload_counts(text):
+        before = reloader.stats()
+        products_file.write_text("Product #,Name,Price\n" + text)
+        assert reloader.reload() is True
+        after = reloader.stats()
+        return tuple(after[key] - before[key] for key in ("rows_added", "rows_changed", "rows_removed"))
+
+    # The last A1 row is unchanged, so only C3 counts.
+    assert reload_counts("A1,new,3.00\nB2,other,2.00\nC3,third,4.00\n") == (1, 0, 0)
+    assert reload_counts("A1,x,1.00\nA1,new,3.50\nB2,other,2.00\nC3,third,4.00\n") == (0, 1, 0)
+    assert reloader.catalog.price_cents("A1") == 350
+    assert reload_counts("A1,new,3.50\nA1,new,3.50\nC3,third,4.00\n") == (0, 0, 1)
+    assert len(reloader.catalog) == 2
+
+
+def test_read_dictionary_lazy(tmp_path):
+    """Verify that the indexed CSV backend matches read_dictionary."""
+    eager = read_dictionary(PRODUCTS_FILE, PRODUCT_ID_INDEX)
+    products_file = tmp_path / "products.csv"
+    shutil.copy(PRODUCTS_FILE, products_file)
+    with read_dictionary(str(products_file), PRODUCT_ID_INDEX, lazy=True) as lazy:
+        assert len(lazy) == len(eager)
+        assert sorted(lazy) == sorted(eager)
+        assert dict(lazy.items()) == eager
+        assert "X999" not in lazy
+        with pytest.raises(KeyError):
+            lazy["X999"]
+        items = read_request(path.join(path.dirname(__file__), "request.csv"))
+        assert price_order(lazy, items) == price_order(eager, items)
+    assert (tmp_path / "products.csv.0.kidx").exists()
+
+    # Quoted fields with commas and line breaks, repeated keys and a bounded cache.
+    tricky_file = tmp_path / "tricky.csv"
+    tricky_file.write_text('Product #,Name,Price\n'
+                           'A1,"soap, 3 bars",1.50\n'
+                           'B2,"two\nlines",2.00\n'
+                           'A1,soap,1.75\n'
+                           'C3,cheese,3.00\n', encoding="utf-8")
+    lazy = IndexedCSV(str(tricky_file), PRODUCT_ID_INDEX, cache_size=2)
+    assert lazy["A1"] == ["A1", "soap", "1.75"]
+    assert lazy["B2"] == ["B2", "two\nlines", "2.00"]
+    assert lazy["C3"] == ["C3", "cheese", "3.00"]
+    assert len(lazy._cache) == 2
+    assert lazy["C3"] == ["C3", "cheese", "3.00"]
+    assert (lazy.hits, lazy.misses) == (1, 3)
+    assert lazy == read_dictionary(str(tricky_file), PRODUCT_ID_INDEX)
+
+    # Editing the CSV while it is open rebuilds the index instead of reading stale offsets.
+    stat = tricky_file.stat()
+    tricky_file.write_text('Product #,Name,Price\n'
+                           'C3,aged cheese,3.50\n'
+                           'D4,bread,2.25\n', encoding="utf-8")
+    os.utime(tricky_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert lazy["C3"] == ["C3", "aged cheese", "3.50"]
+    assert lazy.reloads == 1
+    assert "A1" not in lazy
+    assert lazy == read_dictionary(str(tricky_file), PRODUCT_ID_INDEX)
+    lazy.close()
+
+
+def test_order_totals():
+    """Verify that the array-based totals match price_order exactly."""
+    catalog = ProductCatalog.from_csv(PRODUCTS_FILE)
+    items = make_order(catalog, 5000, seed=3)
+    expected = price_order(catalog, items)
+    actual = price_order_totals(catalog, items)
+    for field in ("total_items", "subtotal_cents", "sales_tax_cents", "total_cents"):
+        assert actual[field] == expected[field]
+    assert list(actual["line_totals_cents"]) == \
+        [item["price_cents"] * item["quantity"] for item in expected["items"]]
+
+    assert price_order_totals(catalog, [])["total_cents"] == 0
+    with pytest.raises(KeyError):
+        price_order_totals(catalog, [("D150", 1), ("X999", 1)])
+
+
+def test_receipt_service():
+    """Verify receipts, errors and load shedding through the local service."""
+
+    async def scenario():
+        service = ReceiptService(PRODUCTS_FILE, max_in_flight=1)
+        host, port = await service.start("127.0.0.1", 0)
+        client = ServiceClient(host, port)
+        try:
+            status, receipt = await client.request(
+                "POST", "/receipt", {"items": [["D150", 2], {"product_id": "C013", "quantity": 1}]})
+            assert status == 200
+            assert receipt["total"] == 6.94
+            assert receipt["items"][0]["price"] == 2.85
+
+            assert (await client.request("POST", "/receipt", {"items": [["X999", 1]]}))[0] == 400
+            assert (await client.request("POST", "/receipt", {"items": [["D150", -1]]}))[0] == 400
+            assert (await client.request("GET", "/receipt"))[0] == 405
+
+            # Orders above INLINE_ORDER_LINES are priced off the event loop.
+            items = [["D150", 1]] * (INLINE_ORDER_LINES + 1)
+            status, receipt = await client.request("POST", "/receipt", {"items": items})
+            assert status == 200
+            assert receipt["total_items"] == INLINE_ORDER_LINES + 1
+
+            # A malformed or negative Content-Length gets a 400 and the connection is closed.
+            for length in (b"abc", b"-5"):
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(b"POST /receipt HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                assert response.startswith(b"HTTP/1.1 400 ")
+                assert b"Connection: close" in response
+
+            # A client that sends only the headers holds the single slot, so the next order is shed.
+            _, slow_writer = await asyncio.open_connection(host, port)
+            slow_writer.write(b"POST /receipt HTTP/1.1\r\nContent-Length: 100\r\n\r\n")
+            await slow_writer.drain()
+            for _ in range(100):
+                if service.in_flight:
+                    break
+                await asyncio.sleep(0.01)
+            status, payload = await client.request("POST", "/receipt", {"items": [["D150", 1]]})
+            assert status == 503
+            slow_writer.close()
+            for _ in range(100):
+                if not service.in_flight:
+                    break
+                await asyncio.sleep(0.01)
+
+            metrics = (await client.request("GET", "/metrics"))[1]
+            assert metrics["requests"] == 2
+            assert metrics["rejected"] == 1
+            assert sum(bucket["count"] for bucket in metrics["histogram"]) == 2
+        finally:
+            await client.close()
+            await service.stop()
+
+    asyncio.run(scenario())
+
+
+def test_latency_histogram():
+    """Verify that latencies fall into the expected histogram buckets."""
+    histogram = dict(latency_histogram([0.01, 0.05, 0.07, 3, 5000], buckets=(0.05, 1, 10)))
+    assert histogram == {0.05: 2, 1: 1, 10: 1, None: 1}
+
+
+def test_sales_log(tmp_path):
+    """Verify that logged orders are aggregated per product and per hour."""
+    catalog = ProductCatalog.from_csv(PRODUCTS_FILE)
+    log_file = str(tmp_path / "sales.slog")
+    orders = [([("D150", 2), ("C013", 1)], 7200),
+              ([("D150", 1)], 7300),
+              ([("H025", 3), ("D150", 1)], 10900)]
+    # A block size of 2 splits the orders over two blocks.
+    with SalesLog(log_file, block_orders=2) as sales_log:
+        for items, timestamp in orders:
+            sales_log.append(price_order(catalog, items), timestamp)
+    assert [len(block) for block in iter_blocks(log_file)] == [2, 1]
+
+    assert product_revenue(log_file) == {"D150": [4, 1140], "C013": [1, 85], "H025": [3, 1350]}
+    assert product_revenue(log_file, since=7250, until=10800) == {"D150": [1, 285]}
+    assert top_sellers(log_file, 2) == [("H025", 3, 1350), ("D150", 4, 1140)]
+    assert top_sellers(log_file, 1, by="quantity") == [("D150", 4, 1140)]
+    assert hourly_totals(log_file) == {7200: [2, 940, 56, 996], 10800: [1, 1635, 98, 1733]}
+
+    # A block cut short by an interrupted write is skipped, even with blocks after it.
+    with open(log_file, "ab") as f:
+        f.write(b"SBL2\x05\x00")
+    with SalesLog(log_file) as sales_log:
+        sales_log.append(price_order(catalog, [("H025", 1)]), 14400)
+    # So is a block whose data no longer matches its checksum.
+    with open(log_file, "r+b") as f:
+        data = bytearray(f.read())
+        data[len(data) // 3] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+    assert [len(block) for block in iter_blocks(log_file)] == [1, 1]
+
+    # Compaction merges the small blocks that are left.
+    assert compact(log_file) == (2, 1)
+    assert [len(block) for block in iter_blocks(log_file)] == [2]
+    assert hourly_totals(log_file) == {10800: [1, 1635, 98, 1733], 14400: [1, 450, 27, 477]}
+    assert parse_time("1970-01-01T04:00") == 14400
@@ -0,0 +1,227 @@
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+# Folders that are never searched: version control, dependency and cache trees.
+DEFAULT_SKIP_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".cache", ".venv", "venv",
+    ".tox", ".mypy_cache", ".pytest_cache", "site-packages", ".Trash",
+})
+
+# How many levels below the search root a matching folder may be.
+DEFAULT_MAX_DEPTH = 8
+
+# Stop searching after this many matches.
+DEFAULT_MATCH_LIMIT = 50
+
+# A suggested place for the directory-name index (it is only written when a
+# caller passes an index_path), and how old (in seconds) the index may get
+# before a lookup refreshes it even when it already has an answer.
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "renamer" / "folders.json"
+DEFAULT_INDEX_MAX_AGE = 3600
+
+INDEX_VERSION = 1
+
+
+def _list_subdirs(directory: str, skip_dirs: frozenset) -> list[str]:
+    """Returns the sorted names of the subfolders of a directory, without symlinks or skipped names."""
+    try:
+        with os.scandir(directory) as entries:
+            names = [entry.name for entry in entries
+                     if entry.name not in skip_dirs and entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+    names.sort()
+    return names
+
+
+def iter_folders(root: Path, name: str, max_depth: int = DEFAULT_MAX_DEPTH,
+                 skip_dirs: frozenset = DEFAULT_SKIP_DIRS):
+    """Yields the folders called name under root, shallowest first.
+
+    The tree is walked breadth-first with os.scandir, never deeper than
+    max_depth levels below root and never into folders named in skip_dirs,
+    so the caller can stop as soon as it has seen enough matches.
+    """
+    queue = deque([(str(root), 0)])
+    while queue:
+        directory, depth = queue.popleft()
+        for child in _list_subdirs(directory, skip_dirs):
+            path = os.path.join(directory, child)
+            if child == name:
+                yield Path(path)
+            if depth + 1 < max_depth:
+                queue.append((path, depth + 1))
+
+
+def find_folders(root: Path, name: str, max_depth: int = DEFAULT_MAX_DEPTH,
+                 skip_dirs: frozenset = DEFAULT_SKIP_DIRS,
+                 limit: int | None = DEFAULT_MATCH_LIMIT) -> list[Path]:
+    """Finds up to limit folders called name under root (see iter_folders)."""
+    found = []
+    for path in iter_folders(root, name, max_depth, skip_dirs):
+        found.append(path)
+        if limit is not None and len(found) >= limit:
+            break
+    return found
+
+
+class FolderIndex:
+    """
+    A persisted index of the folder names under a root directory.
+
+    For every folder it scanned, the index keeps the folder's mtime and the
+    names of its subfolders. Adding, removing or renaming a subfolder changes
+    the parent's mtime, so refresh() only has to stat each known folder and
+    re-scan the ones whose mtime changed, instead of listing the whole tree.
+    """
+
+    def __init__(self, root: Path, max_depth: int = DEFAULT_MAX_DEPTH,
+                 skip_dirs: frozenset = DEFAULT_SKIP_DIRS):
+        self.root = str(root)
+        self.max_depth = max_depth
+        self.skip_dirs = frozenset(skip_dirs)
+        self.refreshed_at = 0.0
+        # Relative folder path ("" is the root) -> (mtime_ns, subfolder names).
+        self._dirs = {}
+        self._names = None
+
+    @classmethod
+    def build(cls, root: Path, max_depth: int = DEFAULT_MAX_DEPTH,
+              skip_dirs: frozenset = DEFAULT_SKIP_DIRS) -> "FolderIndex":
+        """Scans the tree under root and returns a new index."""
+        index = cls(root, max_depth, skip_dirs)
+        index.refresh()
+        return index
+
+    def refresh(self) -> int:
+        """Brings the index up to date and returns how many folders had to be re-scanned."""
+        old_dirs = self._dirs
+        dirs = {}
+        rescanned = 0
+        queue = deque([("", 0)])
+        while queue:
+            relative, depth = queue.popleft()
+            directory = os.path.join(self.root, relative)
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            entry = old_dirs.get(relative)
+            if entry is not None and entry[0] == mtime:
+                children = entry[1]
+            else:
+                children = _list_subdirs(directory, self.skip_dirs)
+                rescanned += 1
+            dirs[relative] = (mtime, children)
+            if depth + 1 < self.max_depth:
+                for child in children:
+                    queue.append((os.path.join(relative, child), depth + 1))
+        self._dirs = dirs
+        self._names = None
+        self.refreshed_at = time.time()
+        return rescanned
+
+    def age(self) -> float:
+        """Returns how many seconds ago the index was last refreshed."""
+        return time.time() - self.refreshed_at
+
+    def __len__(self) -> int:
+        return sum(len(children) for _, children in self._dirs.values())
+
+    def lookup(self, name: str, limit: int | None = DEFAULT_MATCH_LIMIT) -> list[Path]:
+        """Returns the indexed folders called name that still exist, shallowest first."""
+        if self._names is None:
+            names = {}
+            for relative, (_, children) in self._dirs.items():
+                for child in children:
+                    names.setdefault(child, []).append(os.path.join(relative, child))
+            for paths in names.values():
+                paths.sort(key=lambda path: (path.count(os.sep), path))
+            self._names = names
+        found = []
+        for relative in self._names.get(name, ()):
+            path = os.path.join(self.root, relative)
+            if os.path.isdir(path):
+                found.append(Path(path))
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def save(self, path: Path):
+        """Writes the index to path atomically (a temporary file replaced in one step)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "max_depth": self.max_depth,
+            "skip_dirs": sorted(self.skip_dirs),
+            "refreshed_at": self.refreshed_at,
+            "dirs": {relative: [mtime, children] for relative, (mtime, children) in self._dirs.items()},
+        }
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FolderIndex":
+        """Reads an index written by save(). Raises ValueError if the file is not a valid index."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError(f"Unsupported folder index version in {path}")
+            index = cls(data["root"], data["max_depth"], frozenset(data["skip_dirs"]))
+            index.refreshed_at = data["refreshed_at"]
+            index._dirs = {relative: (mtime, children)
+                           for relative, (mtime, children) in data["dirs"].items()}
+        except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid folder index {path}: {e}") from e
+        return index
+
+    def matches(self, root: Path, max_depth: int, skip_dirs: frozenset) -> bool:
+        """Returns True if the index was built with these search settings."""
+        return (self.root == str(root) and self.max_depth == max_depth
+                and self.skip_dirs == frozenset(skip_dirs))
+
+
+def locate_folder(name: str, root: Path | None = None, index_path: Path | None = None,
+                  max_depth: int = DEFAULT_MAX_DEPTH, skip_dirs: frozenset = DEFAULT_SKIP_DIRS,
+                  limit: int | None = DEFAULT_MATCH_LIMIT,
+                  max_age: float = DEFAULT_INDEX_MAX_AGE) -> list[Path]:
+    """Finds the folders called name under root (the home directory by default).
+
+    Without index_path the tree is searched directly. With it, the answer comes
+    from the persisted index; the index is refreshed incrementally only when it
+    has no live match or is older than max_age seconds, and rebuilt when it is
+    missing or was built with different settings.
+    """
+    root = Path.home() if root is None else Path(root)
+    if index_path is None:
+        return find_folders(root, name, max_depth, skip_dirs, limit)
+
+    try:
+        index = FolderIndex.load(index_path)
+        if not index.matches(root, max_depth, skip_dirs):
+            index = None
+    except (OSError, ValueError):
+        index = None
+
+    if index is None:
+        index = FolderIndex.build(root, max_depth, skip_dirs)
+    else:
+        found = index.lookup(name, limit)
+        if found and index.age() <= max_age:
+            return found
+        index.refresh()
+
+    try:
+        index.save(index_path)
+    except OSError:
+        # The index is only a cache; the search result is still valid.
+        pass
+    return index.lookup(name, limit)
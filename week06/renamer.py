@@ -4,6 +4,13 @@ import os
 from pathlib import Path
 import math
 
+from folder_locator import locate_folder, DEFAULT_MATCH_LIMIT
+
+# Set this environment variable to a file path (e.g. folder_locator.DEFAULT_INDEX_PATH)
+# to keep a folder-name index there; without it every search walks the tree
+# and nothing is written.
+INDEX_PATH_ENV = "RENAMER_INDEX"
+
 def find_files_in_directory(directory: Path, ignore_list: list[str]) -> list[Path]:
     """Finds all files in a directory, excluding specified names."""
     if not directory.is_dir():
@@ -54,8 +61,9 @@ def main():
         target_dir = potential_path
     else:
         print(f"\n🔍 Searching for a folder named '{input_str}' in your personal files...")
-        home_dir = Path.home()
-        found_folders = [p for p in home_dir.rglob(input_str) if p.is_dir() and p.name == input_str]
+        index_path = os.environ.get(INDEX_PATH_ENV)
+        found_folders = locate_folder(input_str, Path.home(),
+                                      index_path=Path(index_path).expanduser() if index_path else None)
         
         if not found_folders:
             print(f"\n❌ ERROR: No folder named '{input_str}' was found. Please try again.")
@@ -65,6 +73,8 @@ def main():
             print(f"✔️ Folder found at: {target_dir.resolve()}")
         else:
             print("\n⚠️ Multiple folders found. Please choose one:")
+            if len(found_folders) >= DEFAULT_MATCH_LIMIT:
+                print(f"  (showing the first {DEFAULT_MATCH_LIMIT}; enter a full path to pick another)")
             for i, folder in enumerate(found_folders):
                 print(f"  [{i + 1}] {folder.resolve()}")
             while True:
@@ -5,6 +5,7 @@ from pathlib import Path
 
 
 from renamer import find_files_in_directory, build_batch_rename_map
+from folder_locator import find_folders, locate_folder, FolderIndex
 
 def test_find_files_in_directory(tmp_path: Path):
     """Tests the file finding function."""
@@ -40,4 +41,65 @@ def test_build_batch_rename_map(tmp_path: Path):
     expected_new_path_2 = tmp_path / "Project_Alpha_2.png"
     
     assert result_map[tmp_path / 'a.txt'] == expected_new_path_1
-    assert result_map[tmp_path / 'b.png'] == expected_new_path_2
\ No newline at end of file
+    assert result_map[tmp_path / 'b.png'] == expected_new_path_2
+
+def make_tree(root: Path):
+    """Creates a small folder tree with 'wallpaper' folders at several depths."""
+    for relative in ["wallpaper", "docs/wallpaper", "a/b/c/wallpaper",
+                     "node_modules/wallpaper", ".git/wallpaper"]:
+        (root / relative).mkdir(parents=True)
+    (root / "wallpaper.txt").touch()
+
+def test_find_folders(tmp_path: Path):
+    """Tests the bounded breadth-first folder search."""
+    make_tree(tmp_path)
+
+    result = find_folders(tmp_path, "wallpaper")
+    assert result == [tmp_path / "wallpaper", tmp_path / "docs" / "wallpaper",
+                      tmp_path / "a" / "b" / "c" / "wallpaper"]
+
+    # Depth limit and early termination.
+    assert find_folders(tmp_path, "wallpaper", max_depth=2) == result[:2]
+    assert find_folders(tmp_path, "wallpaper", limit=1) == result[:1]
+    assert find_folders(tmp_path, "missing") == []
+
+def test_folder_index_refresh(tmp_path: Path):
+    """Tests that the folder index is persisted and refreshed incrementally."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    index_path = tmp_path / "folders.json"
+
+    index = FolderIndex.build(tree)
+    index.save(index_path)
+    index = FolderIndex.load(index_path)
+    assert index.lookup("wallpaper") == find_folders(tree, "wallpaper")
+
+    # Nothing changed, so nothing is re-scanned.
+    assert index.refresh() == 0
+
+    new_folder = tree / "a" / "b" / "wallpaper"
+    new_folder.mkdir()
+    # Only the changed parent and the new folder are scanned.
+    assert index.refresh() == 2
+    assert new_folder in index.lookup("wallpaper")
+
+    # A removed folder is never returned, even before a refresh.
+    new_folder.rmdir()
+    assert new_folder not in index.lookup("wallpaper")
+
+def test_locate_folder(tmp_path: Path):
+    """Tests folder lookup with and without the persisted index."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    index_path = tmp_path / "folders.json"
+
+    expected = find_folders(tree, "wallpaper")
+    assert locate_folder("wallpaper", tree) == expected
+    assert locate_folder("wallpaper", tree, index_path=index_path) == expected
+    assert index_path.exists()
+
+    # A folder created after the index was built is found by the refresh.
+    (tree / "photos").mkdir()
+    assert locate_folder("photos", tree, index_path=index_path) == [tree / "photos"]